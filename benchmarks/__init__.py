@@ -0,0 +1,7 @@
+"""
+Performance benchmarks for the POS system.
+
+Run a benchmark from the project root, e.g.::
+
+    python -m benchmarks.bench_connection_pool
+"""
@@ -0,0 +1,114 @@
+"""
+Benchmark: row action buttons, QPushButton cell widgets versus a delegate.
+
+Builds a sale-items style table (five text columns and a Remove column)
+of --rows rows in a fresh process per variant. It reports the time to fill
+the table and the resident memory added, then the frames per second of
+scrolling it a page at a time from top to bottom.  "cell widgets" is the
+old add_product_to_table: a QPushButton per row set with setCellWidget.
+"delegate" paints the buttons with ui.delegates.ActionColumnDelegate.
+
+Runs without a display: QT_QPA_PLATFORM=offscreen.
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+from benchmarks.common import print_table
+
+MODES = (('widgets', 'cell widgets'), ('delegate', 'delegate'))
+
+
+def rss_mb():
+    with open('/proc/self/statm') as f:
+        return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') / 2 ** 20
+
+
+def child(mode, rows):
+    """Fill and scroll one table in this process and print the results as JSON"""
+    from PyQt5.QtWidgets import QApplication, QTableWidget, QTableWidgetItem, QPushButton
+    from PyQt5.QtCore import Qt
+    from ui.delegates import ActionColumnDelegate
+
+    app = QApplication([])
+    table = QTableWidget()
+    table.setColumnCount(6)
+    table.resize(900, 600)
+    table.show()
+    removed = []
+    if mode == 'delegate':
+        delegate = ActionColumnDelegate('Remove', table)
+        delegate.clicked.connect(lambda index: removed.append(index.row()))
+        table.setItemDelegateForColumn(5, delegate)
+    app.processEvents()
+    before = rss_mb()
+
+    start = time.perf_counter()
+    table.setRowCount(rows)
+    for row in range(rows):
+        table.setItem(row, 0, QTableWidgetItem(f"Product {row}"))
+        table.setItem(row, 1, QTableWidgetItem("12.50"))
+        table.setItem(row, 2, QTableWidgetItem("2"))
+        table.setItem(row, 3, QTableWidgetItem("25.00"))
+        table.setItem(row, 4, QTableWidgetItem("100"))
+        if mode == 'delegate':
+            item = QTableWidgetItem()
+            item.setFlags(Qt.ItemIsEnabled)
+            table.setItem(row, 5, item)
+        else:
+            button = QPushButton('Remove')
+            button.clicked.connect(lambda checked, row=row: removed.append(row))
+            table.setCellWidget(row, 5, button)
+    table.viewport().repaint()
+    fill = time.perf_counter() - start
+    memory = rss_mb() - before
+
+    # Lets the view lay out the rows and size its scroll bar
+    app.processEvents()
+    scrollbar = table.verticalScrollBar()
+    frames = 0
+    start = time.perf_counter()
+    for value in range(0, scrollbar.maximum() + 1, max(1, scrollbar.pageStep())):
+        scrollbar.setValue(value)
+        table.viewport().repaint()
+        app.processEvents()
+        frames += 1
+    elapsed = time.perf_counter() - start
+
+    print(json.dumps({'fill': fill, 'rss': memory, 'frames': frames, 'fps': frames / elapsed}))
+
+
+def measure(mode, rows):
+    output = subprocess.run([sys.executable, '-m', 'benchmarks.bench_action_delegate',
+                             '--child', mode, str(rows)],
+                            capture_output=True, text=True, check=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rows', type=int, default=20000)
+    parser.add_argument('--child', nargs=2, metavar=('MODE', 'ROWS'), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        child(args.child[0], int(args.child[1]))
+        return
+
+    rows = []
+    for mode, label in MODES:
+        result = measure(mode, args.rows)
+        rows.append([label, f"{args.rows:,}", f"{result['fill'] * 1000:,.0f}", f"{result['rss']:,.1f}",
+                     result['frames'], f"{result['fps']:,.0f}"])
+
+    print_table(['buttons', 'rows', 'fill ms', 'RSS MB', 'frames', 'scroll FPS'], rows)
+
+
+if __name__ == '__main__':
+    main()
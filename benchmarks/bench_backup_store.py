@@ -0,0 +1,59 @@
+"""
+Benchmark: bytes written by deduplicated backups versus full copies.
+
+Takes a first backup of a seeded database, then a series of hourly-style
+backups after a day's worth of checkouts each, and compares the bytes the
+store wrote with the size of a full copy.
+"""
+
+import argparse
+import os
+
+from database.db_manager import DatabaseManager
+from database.backup_store import BackupStore
+from benchmarks.common import temp_database, timed, print_table
+
+
+def seed(db, products):
+    db.conn.executemany(
+        "INSERT INTO products (name, description, barcode, price, cost, quantity, category_id) VALUES (?, ?, ?, ?, ?, ?, 1)",
+        ((f"Product {i}", 'x' * 200, f"{6280000000000 + i}", 5.0, 3.0, 10 ** 6) for i in range(products)))
+    db.conn.commit()
+
+
+def run_checkouts(db, count, offset):
+    for n in range(count):
+        items = [{'product_id': (offset + n * 7 + k) % 1000 + 1, 'quantity': 1, 'price': 5.0} for k in range(5)]
+        db.checkout({'total_amount': 25.0, 'final_amount': 25.0, 'payment_method': 'Cash'}, items)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--products', type=int, default=100000)
+    parser.add_argument('--backups', type=int, default=5)
+    parser.add_argument('--checkouts', type=int, default=500)
+    args = parser.parse_args()
+
+    with temp_database() as path:
+        db = DatabaseManager(path)
+        seed(db, args.products)
+        store = BackupStore(os.path.join(os.path.dirname(path), 'store'))
+
+        rows = []
+        for n in range(args.backups):
+            if n:
+                run_checkouts(db, args.checkouts, n * args.checkouts)
+            manifest, seconds = timed(store.create_backup, path)
+            rows.append([manifest['id'], f"{manifest['full_size']:,}", f"{manifest['bytes_written']:,}",
+                         f"{100.0 * manifest['bytes_written'] / manifest['full_size']:.1f}%",
+                         f"{seconds:.2f}"])
+
+        print_table(['backup', 'full copy bytes', 'bytes written', 'ratio', 'seconds'], rows)
+
+        restored = os.path.join(os.path.dirname(path), 'restored.db')
+        ok, seconds = timed(store.restore, manifest['id'], restored)
+        print(f"Restore of latest backup: {'ok' if ok else 'FAILED'} in {seconds:.2f}s")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,56 @@
+"""
+Benchmark: barcode lookups through SQL versus the in-memory catalog.
+"""
+
+import argparse
+import random
+import tracemalloc
+
+from database.db_manager import DatabaseManager
+from benchmarks.common import temp_database, timed, ops_per_second, print_table
+
+
+def seed(db, count):
+    db.conn.executemany(
+        "INSERT INTO products (name, barcode, price, cost, quantity, category_id) VALUES (?, ?, ?, ?, ?, 1)",
+        ((f"Product {i}", f"{6280000000000 + i}", 5.0, 3.0, 100) for i in range(count)))
+    db.conn.commit()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--products', type=int, default=200000)
+    parser.add_argument('--lookups', type=int, default=200000)
+    args = parser.parse_args()
+
+    with temp_database() as path:
+        db = DatabaseManager(path)
+        seed(db, args.products)
+
+        tracemalloc.start()
+        count, load_seconds = timed(db.load_catalog)
+        memory = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+
+        rng = random.Random(7)
+        barcodes = [f"{6280000000000 + rng.randrange(args.products)}" for _ in range(args.lookups)]
+        scans = iter(barcodes * 2)
+
+        def sql_lookup():
+            cursor = db.connect()
+            cursor.execute("SELECT * FROM products WHERE barcode = ?", (next(scans),)).fetchone()
+            db.disconnect()
+
+        def cached_lookup():
+            db.get_product_by_barcode(next(scans))
+
+        print(f"Loaded {count:,} products in {load_seconds * 1000:.0f} ms, "
+              f"{memory / 1024 / 1024:.1f} MiB ({memory / max(count, 1):.0f} bytes/product)")
+        print_table(['path', 'lookups/sec'], [
+            ['SQL per scan', f"{ops_per_second(sql_lookup, args.lookups):,.0f}"],
+            ['catalog cache', f"{ops_per_second(cached_lookup, args.lookups):,.0f}"],
+        ])
+
+
+if __name__ == '__main__':
+    main()
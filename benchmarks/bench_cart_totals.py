@@ -0,0 +1,134 @@
+"""
+Benchmark: sale screen recalculation on a large basket.
+
+Fills a basket of --lines products, then times three operations over
+--repeat runs:
+
+- recalculating the totals, as a discount or tax change does;
+- adding one more unit of a product already in the basket;
+- building the checkout items.
+
+"table" is the old SaleDialog: a QTableWidget scanned row by row for the
+product, with totals parsed back from the formatted cells.  "cart" is
+models.cart.Cart behind ui.cart_table.CartTableModel.
+
+Runs without a display: QT_QPA_PLATFORM=offscreen.
+"""
+
+import argparse
+import os
+import time
+
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+from PyQt5.QtWidgets import QApplication, QTableWidget, QTableWidgetItem, QTableView
+from PyQt5.QtCore import Qt
+
+from models.cart import Cart, format_minor
+from ui.cart_table import CartTableModel
+from benchmarks.common import print_table
+
+
+class TableBasket:
+    """The old SaleDialog bookkeeping, without the dialog"""
+
+    def __init__(self):
+        self.table = QTableWidget()
+        self.table.setColumnCount(6)
+        self.discount = 0.0
+        self.tax_rate = 15.0
+
+    def add(self, product, quantity):
+        table = self.table
+        for row in range(table.rowCount()):
+            if table.item(row, 0).data(Qt.UserRole)['id'] == product['id']:
+                new_qty = int(table.item(row, 2).text()) + quantity
+                table.item(row, 2).setText(str(new_qty))
+                table.item(row, 3).setText(f"{new_qty * product['price']:.2f}")
+                return self.totals()
+        row = table.rowCount()
+        table.insertRow(row)
+        name_item = QTableWidgetItem(product['name'])
+        name_item.setData(Qt.UserRole, product)
+        table.setItem(row, 0, name_item)
+        table.setItem(row, 1, QTableWidgetItem(f"{product['price']:.2f}"))
+        table.setItem(row, 2, QTableWidgetItem(str(quantity)))
+        table.setItem(row, 3, QTableWidgetItem(f"{quantity * product['price']:.2f}"))
+        table.setItem(row, 4, QTableWidgetItem(str(product['quantity'])))
+        return self.totals()
+
+    def totals(self):
+        subtotal = 0
+        for row in range(self.table.rowCount()):
+            subtotal += float(self.table.item(row, 3).text())
+        total = subtotal - self.discount + subtotal * (self.tax_rate / 100)
+        return f"{subtotal:.2f}", f"{total:.2f}"
+
+    def items(self):
+        items = []
+        for row in range(self.table.rowCount()):
+            product = self.table.item(row, 0).data(Qt.UserRole)
+            quantity = int(self.table.item(row, 2).text())
+            unit_price = float(self.table.item(row, 1).text())
+            items.append({'product_id': product['id'], 'quantity': quantity,
+                          'price': unit_price, 'total': quantity * unit_price})
+        return items
+
+
+class CartBasket:
+    def __init__(self):
+        self.cart = Cart()
+        self.model = CartTableModel(self.cart)
+        self.view = QTableView()
+        self.view.setModel(self.model)
+        self.cart.set_tax_rate(15)
+
+    def add(self, product, quantity):
+        self.model.add(product, quantity)
+        return self.totals()
+
+    def totals(self):
+        return format_minor(self.cart.subtotal), format_minor(self.cart.total)
+
+    def items(self):
+        return self.cart.items()
+
+
+def per_call_us(fn, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) / repeat * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--lines', type=int, default=500)
+    parser.add_argument('--repeat', type=int, default=200)
+    args = parser.parse_args()
+
+    app = QApplication([])
+    products = [{'id': i, 'name': f"Product {i}", 'price': 1.25 + i % 97, 'quantity': 10 ** 6}
+                for i in range(args.lines)]
+
+    rows = []
+    results = {}
+    for label, basket in (('table', TableBasket()), ('cart', CartBasket())):
+        start = time.perf_counter()
+        for product in products:
+            basket.add(product, 2)
+        fill = (time.perf_counter() - start) * 1000
+        last = products[-1]
+        rows.append([label, args.lines, f"{fill:,.0f}",
+                     f"{per_call_us(basket.totals, args.repeat):,.1f}",
+                     f"{per_call_us(lambda: basket.add(last, 1), args.repeat):,.1f}",
+                     f"{per_call_us(basket.items, args.repeat):,.1f}"])
+        results[label] = basket.totals()
+
+    print_table(['basket', 'lines', 'fill ms', 'totals us', 'add existing us', 'checkout items us'], rows)
+    print(f"subtotal/total: table {results['table']}, cart {results['cart']}")
+    app.quit()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,82 @@
+"""
+Benchmark: per-statement commits versus the single-transaction checkout.
+
+"Before" mirrors the old flow: ``create_sale`` then ``add_sale_item`` and
+``update_product_quantity`` per line, each committing on its own.  "After"
+calls ``DatabaseManager.checkout`` once per basket.
+"""
+
+import argparse
+
+from database.db_manager import DatabaseManager
+from database.pool import get_pool
+from benchmarks.common import temp_database, timed, print_table
+
+
+def seed(db, count):
+    cursor = db.connect()
+    cursor.executemany(
+        "INSERT INTO products (name, barcode, price, cost, quantity, category_id) VALUES (?, ?, ?, ?, ?, 1)",
+        ((f"Product {i}", f"{i:013d}", 10.0, 7.0, 10 ** 9) for i in range(1, count + 1))
+    )
+    db.commit()
+    db.disconnect()
+
+
+def basket(size):
+    return [{'product_id': i, 'quantity': 1, 'price': 10.0} for i in range(1, size + 1)]
+
+
+def sale_data(invoice_number, size):
+    total = size * 10.0
+    return {
+        'invoice_number': invoice_number,
+        'total_amount': total,
+        'discount': 0,
+        'tax': 0,
+        'final_amount': total,
+        'payment_method': 'Cash',
+        'user_id': 1
+    }
+
+
+def per_statement(db, sales, size, tag):
+    for n in range(sales):
+        sale = sale_data(f"{tag}-{n}", size)
+        sale_id = db.create_sale(sale['invoice_number'], sale['total_amount'], 0, 0,
+                                 sale['final_amount'], sale['payment_method'], sale['user_id'])
+        for item in basket(size):
+            db.add_sale_item(sale_id, item['product_id'], item['quantity'], item['price'], item['price'])
+            db.update_product_quantity(item['product_id'], -item['quantity'])
+
+
+def single_transaction(db, sales, size, tag):
+    items = basket(size)
+    for n in range(sales):
+        db.checkout(sale_data(f"{tag}-{n}", size), items)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--sales', type=int, default=50)
+    parser.add_argument('--synchronous', default='FULL',
+                        help="PRAGMA synchronous for the run (FULL shows the fsync cost)")
+    args = parser.parse_args()
+
+    rows = []
+    with temp_database() as path:
+        get_pool(path).settings['synchronous'] = args.synchronous
+        db = DatabaseManager(path)
+        seed(db, 300)
+
+        for size in (1, 30, 300):
+            _, before = timed(per_statement, db, args.sales, size, f"old{size}")
+            _, after = timed(single_transaction, db, args.sales, size, f"new{size}")
+            rows.append([size, f"{args.sales / before:,.1f}", f"{args.sales / after:,.1f}",
+                         f"{before / after:.1f}x"])
+
+    print_table(['basket lines', 'per-statement sales/s', 'checkout sales/s', 'speedup'], rows)
+
+
+if __name__ == '__main__':
+    main()
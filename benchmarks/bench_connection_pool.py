@@ -0,0 +1,59 @@
+"""
+Benchmark: per-call connect/disconnect versus pooled connection leases.
+
+"Before" opens a new sqlite3 connection, runs the query and closes it, the
+way every UI action and model method used to.  "After" goes through
+``DatabaseManager.connect()``/``disconnect()`` backed by the pool.
+"""
+
+import argparse
+import sqlite3
+
+from database.db_manager import DatabaseManager
+from benchmarks.common import temp_database, ops_per_second, print_table
+
+QUERY = "SELECT * FROM products WHERE barcode = ?"
+
+
+def seed(db, count):
+    cursor = db.connect()
+    cursor.executemany(
+        "INSERT INTO products (name, barcode, price, cost, quantity, category_id) VALUES (?, ?, ?, ?, ?, 1)",
+        ((f"Product {i}", f"{i:013d}", 10.0, 7.0, 100) for i in range(count))
+    )
+    db.commit()
+    db.disconnect()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--iterations', type=int, default=20000)
+    parser.add_argument('--products', type=int, default=1000)
+    args = parser.parse_args()
+
+    with temp_database() as path:
+        db = DatabaseManager(path)
+        seed(db, args.products)
+
+        def per_call():
+            conn = sqlite3.connect(path)
+            conn.execute(QUERY, ('0000000000042',)).fetchone()
+            conn.close()
+
+        def pooled():
+            cursor = db.connect()
+            cursor.execute(QUERY, ('0000000000042',)).fetchone()
+            db.disconnect()
+
+        before = ops_per_second(per_call, args.iterations)
+        after = ops_per_second(pooled, args.iterations)
+
+        print_table(['mode', 'ops/sec'], [
+            ['connect per call', f"{before:,.0f}"],
+            ['pooled lease', f"{after:,.0f}"],
+            ['speedup', f"{after / before:.1f}x"],
+        ])
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,61 @@
+"""
+Benchmark: bulk CSV product import.
+
+Writes a supplier-style CSV with --rows products spread over a few dozen
+categories (a small share with bad barcodes), imports it into an empty
+database, then imports it again so every row takes the update path.
+"""
+
+import argparse
+import csv
+import os
+import random
+
+from database.db_manager import DatabaseManager
+from database.importer import import_products
+from benchmarks.common import temp_database, print_table
+
+
+def ean13(n):
+    digits = f"{629000000000 + n:012d}"
+    total = sum(int(d) * (3 if i % 2 else 1) for i, d in enumerate(digits))
+    return digits + str((10 - total % 10) % 10)
+
+
+def write_csv(path, rows):
+    with open(path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow(['barcode', 'name', 'category', 'purchase_price', 'selling_price',
+                         'quantity', 'min_quantity', 'description'])
+        for n in range(rows):
+            barcode = ean13(n) if n % 200 else 'N/A'
+            cost = round(random.uniform(1, 100), 2)
+            writer.writerow([barcode, f"Supplier item {n}", f"Category {n % 40}", cost,
+                             round(cost * 1.3, 2), random.randint(0, 500), 5,
+                             f"Imported catalog entry number {n}"])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rows', type=int, default=100000)
+    parser.add_argument('--chunk-size', type=int, default=None)
+    args = parser.parse_args()
+
+    with temp_database() as path:
+        csv_path = os.path.join(os.path.dirname(path), 'catalog.csv')
+        write_csv(csv_path, args.rows)
+        db = DatabaseManager(path)
+
+        rows = []
+        for label in ('insert', 'update'):
+            stats = import_products(db, csv_path, args.chunk_size)
+            rows.append([label, f"{stats['rows']:,}", f"{stats['imported']:,}", f"{stats['skipped']:,}",
+                         f"{stats['seconds']:.2f}", f"{stats['rows_per_second']:,}"])
+
+        print_table(['pass', 'rows', 'imported', 'skipped', 'seconds', 'rows/s'], rows)
+        count = db.conn.execute("SELECT COUNT(*) FROM products").fetchone()[0]
+        print(f"{count:,} products in the table")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,95 @@
+"""
+Benchmark: opening a picker over a large catalog, QComboBox versus the
+type-ahead ProductPicker.
+
+"combo" is the old SaleDialog.load_products: query every product and add
+it to a QComboBox each time a dialog opens.  "picker" creates a
+ProductPicker over the shared prefix index, which the app builds once at
+startup (its build time is reported separately, with the time taken to
+update it after a product is edited).  Lookup time is per keystroke for a
+few typed prefixes, top 50 matches.
+
+Runs without a display: QT_QPA_PLATFORM=offscreen.
+"""
+
+import argparse
+import os
+import random
+import time
+
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+from PyQt5.QtWidgets import QApplication, QComboBox
+
+from database.db_manager import DatabaseManager
+from database.search_index import suspend_search_index, resume_search_index
+from ui.product_picker import ProductPicker
+from ui.search import percentile
+from benchmarks.common import temp_database, print_table, timed
+
+WORDS = ['milk', 'bread', 'rice', 'sugar', 'olive', 'oil', 'green', 'tea', 'coffee', 'dates',
+         'cheese', 'water', 'juice', 'orange', 'apple', 'honey', 'salt', 'pepper', 'flour', 'beans',
+         'حليب', 'خبز', 'أرز', 'سكر', 'زيت', 'شاي', 'قهوة', 'تمر']
+PREFIXES = ['o', 'ol', 'oli', 'olive o', 'oil', 'tea 12', 'زي', '000000001234', 'Coffee B']
+
+
+def seed(db, count):
+    rng = random.Random(1)
+    conn = db.conn
+    suspend_search_index(conn)
+    conn.executemany(
+        "INSERT INTO products (name, barcode, price, cost, quantity, category_id) VALUES (?, ?, ?, ?, ?, 1)",
+        ((f"{rng.choice(WORDS)} {rng.choice(WORDS)} {i}", f"{i:013d}", 10.0, 7.0, 100)
+         for i in range(count)))
+    conn.commit()
+    resume_search_index(conn)
+
+
+def open_combo(db):
+    combo = QComboBox()
+    for product in db.get_products():
+        combo.addItem(product['name'], product)
+    return combo
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--products', type=int, default=100000)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    app = QApplication([])
+    with temp_database() as path:
+        db = DatabaseManager(path)
+        seed(db, args.products)
+
+        _, catalog_seconds = timed(lambda: len(db.catalog))
+        _, build_seconds = timed(lambda: db.product_index)
+        db.conn.execute("UPDATE products SET name = 'green tea special' WHERE id = 1")
+        db.conn.commit()
+        _, update_seconds = timed(db.product_saved, 1)
+
+        combo_ms = min(timed(open_combo, db)[1] for _ in range(args.repeat)) * 1000
+        picker_ms = min(timed(ProductPicker, db)[1] for _ in range(args.repeat)) * 1000
+
+        picker = ProductPicker(db)
+        lookups = []
+        matches = {}
+        for prefix in PREFIXES:
+            for _ in range(args.repeat):
+                _, seconds = timed(picker.update_matches, prefix)
+                lookups.append(seconds * 1000)
+            matches[prefix] = picker.matches.rowCount()
+
+        print(f"{args.products:,} products, {len(db.product_index):,} index keys; "
+              f"catalog load {catalog_seconds * 1000:,.0f} ms, index build {build_seconds * 1000:,.0f} ms, "
+              f"update after an edit {update_seconds * 1000:,.2f} ms")
+        print_table(['picker', 'open ms'], [['combo', f"{combo_ms:,.1f}"], ['picker', f"{picker_ms:,.2f}"]])
+        print(f"lookup + popup per keystroke: p50 {percentile(lookups, 50):.2f} ms, "
+              f"p95 {percentile(lookups, 95):.2f} ms")
+        print(', '.join(f"{prefix!r}: {count}" for prefix, count in matches.items()))
+    app.quit()
+
+
+if __name__ == '__main__':
+    main()
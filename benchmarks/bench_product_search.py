@@ -0,0 +1,61 @@
+"""
+Benchmark: LIKE '%term%' scans versus the FTS5 product search index.
+
+Seeds a catalog and replays the queries a cashier typing a product name
+one character at a time would trigger.
+"""
+
+import argparse
+import random
+
+from database.db_manager import DatabaseManager
+from benchmarks.common import temp_database, timed, print_table
+
+WORDS = ['milk', 'bread', 'rice', 'sugar', 'olive', 'oil', 'tea', 'coffee', 'dates', 'cheese',
+         'water', 'juice', 'apple', 'orange', 'chicken', 'beef', 'soap', 'tissue', 'salt', 'flour']
+
+LIKE_QUERY = """
+    SELECT p.*, c.name as category_name
+    FROM products p
+    LEFT JOIN categories c ON p.category_id = c.id
+    WHERE (p.name LIKE ? OR p.barcode LIKE ? OR p.description LIKE ?)
+    ORDER BY p.name
+"""
+
+
+def seed(db, count):
+    rng = random.Random(42)
+    rows = []
+    for i in range(count):
+        name = " ".join(rng.sample(WORDS, 3)) + f" {i}"
+        rows.append((name, f"Pack of {rng.randint(1, 24)}", f"{6281000000000 + i}", 5.0, 3.0, 10))
+    db.conn.executemany(
+        "INSERT INTO products (name, description, barcode, price, cost, quantity, category_id) VALUES (?, ?, ?, ?, ?, ?, 1)",
+        rows)
+    db.conn.commit()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--products', type=int, default=60000)
+    parser.add_argument('--limit', type=int, default=50)
+    args = parser.parse_args()
+
+    typed = 'cheese'
+    with temp_database() as path:
+        db = DatabaseManager(path)
+        seed(db, args.products)
+
+        rows = []
+        for n in range(1, len(typed) + 1):
+            term = typed[:n]
+            pattern = f"%{term}%"
+            _, like = timed(lambda: db.conn.execute(LIKE_QUERY, (pattern, pattern, pattern)).fetchall())
+            _, fts = timed(db.search_products, term, args.limit)
+            rows.append([term, f"{like * 1000:.2f}", f"{fts * 1000:.2f}"])
+
+        print_table(['term', 'LIKE ms', f'FTS top-{args.limit} ms'], rows)
+
+
+if __name__ == '__main__':
+    main()
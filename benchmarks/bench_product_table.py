@@ -0,0 +1,154 @@
+"""
+Benchmark: Products tab table, QTableWidget versus the paged table model.
+
+For each catalog size, a fresh process builds the table and reports the
+time from load to the first painted frame and the resident memory it
+added.  "widget" is the old load_products: a QTableWidget with nine items
+and two QPushButton cell widgets per product.  "model" is ProductTableModel
+in a QTableView with the action delegates; "model, all pages" also scrolls
+through the whole catalog, so every row is in the columnar cache.
+
+The widget run is skipped above --widget-max rows, where it takes minutes.
+Runs without a display: QT_QPA_PLATFORM=offscreen.
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+from benchmarks.common import temp_database, print_table
+
+SIZES = (10000, 100000, 500000)
+
+
+def rss_mb():
+    with open('/proc/self/statm') as f:
+        return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') / 2 ** 20
+
+
+def seed(path, count):
+    from database.db_manager import DatabaseManager
+    from database.search_index import suspend_search_index, resume_search_index
+
+    db = DatabaseManager(path)
+    conn = db.conn
+    conn.executemany("INSERT INTO categories (name) VALUES (?)", ((f"Category {i}",) for i in range(20)))
+    suspend_search_index(conn)
+    conn.executemany(
+        "INSERT INTO products (name, barcode, price, cost, quantity, min_quantity, category_id) "
+        "VALUES (?, ?, ?, ?, ?, 5, ?)",
+        ((f"Product {i:07d}", f"{i:013d}", 10.0 + i % 90, 7.0, i % 50, 2 + i % 20)
+         for i in range(count)))
+    conn.commit()
+    resume_search_index(conn)
+
+
+def legacy_fill(table, products):
+    from PyQt5.QtWidgets import QTableWidgetItem, QPushButton
+    from PyQt5.QtCore import Qt
+
+    table.setRowCount(0)
+    for row, product in enumerate(products):
+        table.insertRow(row)
+        table.setItem(row, 0, QTableWidgetItem(product.get('barcode', '')))
+        table.setItem(row, 1, QTableWidgetItem(product['name']))
+        table.setItem(row, 2, QTableWidgetItem(product.get('category_name', '')))
+        table.setItem(row, 3, QTableWidgetItem(f"{product['cost']:.2f}"))
+        table.setItem(row, 4, QTableWidgetItem(f"{product['price']:.2f}"))
+        quantity_item = QTableWidgetItem(str(product['quantity']))
+        if product['quantity'] <= product['min_quantity']:
+            quantity_item.setBackground(Qt.red)
+            quantity_item.setForeground(Qt.white)
+        table.setItem(row, 5, quantity_item)
+        table.setItem(row, 6, QTableWidgetItem(str(product['min_quantity'])))
+        edit_btn = QPushButton("تعديل")
+        edit_btn.clicked.connect(lambda checked, p=product: None)
+        delete_btn = QPushButton("حذف")
+        delete_btn.clicked.connect(lambda checked, p=product: None)
+        table.setCellWidget(row, 7, edit_btn)
+        table.setCellWidget(row, 8, delete_btn)
+
+
+def child(mode, path):
+    """Build one table in this process and print its measurements as JSON"""
+    from PyQt5.QtWidgets import QApplication, QTableWidget, QTableView, QHeaderView
+    from database.db_manager import DatabaseManager
+    from models.product import Product
+    from ui.delegates import ActionColumnDelegate
+    from ui.product_table import ProductTableModel
+
+    app = QApplication([])
+    db = DatabaseManager(path)
+    product_model = Product(db)
+    app.processEvents()
+    before = rss_mb()
+
+    start = time.perf_counter()
+    if mode == 'widget':
+        view = QTableWidget()
+        view.setColumnCount(9)
+        view.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
+        legacy_fill(view, product_model.get_all_products())
+    else:
+        model = ProductTableModel(db)
+        view = QTableView()
+        view.setModel(model)
+        view.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
+        view.verticalHeader().setSectionResizeMode(QHeaderView.Fixed)
+        view.setItemDelegateForColumn(model.EDIT_COLUMN, ActionColumnDelegate("تعديل", view))
+        view.setItemDelegateForColumn(model.DELETE_COLUMN, ActionColumnDelegate("حذف", view))
+        model.load()
+    view.resize(1200, 800)
+    view.show()
+    view.viewport().repaint()
+    first_paint = time.perf_counter() - start
+
+    if mode == 'model-all':
+        while model.canFetchMore():
+            model.fetchMore()
+        view.scrollToBottom()
+        view.viewport().repaint()
+
+    print(json.dumps({'first_paint': first_paint, 'rss': rss_mb() - before,
+                      'rows': view.model().rowCount()}))
+
+
+def measure(mode, path):
+    output = subprocess.run([sys.executable, '-m', 'benchmarks.bench_product_table', '--child', mode, path],
+                            capture_output=True, text=True, check=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--sizes', type=int, nargs='+', default=list(SIZES))
+    parser.add_argument('--widget-max', type=int, default=10000)
+    parser.add_argument('--child', nargs=2, metavar=('MODE', 'DB'), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        child(*args.child)
+        return
+
+    rows = []
+    for size in args.sizes:
+        with temp_database() as path:
+            seed(path, size)
+            for mode, label in (('widget', 'widget'), ('model', 'model'), ('model-all', 'model, all pages')):
+                if mode == 'widget' and size > args.widget_max:
+                    rows.append([f"{size:,}", label, 'skipped', '', ''])
+                    continue
+                result = measure(mode, path)
+                rows.append([f"{size:,}", label, f"{result['rows']:,}",
+                             f"{result['first_paint'] * 1000:,.0f}", f"{result['rss']:,.1f}"])
+
+    print_table(['products', 'table', 'rows loaded', 'first paint ms', 'RSS MB'], rows)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,96 @@
+"""
+Benchmark: versioned report cache.
+
+Replays a session that switches between the four reports, through
+``cached_report``, and prints the time of a cold run versus a cache hit
+per report and the overall hit rate.  A checkout in the middle of the
+session must make the sales and stock reports miss again.
+
+The last table is the cost of the data_versions triggers on the write
+path: checkout throughput with the triggers and with them dropped.
+"""
+
+import argparse
+import datetime
+import random
+
+from database.db_manager import DatabaseManager
+from database.reports import REPORTS, cached_report, report_cache
+from benchmarks.bench_checkout import basket, sale_data, single_transaction
+from benchmarks.bench_reports import seed
+from benchmarks.common import temp_database, timed, print_table
+
+VERSION_TRIGGERS = [f"{table}_version_{event}"
+                    for table in ('products', 'categories', 'sales', 'sale_items')
+                    for event in ('insert', 'update', 'delete')]
+
+
+def session(db, switches, start_date, end_date, checkout_at):
+    """Switch between reports at random; returns per-report hit/miss timings"""
+    timings = {name: {'hit': [], 'miss': []} for name in REPORTS}
+    cache = report_cache(db)
+    names = list(REPORTS)
+    rng = random.Random(1)
+    stale = 0
+    for n in range(switches):
+        if n == checkout_at:
+            before = {name: cached_report(db, name, start_date, end_date) for name in names}
+            db.checkout(sale_data(None, 3), basket(3))
+            after = {name: cached_report(db, name, start_date, end_date) for name in names}
+            stale = sum(1 for name in names if before[name] is not after[name])
+        name = rng.choice(names)
+        hits = cache.stats['hits']
+        _, seconds = timed(cached_report, db, name, start_date, end_date)
+        timings[name]['hit' if cache.stats['hits'] > hits else 'miss'].append(seconds)
+    return timings, stale
+
+
+def checkout_rate(db, sales, tag):
+    _, seconds = timed(single_transaction, db, sales, 5, tag)
+    return sales / seconds
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--sales', type=int, default=50000)
+    parser.add_argument('--days', type=int, default=30)
+    parser.add_argument('--switches', type=int, default=200)
+    parser.add_argument('--checkouts', type=int, default=500)
+    args = parser.parse_args()
+
+    end_date = datetime.date.today().isoformat()
+    start_date = (datetime.date.today() - datetime.timedelta(days=args.days)).isoformat()
+
+    with temp_database() as path:
+        db = DatabaseManager(path)
+        seed(db, 5000, 20, args.sales, args.days)
+        # Enough stock for every checkout basket
+        db.conn.execute("UPDATE products SET quantity = 1000000000 WHERE id <= 5")
+        db.conn.commit()
+
+        timings, stale = session(db, args.switches, start_date, end_date, args.switches // 2)
+        rows = []
+        for name, result in timings.items():
+            miss = sum(result['miss']) / len(result['miss']) * 1000 if result['miss'] else 0.0
+            hit = sum(result['hit']) / len(result['hit']) * 1000 if result['hit'] else 0.0
+            rows.append([name, len(result['miss']), len(result['hit']), f"{miss:.1f}", f"{hit:.3f}"])
+        print_table(['report', 'misses', 'hits', 'miss ms', 'hit ms'], rows)
+        cache = report_cache(db)
+        print(f"\nhit rate {cache.hit_rate:.1%}, {len(cache)} entries, {cache.bytes / 2 ** 20:.1f} MiB")
+        print(f"reports recomputed after a checkout: {stale} of {len(REPORTS)}")
+
+        with_triggers = checkout_rate(db, args.checkouts, 'with')
+        for trigger in VERSION_TRIGGERS:
+            db.conn.execute(f"DROP TRIGGER {trigger}")
+        db.conn.commit()
+        without_triggers = checkout_rate(db, args.checkouts, 'without')
+
+    print()
+    print_table(['data_versions triggers', 'checkouts/s'], [
+        ['on', f"{with_triggers:,.0f}"],
+        ['off', f"{without_triggers:,.0f}"],
+    ])
+
+
+if __name__ == '__main__':
+    main()
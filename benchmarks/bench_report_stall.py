@@ -0,0 +1,85 @@
+"""
+Benchmark: longest GUI stall while a report runs.
+
+Runs the sales report inside ReportsWidget the old way (query and render
+on the GUI thread) and through the QueryWorker, with a StallWatchdog
+timing the event loop in both cases. A third run cancels the worker
+right after it starts, to check the query is interrupted.
+
+Runs without a display: QT_QPA_PLATFORM=offscreen.
+"""
+
+import argparse
+import datetime
+import os
+import time
+
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+from PyQt5.QtWidgets import QApplication, QWidget
+from PyQt5.QtCore import Qt, QThreadPool
+
+from database.db_manager import DatabaseManager
+from database.reports import run_report
+from ui.reports import ReportsWidget
+from benchmarks.bench_reports import seed
+from benchmarks.common import temp_database, print_table
+
+
+def wait_for(app, widget, timeout=300):
+    deadline = time.perf_counter() + timeout
+    while widget.report_worker is not None and time.perf_counter() < deadline:
+        app.processEvents()
+        time.sleep(0.001)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--sales', type=int, default=100000)
+    parser.add_argument('--days', type=int, default=30)
+    args = parser.parse_args()
+
+    app = QApplication([])
+    with temp_database() as path:
+        db = DatabaseManager(path)
+        seed(db, 5000, 20, args.sales, args.days)
+
+        host = QWidget()
+        host.db_manager = db
+        widget = ReportsWidget(host)
+        wait_for(app, widget)
+        widget.start_date.setDate(widget.start_date.date().addDays(-args.days))
+
+        # Old behaviour: query and render on the GUI thread
+        widget.watchdog.start()
+        start = time.perf_counter()
+        app.processEvents()
+        report = run_report(db, 'Sales Report', widget.start_date.date().toString(Qt.ISODate),
+                            datetime.date.today().isoformat())
+        widget.report_table.setRowCount(0)
+        widget.append_rows(widget.report_worker, report['rows'])
+        app.processEvents()
+        sync_seconds = time.perf_counter() - start
+        sync_stall = widget.watchdog.stop()
+
+        start = time.perf_counter()
+        widget.load_report()
+        wait_for(app, widget)
+        worker_seconds = time.perf_counter() - start
+        worker_rows = widget.report_table.rowCount()
+
+        widget.load_report()
+        app.processEvents()
+        widget.cancel_report()
+        cancelled_rows = widget.report_table.rowCount()
+
+        print_table(['mode', 'rows', 'seconds', 'longest stall ms'], [
+            ['GUI thread', f"{len(report['rows']):,}", f"{sync_seconds:.2f}", f"{sync_stall:.0f}"],
+            ['QueryWorker', f"{worker_rows:,}", f"{worker_seconds:.2f}", f"{widget.last_stall_ms:.0f}"],
+        ])
+        print(f"Cancelled run stopped after {cancelled_rows:,} rows")
+        QThreadPool.globalInstance().waitForDone()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,111 @@
+"""
+Benchmark: per-row report queries versus set-based report statements.
+
+Replays the access pattern ReportsWidget used before database.reports
+(a get_sale_items() per sale, a category lookup per product, a
+get_products() per category) and compares statement counts, counted with
+Connection.set_trace_callback, and wall time against the set-based reports.
+"""
+
+import argparse
+import datetime
+import time
+
+from database.db_manager import DatabaseManager
+from database.reports import run_report
+from benchmarks.common import temp_database, timed, print_table
+
+
+def seed(db, products, categories, sales, days):
+    conn = db.conn
+    conn.executemany("INSERT INTO categories (name) VALUES (?)",
+                     ((f"Category {n}",) for n in range(categories)))
+    conn.executemany(
+        "INSERT INTO products (name, barcode, price, cost, quantity, min_quantity, category_id) VALUES (?, ?, 5.0, 3.0, ?, 5, ?)",
+        ((f"Product {n}", f"{6280000000000 + n}", n % 50, n % categories + 1) for n in range(products)))
+    now = int(time.time())
+    conn.executemany(
+        """INSERT INTO sales (id, invoice_number, total_amount, final_amount, payment_method, created_ts)
+           VALUES (?, ?, 15.0, 15.0, 'Cash', ?)""",
+        ((n, f"B-{n}", now - (n * days * 86400) // sales) for n in range(1, sales + 1)))
+    conn.executemany(
+        "INSERT INTO sale_items (sale_id, product_id, quantity, price, total) VALUES (?, ?, 1, 5.0, 5.0)",
+        ((n, (n * 7 + k) % products + 1) for n in range(1, sales + 1) for k in range(3)))
+    conn.commit()
+
+
+def category_name(db, category_id):
+    if db.connect():
+        category = db.fetch_one("SELECT name FROM categories WHERE id = ?", (category_id,))
+        db.disconnect()
+        return category['name'] if category else 'Unknown'
+    return 'Unknown'
+
+
+def legacy_sales(db, start_date, end_date):
+    rows = []
+    for sale in db.get_sales(start_date, end_date):
+        items = db.get_sale_items(sale['id'])
+        rows.append((sale['created_at'], sale['invoice_number'], sum(item['quantity'] for item in items)))
+    return rows
+
+
+def legacy_products(db):
+    return [(p['name'], category_name(db, p['category_id'])) for p in db.get_products()]
+
+
+def legacy_low_stock(db):
+    return [(p['name'], category_name(db, p['category_id']))
+            for p in db.get_products() if p['quantity'] <= p['min_quantity']]
+
+
+def legacy_categories(db):
+    rows = []
+    for category in db.get_categories():
+        products = db.get_products(category['id'])
+        rows.append((category['name'], len(products), sum(p['quantity'] for p in products)))
+    return rows
+
+
+def count_statements(db, fn, *args):
+    statements = []
+    db.conn.set_trace_callback(statements.append)
+    try:
+        _, seconds = timed(fn, *args)
+    finally:
+        db.conn.set_trace_callback(None)
+    return sum(1 for sql in statements if sql.lstrip().upper().startswith('SELECT')), seconds
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--products', type=int, default=20000)
+    parser.add_argument('--categories', type=int, default=50)
+    parser.add_argument('--sales', type=int, default=30000)
+    parser.add_argument('--days', type=int, default=30)
+    args = parser.parse_args()
+
+    with temp_database() as path:
+        db = DatabaseManager(path)
+        seed(db, args.products, args.categories, args.sales, args.days)
+        end_date = datetime.date.today().isoformat()
+        start_date = (datetime.date.today() - datetime.timedelta(days=args.days)).isoformat()
+
+        cases = [
+            ('Sales Report', legacy_sales, (db, start_date, end_date)),
+            ('Products Report', legacy_products, (db,)),
+            ('Low Stock Report', legacy_low_stock, (db,)),
+            ('Categories Report', legacy_categories, (db,)),
+        ]
+        rows = []
+        for name, legacy, legacy_args in cases:
+            old_queries, old_seconds = count_statements(db, legacy, *legacy_args)
+            new_queries, new_seconds = count_statements(db, run_report, db, name, start_date, end_date)
+            rows.append([name, f"{old_queries:,}", f"{old_seconds * 1000:.0f}",
+                         f"{new_queries:,}", f"{new_seconds * 1000:.0f}"])
+
+        print_table(['report', 'per-row queries', 'per-row ms', 'set-based queries', 'set-based ms'], rows)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,67 @@
+"""
+Benchmark: time to restore a compressed backup over a live database.
+
+Seeds a database to roughly --size-mb, takes a compressed backup, changes
+the live database, then restores the backup while the pool holds an open
+connection. The safety backup restore_backup normally takes first is
+skipped; its cost is the backup row. Reports restore time and checks that
+the pooled connection and the catalog see the restored data afterwards.
+"""
+
+import argparse
+import os
+
+from config import DATABASE
+from database.db_manager import DatabaseManager
+from database.backup import create_backup, restore_backup
+from benchmarks.common import temp_database, timed, print_table
+
+ROW_BYTES = 1024
+BATCH = 10000
+
+
+def seed(db, path, size_mb):
+    """Insert products in batches until the file reaches size_mb"""
+    rows = 0
+    while os.path.getsize(path) < size_mb * 2 ** 20:
+        db.conn.executemany(
+            "INSERT INTO products (name, description, barcode, price, cost, quantity) VALUES (?, ?, ?, 5.0, 3.0, 10)",
+            ((f"Product {i}", os.urandom(ROW_BYTES // 2).hex()[:ROW_BYTES - 64], f"{6280000000000 + i}")
+             for i in range(rows, rows + BATCH)))
+        db.conn.commit()
+        db.conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        rows += BATCH
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--size-mb', type=int, default=2048)
+    args = parser.parse_args()
+
+    with temp_database() as path:
+        DATABASE['backup_dir'] = os.path.dirname(path)
+        db = DatabaseManager(path)
+        rows, seed_seconds = timed(seed, db, path, args.size_mb)
+        db_size = os.path.getsize(path)
+
+        backup_path, backup_seconds = timed(create_backup, path)
+        db.conn.execute("DELETE FROM products WHERE id > ?", (rows // 2,))
+        db.conn.commit()
+        db.load_catalog()
+
+        ok, restore_seconds = timed(restore_backup, backup_path, path, safety_backup=False)
+        count = db.conn.execute("SELECT COUNT(*) FROM products").fetchone()[0]
+
+        print_table(['step', 'seconds', 'MB/s'], [
+            ['seed', f"{seed_seconds:.1f}", f"{db_size / seed_seconds / 2 ** 20:.0f}"],
+            ['backup', f"{backup_seconds:.1f}", f"{db_size / backup_seconds / 2 ** 20:.0f}"],
+            ['restore', f"{restore_seconds:.1f}", f"{db_size / restore_seconds / 2 ** 20:.0f}"],
+        ])
+        print(f"Database {db_size / 2 ** 20:.0f} MB, backup {os.path.getsize(backup_path) / 2 ** 20:.0f} MB")
+        print(f"Restore {'ok' if ok else 'FAILED'}: {count} of {rows} products visible, "
+              f"catalog holds {len(db.catalog)}")
+
+
+if __name__ == '__main__':
+    main()
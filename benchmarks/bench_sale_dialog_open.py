@@ -0,0 +1,114 @@
+"""
+Benchmark: New Sale open-to-ready latency, fresh versus reused SaleDialog.
+
+Opens the sale dialog --opens times over a catalog of --products and
+reports p50/p95 of the time from New Sale to the dialog's first paint
+(SaleDialog.ready_latencies).  Between opens a product is added and the
+dialog closed, as after a sale.
+
+- "fresh + combo" builds a new dialog per sale and fills a QComboBox with
+  the whole catalog, as SalesWidget.new_sale and load_products used to.
+- "fresh" builds a new dialog per sale with today's widgets.
+- "reused" is SalesWidget.get_sale_dialog: one dialog, reset() after each
+  sale while the cashier is between customers.
+
+Runs without a display: QT_QPA_PLATFORM=offscreen.
+"""
+
+import argparse
+import os
+import time
+
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+from PyQt5.QtWidgets import QApplication, QWidget, QComboBox
+from PyQt5.QtCore import QThreadPool
+
+from config import UI
+from database.db_manager import DatabaseManager
+from database.search_index import suspend_search_index, resume_search_index
+from ui.sales import SaleDialog, SalesWidget
+from ui.search import percentile
+from benchmarks.common import temp_database, print_table
+
+
+class LegacySaleDialog(SaleDialog):
+    """SaleDialog plus the full-catalog combo it used to load on open"""
+
+    def init_ui(self):
+        super().init_ui()
+        self.product_combo = QComboBox()
+        for product in self.parent.parent.db_manager.get_products():
+            self.product_combo.addItem(product['name'], product)
+
+
+def seed(db, count):
+    conn = db.conn
+    suspend_search_index(conn)
+    conn.executemany(
+        "INSERT INTO products (name, barcode, price, cost, quantity, category_id) VALUES (?, ?, ?, ?, ?, 1)",
+        ((f"Product {i}", f"{i:013d}", 10.0, 7.0, 10 ** 6) for i in range(count)))
+    conn.commit()
+    resume_search_index(conn)
+
+
+def open_until_ready(app, dialog, started):
+    dialog.open_started = started
+    dialog.show()
+    while dialog.open_started is not None:
+        app.processEvents()
+
+
+def run_sale(dialog, product):
+    dialog.add_product_to_table(product)
+    dialog.hide()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--products', type=int, default=100000)
+    parser.add_argument('--opens', type=int, default=30)
+    args = parser.parse_args()
+
+    app = QApplication([])
+    rows = []
+    with temp_database() as path:
+        db = DatabaseManager(path)
+        seed(db, args.products)
+        db.load_catalog()
+        product = db.get_product_by_barcode(f"{1:013d}")
+
+        main_window = QWidget()
+        main_window.db_manager = db
+        main_window.current_user = {'id': 1}
+        sales = SalesWidget(main_window)
+
+        for label in ('fresh + combo', 'fresh', 'reused'):
+            latencies = []
+            for _ in range(args.opens):
+                # Measured from New Sale, so building a fresh dialog counts
+                started = time.perf_counter()
+                if label == 'reused':
+                    dialog = sales.get_sale_dialog()
+                else:
+                    dialog = (LegacySaleDialog if label == 'fresh + combo' else SaleDialog)(sales)
+                    dialog.reset()
+                open_until_ready(app, dialog, started)
+                latencies.append(dialog.ready_latencies[-1])
+                run_sale(dialog, product)
+                if label == 'reused':
+                    dialog.reset()
+                else:
+                    dialog.deleteLater()
+                QThreadPool.globalInstance().waitForDone()
+                app.processEvents()
+            rows.append([label, args.opens, f"{percentile(latencies, 50):.1f}",
+                         f"{percentile(latencies, 95):.1f}", f"{max(latencies):.1f}"])
+
+    print(f"{args.products:,} products, budget {UI['sale_dialog_ready_ms']} ms")
+    print_table(['dialog', 'opens', 'p50 ms', 'p95 ms', 'max ms'], rows)
+    app.quit()
+
+
+if __name__ == '__main__':
+    main()
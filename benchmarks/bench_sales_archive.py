@@ -0,0 +1,77 @@
+"""
+Benchmark: hot database size and query times before and after archiving.
+
+Seeds several years of sales with their items, then times the current-month
+summary, a full-history summary and a VACUUM before and after the closed
+years are moved into per-year partitions.
+"""
+
+import argparse
+import datetime
+import os
+import random
+import time
+
+from database.db_manager import DatabaseManager
+from database.archive import archive_closed_years
+from benchmarks.common import temp_database, timed, print_table
+
+YEARS = 5
+BATCH = 100000
+
+
+def seed(db, count):
+    now = int(time.time())
+    conn = db.conn
+    sales = []
+    items = []
+    for n in range(1, count + 1):
+        ts = now - random.randint(0, YEARS * 365 * 86400)
+        created_at = datetime.datetime.utcfromtimestamp(ts).strftime('%Y-%m-%d %H:%M:%S')
+        sales.append((n, f"B-{n}", 30.0, 30.0, 'Cash', created_at, ts))
+        items.extend((n, k, 1, 10.0, 10.0, ts) for k in range(1, 4))
+        if len(sales) == BATCH or n == count:
+            conn.executemany(
+                """INSERT INTO sales (id, invoice_number, total_amount, final_amount, payment_method, created_at, created_ts)
+                   VALUES (?, ?, ?, ?, ?, ?, ?)""", sales)
+            conn.executemany(
+                """INSERT INTO sale_items (sale_id, product_id, quantity, price, total, created_ts)
+                   VALUES (?, ?, ?, ?, ?, ?)""", items)
+            sales = []
+            items = []
+    conn.commit()
+
+
+def measure(db, path):
+    today = datetime.date.today()
+    month_start = today.replace(day=1).isoformat()
+    _, month = timed(db.get_sales_summary, month_start, today.isoformat())
+    _, history = timed(db.get_sales_summary)
+    _, vacuum = timed(db.conn.execute, "VACUUM")
+    return [f"{os.path.getsize(path) / 2 ** 20:.0f}", f"{month * 1000:.2f}",
+            f"{history * 1000:.0f}", f"{vacuum:.2f}"]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--sales', type=int, default=1000000)
+    args = parser.parse_args()
+
+    with temp_database() as path:
+        db = DatabaseManager(path)
+        _, seconds = timed(seed, db, args.sales)
+        print(f"Seeded {args.sales:,} sales in {seconds:.1f}s")
+
+        before = measure(db, path)
+        moved, seconds = timed(archive_closed_years, db.conn, path)
+        print(f"Archived {sum(moved.values()):,} sales from {len(moved)} years in {seconds:.1f}s")
+        after = measure(db, path)
+
+        print_table(['', 'hot MB', 'month summary ms', 'full summary ms', 'VACUUM s'], [
+            ['before'] + before,
+            ['after'] + after,
+        ])
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,62 @@
+"""
+Benchmark: DATE(created_at) filtering versus half-open created_ts ranges.
+
+Seeds a sales table spread over several years and times today's dashboard
+stats both ways.
+"""
+
+import argparse
+import datetime
+import random
+import time
+
+from database.db_manager import DatabaseManager
+from models.sale import Sale
+from benchmarks.common import temp_database, timed, print_table
+
+DAYS = 3 * 365
+
+
+def seed(db, count):
+    now = int(time.time())
+    conn = db.conn
+    rows = []
+    for n in range(count):
+        ts = now - random.randint(0, DAYS * 86400)
+        created_at = datetime.datetime.utcfromtimestamp(ts).strftime('%Y-%m-%d %H:%M:%S')
+        rows.append((f"B-{n}", 10.0, 10.0, 'Cash', created_at, ts))
+        if len(rows) == 100000:
+            conn.executemany(
+                """INSERT INTO sales (invoice_number, total_amount, final_amount, payment_method, created_at, created_ts)
+                   VALUES (?, ?, ?, ?, ?, ?)""", rows)
+            rows = []
+    if rows:
+        conn.executemany(
+            """INSERT INTO sales (invoice_number, total_amount, final_amount, payment_method, created_at, created_ts)
+               VALUES (?, ?, ?, ?, ?, ?)""", rows)
+    conn.commit()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--sales', type=int, default=5000000)
+    args = parser.parse_args()
+
+    with temp_database() as path:
+        db = DatabaseManager(path)
+        _, seconds = timed(seed, db, args.sales)
+        print(f"Seeded {args.sales:,} sales in {seconds:.1f}s")
+
+        today = datetime.datetime.now().strftime('%Y-%m-%d')
+        old_query = """SELECT COUNT(*), SUM(final_amount) FROM sales WHERE DATE(created_at) = ?"""
+        _, before = timed(lambda: db.conn.execute(old_query, (today,)).fetchone())
+        _, after = timed(Sale(db).get_today_sales_stats)
+
+        print_table(['query', 'ms'], [
+            ['DATE(created_at) = ?', f"{before * 1000:.2f}"],
+            ['created_ts range', f"{after * 1000:.2f}"],
+        ])
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,79 @@
+"""
+Benchmark: streaming sales export versus loading everything first.
+
+Seeds sales with their items, then exports every sale line to CSV and
+JSON Lines through the streaming exporter, and compares time and peak
+Python memory against a fetchall() of the same joined rows.
+"""
+
+import argparse
+import os
+import time
+import tracemalloc
+
+from database.db_manager import DatabaseManager
+from database.exporter import export_sales
+from benchmarks.common import temp_database, timed, print_table
+
+ITEMS_PER_SALE = 3
+BATCH = 50000
+
+
+def seed(db, count):
+    now = int(time.time())
+    conn = db.conn
+    for start in range(1, count + 1, BATCH):
+        ids = range(start, min(start + BATCH, count + 1))
+        conn.executemany(
+            """INSERT INTO sales (id, invoice_number, total_amount, final_amount, payment_method, created_ts)
+               VALUES (?, ?, 30.0, 30.0, 'Cash', ?)""",
+            ((n, f"B-{n}", now - (count - n) * 60) for n in ids))
+        conn.executemany(
+            """INSERT INTO sale_items (sale_id, product_id, quantity, price, total)
+               VALUES (?, ?, 1, 10.0, 10.0)""",
+            ((n, k) for n in ids for k in range(1, ITEMS_PER_SALE + 1)))
+    conn.commit()
+
+
+def fetch_all(db):
+    return db.conn.execute("""
+        SELECT s.*, si.product_id, si.quantity, si.price, si.total
+        FROM sales s JOIN sale_items si ON si.sale_id = s.id
+        ORDER BY s.created_ts
+    """).fetchall()
+
+
+def measure(fn, *args):
+    """Time one untraced run, then trace a second run for peak memory"""
+    result, seconds = timed(fn, *args)
+    del result
+    tracemalloc.start()
+    result = fn(*args)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return result, seconds, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--sales', type=int, default=200000)
+    args = parser.parse_args()
+
+    with temp_database() as path:
+        db = DatabaseManager(path)
+        seed(db, args.sales)
+        directory = os.path.dirname(path)
+
+        rows = []
+        result, seconds, peak = measure(fetch_all, db)
+        rows.append(['fetchall()', f"{len(result):,}", f"{seconds:.2f}", f"{peak / 2 ** 20:.1f}"])
+        del result
+        for name in ('sales.csv', 'sales.jsonl'):
+            count, seconds, peak = measure(export_sales, db, os.path.join(directory, name))
+            rows.append([f"export {name}", f"{count:,}", f"{seconds:.2f}", f"{peak / 2 ** 20:.1f}"])
+
+        print_table(['method', 'lines', 'seconds', 'peak MB'], rows)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,77 @@
+"""
+Benchmark: sales summaries from raw sales versus the sales_daily rollup.
+
+Seeds three years of sales and times the dashboard's 30-day summary, a
+one-year and a full-history summary, both by aggregating the sales rows
+(the old get_sales_summary) and from the rollup.  The second table is the
+write cost of the rollup triggers: checkouts per second with and without
+them.
+"""
+
+import argparse
+import datetime
+
+from database.db_manager import DatabaseManager
+from database.rollup import check
+from benchmarks.bench_checkout import seed as seed_products, single_transaction
+from benchmarks.bench_sales_date_range import seed
+from benchmarks.common import temp_database, timed, print_table
+
+ROLLUP_TRIGGERS = ('sales_daily_insert', 'sales_daily_update', 'sales_daily_delete')
+
+
+def raw_summary(db, start_date=None, end_date=None):
+    with db.sales_source('sales', start_date, end_date, ['final_amount']) as (sales, params):
+        return db.conn.execute(f"""
+            SELECT COUNT(*), COALESCE(SUM(final_amount), 0), COALESCE(AVG(final_amount), 0)
+            FROM ({sales})
+        """, params).fetchone()
+
+
+def best_of(runs, fn, *args):
+    return min(timed(fn, *args)[1] for _ in range(runs))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--sales', type=int, default=1000000)
+    parser.add_argument('--checkouts', type=int, default=500)
+    parser.add_argument('--runs', type=int, default=5)
+    args = parser.parse_args()
+
+    today = datetime.date.today()
+    ranges = [
+        ('30 days', (today - datetime.timedelta(days=30)).isoformat(), today.isoformat()),
+        ('1 year', (today - datetime.timedelta(days=365)).isoformat(), today.isoformat()),
+        ('all', None, None),
+    ]
+
+    with temp_database() as path:
+        db = DatabaseManager(path)
+        seed(db, args.sales)
+        seed_products(db, 5)
+
+        rows = []
+        for label, start_date, end_date in ranges:
+            raw = best_of(args.runs, raw_summary, db, start_date, end_date)
+            rollup = best_of(args.runs, db.get_sales_summary, start_date, end_date)
+            assert raw_summary(db, start_date, end_date)[0] == db.get_sales_summary(start_date, end_date)['total_sales']
+            rows.append([label, f"{raw * 1000:.2f}", f"{rollup * 1000:.3f}", f"{raw / rollup:,.0f}x"])
+        print_table(['range', 'raw ms', 'rollup ms', 'speedup'], rows)
+        print(f"\nrollup mismatches: {len(check(db.conn, path))}")
+
+        _, with_triggers = timed(single_transaction, db, args.checkouts, 5, 'with')
+        for trigger in ROLLUP_TRIGGERS:
+            db.conn.execute(f"DROP TRIGGER {trigger}")
+        db.conn.commit()
+        _, without_triggers = timed(single_transaction, db, args.checkouts, 5, 'without')
+
+    print()
+    print_table(['rollup triggers', 'checkouts/s'], [
+        ['on', f"{args.checkouts / with_triggers:,.0f}"],
+        ['off', f"{args.checkouts / without_triggers:,.0f}"],
+    ])
+
+
+if __name__ == '__main__':
+    main()
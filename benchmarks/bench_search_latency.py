@@ -0,0 +1,148 @@
+"""
+Benchmark: keystroke-to-paint latency of the product search box.
+
+Types search terms into a line edit, one character every --interval ms,
+over a ProductTableModel of --products rows and prints p50/p95 latency
+from the last keystroke a result covers to the paint of the table that
+shows it.  Keystrokes overtaken before their results were painted are
+counted as coalesced.
+
+"per keystroke" is the old wiring: textChanged runs the search and
+reloads the table synchronously.  "controller" is SearchController:
+debounced, off the GUI thread, stale searches cancelled and extended terms
+narrowed in memory.  The last column is the longest time the event loop
+was blocked while typing.
+
+Runs without a display: QT_QPA_PLATFORM=offscreen.
+"""
+
+import argparse
+import os
+import random
+import time
+
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+from PyQt5.QtWidgets import QApplication, QLineEdit, QTableView
+from PyQt5.QtCore import QEvent, QObject, QThreadPool
+
+from database.db_manager import DatabaseManager
+from database.search_index import suspend_search_index, resume_search_index
+from ui.product_table import ProductTableModel
+from ui.search import SearchController, percentile
+from ui.workers import StallWatchdog
+from benchmarks.common import temp_database, print_table
+
+WORDS = ['milk', 'bread', 'rice', 'sugar', 'olive', 'oil', 'green', 'tea', 'coffee', 'dates',
+         'cheese', 'water', 'juice', 'orange', 'apple', 'honey', 'salt', 'pepper', 'flour', 'beans']
+TERMS = ['olive oil', 'green tea', 'coffee beans', 'orange juice', 'honey', 'cheese 12']
+
+
+def seed(db, count):
+    rng = random.Random(1)
+    conn = db.conn
+    suspend_search_index(conn)
+    conn.executemany(
+        "INSERT INTO products (name, barcode, price, cost, quantity, category_id) VALUES (?, ?, ?, ?, ?, 1)",
+        ((f"{rng.choice(WORDS)} {rng.choice(WORDS)} {i}", f"{i:013d}", 10.0, 7.0, 100)
+         for i in range(count)))
+    conn.commit()
+    resume_search_index(conn)
+
+
+class PerKeystrokeSearch(QObject):
+    """The old behaviour, with the same latency measurement as the controller"""
+
+    def __init__(self, model, viewport):
+        super().__init__()
+        self.model = model
+        self.unpainted = None
+        self.latencies = []
+        self.stats = {'queries': 0, 'narrowed': 0, 'cancelled': 0, 'coalesced': 0}
+        viewport.installEventFilter(self)
+
+    def set_term(self, term):
+        start = time.perf_counter()
+        term = term.strip()
+        if term:
+            self.model.set_results(term, self.model.db_manager.search_products(term, limit=None))
+        else:
+            self.model.load()
+        self.stats['queries'] += 1
+        if self.unpainted is not None:
+            self.stats['coalesced'] += 1
+        self.unpainted = start
+
+    def eventFilter(self, obj, event):
+        if event.type() == QEvent.Paint and self.unpainted is not None:
+            self.latencies.append((time.perf_counter() - self.unpainted) * 1000)
+            self.unpainted = None
+        return False
+
+
+def pump(app, seconds):
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        app.processEvents()
+        time.sleep(0.001)
+
+
+def type_terms(app, line_edit, interval, settle):
+    for term in TERMS:
+        line_edit.clear()
+        pump(app, settle)
+        for n in range(1, len(term) + 1):
+            line_edit.setText(term[:n])
+            pump(app, interval)
+        pump(app, settle)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--products', type=int, default=100000)
+    parser.add_argument('--interval', type=int, default=60, help="ms between keystrokes")
+    args = parser.parse_args()
+
+    app = QApplication([])
+    rows = []
+    with temp_database() as path:
+        db = DatabaseManager(path)
+        seed(db, args.products)
+
+        for label in ('per keystroke', 'controller'):
+            model = ProductTableModel(db)
+            view = QTableView()
+            view.setModel(model)
+            view.resize(1000, 600)
+            view.show()
+            line_edit = QLineEdit()
+            model.load()
+
+            if label == 'controller':
+                search = SearchController(db.db_path)
+                search.results.connect(
+                    lambda term, products, m=model: m.load() if products is None else m.set_results(term, products))
+                search.watch(view.viewport())
+            else:
+                search = PerKeystrokeSearch(model, view.viewport())
+            line_edit.textChanged.connect(search.set_term)
+
+            watchdog = StallWatchdog()
+            watchdog.start()
+            type_terms(app, line_edit, args.interval / 1000, 0.5)
+            QThreadPool.globalInstance().waitForDone()
+            stall = watchdog.stop()
+            latencies = list(search.latencies)
+            stats = search.stats
+            rows.append([label, len(latencies), f"{percentile(latencies, 50):.0f}",
+                         f"{percentile(latencies, 95):.0f}", f"{max(latencies):.0f}",
+                         stats['queries'], stats['narrowed'], stats['cancelled'], stats['coalesced'],
+                         f"{stall:.0f}"])
+
+    print(f"{sum(len(term) for term in TERMS)} keystrokes, one every {args.interval} ms")
+    print_table(['search', 'paints', 'p50 ms', 'p95 ms', 'max ms',
+                 'queries', 'narrowed', 'cancelled', 'coalesced', 'GUI stall ms'], rows)
+
+
+if __name__ == '__main__':
+    main()
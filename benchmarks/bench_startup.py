@@ -0,0 +1,144 @@
+"""
+Benchmark: application startup timeline.
+
+Starts the POS in a fresh process over a database of --products products
+and reports, from process start:
+
+- login visible: first paint of the login window;
+- first usable tab: first paint of the dashboard after logging in;
+- catalog ready: the barcode/type-ahead catalog is loaded (prefetched on a
+  worker thread after login).
+
+"lazy" is MainWindow as shipped: tabs are LazyTab placeholders and the
+catalog is prefetched after login.  "eager" builds every tab and loads the
+catalog before the login window is shown, as MainWindow used to.  Login is
+simulated by emitting LoginWindow.login_successful, and the welcome
+message box is replaced by a no-op so nothing waits for a click.  Each
+run starts from process start, so interpreter and import time count.
+
+Runs without a display: QT_QPA_PLATFORM=offscreen.
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+from benchmarks.common import temp_database, print_table
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+USER = {'id': 1, 'username': 'admin', 'full_name': 'Administrator', 'role': 'admin'}
+
+
+def seed(path, products):
+    from database.db_manager import DatabaseManager
+    from database.search_index import suspend_search_index, resume_search_index
+
+    db = DatabaseManager(path)
+    conn = db.conn
+    suspend_search_index(conn)
+    conn.executemany(
+        "INSERT INTO products (name, barcode, price, cost, quantity, min_quantity, category_id) "
+        "VALUES (?, ?, ?, ?, ?, 5, 1)",
+        ((f"Product {i}", f"{i:013d}", 10.0, 7.0, i % 50) for i in range(products)))
+    conn.commit()
+    resume_search_index(conn)
+
+
+def child(mode, started, path):
+    """Start the app over path in this process and print its milestones as JSON"""
+    from PyQt5.QtWidgets import QApplication
+    from PyQt5.QtCore import QObject, QEvent, QThreadPool
+
+    class FirstPaint(QObject):
+        def __init__(self, widget):
+            super().__init__()
+            self.at = None
+            widget.installEventFilter(self)
+
+        def eventFilter(self, obj, event):
+            if event.type() == QEvent.Paint and self.at is None:
+                self.at = time.time()
+            return False
+
+    def wait(app, done):
+        while not done():
+            app.processEvents()
+            time.sleep(0.0005)
+
+    # MainWindow and its tabs open DATABASE['path']
+    from config import DATABASE
+    DATABASE['path'] = path
+    from main import MainWindow
+
+    app = QApplication(sys.argv[:1])
+    app.setStyle('Fusion')
+    window = MainWindow()
+    if mode == 'eager':
+        for index in range(window.tabs.count()):
+            window.tabs.widget(index).ensure_built()
+        window.db_manager.load_catalog()
+    window.notifications.show_success = lambda title, message, duration=5000: None
+
+    login = FirstPaint(window.login_window)
+    wait(app, lambda: login.at is not None)
+
+    login_started = time.time()
+    window.login_window.login_successful.emit(USER)
+    dashboard = FirstPaint(window.dashboard.widget)
+    wait(app, lambda: dashboard.at is not None)
+
+    catalog = window.db_manager.pool.caches
+    wait(app, lambda: 'catalog' in catalog and catalog['catalog'].loaded)
+    catalog_ready = time.time()
+    QThreadPool.globalInstance().waitForDone()
+
+    print(json.dumps({
+        'login_visible': login.at - started,
+        'first_tab': dashboard.at - started,
+        'login_to_tab': dashboard.at - login_started,
+        'catalog_ready': catalog_ready - started,
+    }))
+    sys.stdout.flush()
+    # Skip the exit confirmation and teardown
+    os._exit(0)
+
+
+def measure(mode, path):
+    env = dict(os.environ, PYTHONPATH=ROOT + os.pathsep + os.environ.get('PYTHONPATH', ''))
+    started = time.time()
+    output = subprocess.run([sys.executable, '-m', 'benchmarks.bench_startup', '--child', mode, str(started), path],
+                            cwd=ROOT, env=env, capture_output=True, text=True, check=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--products', type=int, default=100000)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--child', nargs=3, metavar=('MODE', 'STARTED', 'DB'), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        child(args.child[0], float(args.child[1]), args.child[2])
+        return
+
+    rows = []
+    with temp_database() as path:
+        seed(path, args.products)
+        for mode in ('eager', 'lazy'):
+            runs = [measure(mode, path) for _ in range(args.repeat)]
+            best = {key: min(run[key] for run in runs) * 1000 for key in runs[0]}
+            rows.append([mode, f"{best['login_visible']:,.0f}", f"{best['first_tab']:,.0f}",
+                         f"{best['login_to_tab']:,.0f}", f"{best['catalog_ready']:,.0f}"])
+
+    print(f"{args.products:,} products; best of {args.repeat}, ms from process start")
+    print_table(['startup', 'login visible', 'first usable tab', 'login -> tab', 'catalog ready'], rows)
+
+
+if __name__ == '__main__':
+    main()
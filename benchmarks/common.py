@@ -0,0 +1,45 @@
+"""
+Shared helpers for the benchmark scripts.
+"""
+
+import os
+import shutil
+import tempfile
+import time
+from contextlib import contextmanager
+
+
+@contextmanager
+def temp_database(name='bench.db'):
+    """Yield a path to a fresh database file inside a temporary directory"""
+    directory = tempfile.mkdtemp(prefix='pos_bench_')
+    try:
+        yield os.path.join(directory, name)
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+def ops_per_second(fn, iterations):
+    """Call fn() iterations times and return the achieved rate"""
+    start = time.perf_counter()
+    for _ in range(iterations):
+        fn()
+    elapsed = time.perf_counter() - start
+    return iterations / elapsed if elapsed else float('inf')
+
+
+def timed(fn, *args, **kwargs):
+    """Return (result, seconds) for a single call"""
+    start = time.perf_counter()
+    result = fn(*args, **kwargs)
+    return result, time.perf_counter() - start
+
+
+def print_table(headers, rows):
+    """Print rows as a fixed-width text table"""
+    widths = [max(len(str(value)) for value in column) for column in zip(headers, *rows)]
+    line = '  '.join(f"{{:>{width}}}" for width in widths)
+    print(line.format(*headers))
+    print(line.format(*('-' * width for width in widths)))
+    for row in rows:
+        print(line.format(*row))
@@ -0,0 +1,71 @@
+"""
+Stress test: concurrent checkouts allocating invoice numbers.
+
+Several registers (terminals), each driven by a few worker threads, run
+checkouts against one database at the same time.  Every checkout must
+succeed on the first attempt and every invoice number must be unique.
+"""
+
+import argparse
+import threading
+import time
+
+from database.db_manager import DatabaseManager
+from database.invoice_sequence import InvoiceSequence
+from benchmarks.common import temp_database, print_table
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--invoices', type=int, default=100000)
+    parser.add_argument('--terminals', type=int, default=4)
+    parser.add_argument('--threads-per-terminal', type=int, default=2)
+    args = parser.parse_args()
+
+    workers = args.terminals * args.threads_per_terminal
+    per_worker = args.invoices // workers
+
+    with temp_database() as path:
+        db = DatabaseManager(path)
+        db.add_product('Stress item', '', '1', 1.0, 0.5, 10 ** 9, 1)
+
+        invoices = [[] for _ in range(workers)]
+        failures = [0] * workers
+
+        def run(worker):
+            local_db = DatabaseManager(path)
+            local_db.invoice_sequence = InvoiceSequence(f"T{worker % args.terminals + 1}")
+            items = [{'product_id': 1, 'quantity': 1, 'price': 1.0}]
+            for _ in range(per_worker):
+                sale = {'total_amount': 1.0, 'final_amount': 1.0, 'payment_method': 'Cash'}
+                if local_db.checkout(sale, items):
+                    invoices[worker].append(sale['invoice_number'])
+                else:
+                    failures[worker] += 1
+
+        threads = [threading.Thread(target=run, args=(n,)) for n in range(workers)]
+        start = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - start
+
+        allocated = [number for numbers in invoices for number in numbers]
+        stored = db.conn.execute("SELECT COUNT(*) FROM sales").fetchone()[0]
+        print_table(['metric', 'value'], [
+            ['workers', workers],
+            ['checkouts', f"{len(allocated):,}"],
+            ['failed', sum(failures)],
+            ['unique invoice numbers', f"{len(set(allocated)):,}"],
+            ['sales rows', f"{stored:,}"],
+            ['checkouts/sec', f"{len(allocated) / elapsed:,.0f}"],
+        ])
+
+        if sum(failures) or len(set(allocated)) != len(allocated) or stored != len(allocated):
+            raise SystemExit("FAILED: lost or duplicate invoices")
+        print("OK")
+
+
+if __name__ == '__main__':
+    main()
@@ -12,7 +12,50 @@ BASE_DIR = Path(__file__).resolve().parent
 DATABASE = {
     'name': 'pos.db',
     'path': os.path.join(BASE_DIR, 'database', 'pos.db'),
-    'backup_dir': os.path.join(BASE_DIR, 'database', 'backups')
+    'backup_dir': os.path.join(BASE_DIR, 'database', 'backups'),
+    # Connection pool settings (one long-lived connection per thread)
+    'pool': {
+        'journal_mode': 'WAL',
+        'synchronous': 'NORMAL',
+        'cache_size_kb': 16384,
+        'mmap_size': 256 * 1024 * 1024,
+        'busy_timeout': 5.0,
+        # SQLite's shared-cache mode trades the busy timeout for table-level
+        # locks, so it stays opt-in; mmap already shares OS pages between
+        # the per-thread connections.
+        'shared_cache': False
+    },
+    # Online backups copy this many pages per step and pause in between
+    # so checkout I/O is never starved
+    'backup': {
+        'pages_per_step': 1024,
+        'step_sleep': 0.005,
+        'compress_level': 1,
+        # Grandparent/parent/child retention: newest backup of each of the
+        # last N hours, days and months is kept, everything else is pruned
+        'retention': {
+            'hourly': 24,
+            'daily': 30,
+            'monthly': 12
+        }
+    },
+    # Closed fiscal years are moved to sales_<year>.db next to the database
+    'archive': {
+        'fiscal_year_start_month': 1,
+        # SQLite attaches at most 10 databases by default
+        'max_attached': 9
+    },
+    # Finished reports are cached until a table they read changes; least
+    # recently used reports are dropped beyond this many bytes
+    'report_cache': {
+        'max_bytes': 64 * 1024 * 1024
+    },
+    # Deduplicated backup repository: the database is split into chunks of
+    # this many pages and each distinct chunk is stored once
+    'backup_store': {
+        'dir': os.path.join(BASE_DIR, 'database', 'backups', 'store'),
+        'chunk_pages': 64
+    }
 }
 
 # Application settings
@@ -23,7 +66,11 @@ APP = {
     'default_language': 'ar',
     'default_currency': 'SAR',
     'date_format': '%Y-%m-%d',
-    'time_format': '%H:%M:%S'
+    'time_format': '%H:%M:%S',
+    # Invoice numbers are <prefix>-<terminal>-<YYYYMMDD>-<sequence>; give
+    # every register its own terminal id so they never share a counter
+    'invoice_prefix': 'INV',
+    'terminal_id': 'T1'
 }
 
 # UI settings
@@ -32,7 +79,12 @@ UI = {
     'font_family': 'Arial',
     'font_size': 10,
     'window_size': (1200, 800),
-    'min_window_size': (800, 600)
+    'min_window_size': (800, 600),
+    # Quiet time after the last keystroke before a product search runs
+    'search_debounce_ms': 150,
+    # Target time from New Sale to a painted, ready sale dialog; slower
+    # opens are logged as warnings
+    'sale_dialog_ready_ms': 30
 }
 
 # Logging settings
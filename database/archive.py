@@ -0,0 +1,284 @@
+"""
+Year-partitioned sales archive for the POS system.
+
+Closed fiscal years are moved out of the hot database into one file per
+year, ``sales_<year>.db`` next to the hot database.  Queries over a date
+range ATTACH only the partitions that range touches and read them with
+UNION ALL alongside the hot tables, so day-to-day queries, backups and
+VACUUM only ever deal with the current years.
+
+Archived rows keep their ids, so sale_items.sale_id still matches, and
+they stay counted in the daily rollup (see ``database.rollup``).
+"""
+
+import argparse
+import os
+import re
+import sqlite3
+import time
+from contextlib import contextmanager
+from datetime import datetime
+
+from config import DATABASE
+from utils.logger import setup_logger, log_info, log_error
+
+logger = setup_logger('database.archive')
+
+ARCHIVED_TABLES = ('sales', 'sale_items')
+PARTITION_FILE = re.compile(r'^sales_(\d{4})\.db$')
+
+
+def fiscal_year_bounds(year):
+    """Return the [start, end) epoch range of a fiscal year"""
+    month = DATABASE['archive']['fiscal_year_start_month']
+    start = datetime(year, month, 1)
+    end = datetime(year + 1, month, 1)
+    return int(start.timestamp()), int(end.timestamp())
+
+
+def fiscal_year_of(ts):
+    """Return the fiscal year an epoch timestamp falls in"""
+    moment = datetime.fromtimestamp(ts)
+    if moment.month < DATABASE['archive']['fiscal_year_start_month']:
+        return moment.year - 1
+    return moment.year
+
+
+def partition_path(db_path, year):
+    return os.path.join(os.path.dirname(os.path.abspath(db_path)), f"sales_{year}.db")
+
+
+def archived_years(db_path):
+    """List the years that have a partition file next to db_path"""
+    directory = os.path.dirname(os.path.abspath(db_path))
+    years = []
+    for filename in os.listdir(directory):
+        match = PARTITION_FILE.match(filename)
+        if match:
+            years.append(int(match.group(1)))
+    return sorted(years)
+
+
+def partitions_for_range(db_path, start_ts=None, end_ts=None):
+    """Years whose partition overlaps the half-open range [start_ts, end_ts)"""
+    years = archived_years(db_path)
+    if start_ts is not None:
+        years = [y for y in years if y >= fiscal_year_of(start_ts)]
+    if end_ts is not None:
+        years = [y for y in years if y <= fiscal_year_of(end_ts - 1)]
+    return years
+
+
+@contextmanager
+def attached_partitions(conn, db_path, start_ts=None, end_ts=None):
+    """
+    ATTACH the partitions a date range touches for the duration of a block.
+
+    ATTACH and DETACH are not allowed inside a transaction, so the
+    connection must have none open when partitions are needed; the
+    caller's pending work is never committed behind its back. The block is
+    meant for reads: a transaction it leaves open is rolled back so the
+    partitions can be detached, and reported as an error.
+
+    Yields:
+        list: Schema names of the attached partitions, e.g. ['sales_2023']
+
+    Raises:
+        sqlite3.OperationalError: Too many partitions, or a transaction
+            open on the connection before or after the block
+    """
+    years = partitions_for_range(db_path, start_ts, end_ts)
+    limit = DATABASE['archive']['max_attached']
+    if len(years) > limit:
+        raise sqlite3.OperationalError(
+            f"Date range spans {len(years)} archived years; at most {limit} can be attached")
+
+    if years and conn.in_transaction:
+        raise sqlite3.OperationalError(
+            "Cannot attach archive partitions inside an open transaction; commit or roll back first")
+    schemas = []
+    left_open = False
+    try:
+        for year in years:
+            schema = f"sales_{year}"
+            conn.execute(f"ATTACH DATABASE ? AS {schema}", (partition_path(db_path, year),))
+            schemas.append(schema)
+        yield schemas
+    finally:
+        if schemas and conn.in_transaction:
+            left_open = True
+            conn.rollback()
+        for schema in schemas:
+            conn.execute(f"DETACH DATABASE {schema}")
+    if left_open:
+        raise sqlite3.OperationalError("Transaction left open while archive partitions were attached; rolled back")
+
+
+def union_query(conn, table, schemas, conditions=(), params=(), columns=None):
+    """
+    Build a UNION ALL over the hot table and its attached partitions.
+
+    Every branch selects the same columns, by default all of the hot
+    table's; a column a partition does not have yet reads as NULL. The
+    conditions are repeated in every branch so each one can use its own
+    created_ts index. Naming only the needed columns lets aggregates stay
+    index-only scans.
+
+    Returns:
+        tuple: (sql, params)
+    """
+    if columns is None:
+        columns = [row[1] for row in conn.execute(f"PRAGMA main.table_info({table})")]
+    where = f" WHERE {' AND '.join(conditions)}" if conditions else ""
+    branches = [f"SELECT {', '.join(columns)} FROM main.{table}{where}"]
+    for schema in schemas:
+        present = {row[1] for row in conn.execute(f"PRAGMA {schema}.table_info({table})")}
+        select = ', '.join(c if c in present else f"NULL AS {c}" for c in columns)
+        branches.append(f"SELECT {select} FROM {schema}.{table}{where}")
+    return " UNION ALL ".join(branches), list(params) * len(branches)
+
+
+def _create_partition(conn, path):
+    """Create a partition file with the hot database's table definitions
+
+    A partition created before a migration added columns to the hot tables
+    gets them too, so archiving can keep copying rows with SELECT *.
+    """
+    partition = sqlite3.connect(path)
+    try:
+        for table in ARCHIVED_TABLES:
+            sql = conn.execute("SELECT sql FROM sqlite_master WHERE type = 'table' AND name = ?",
+                               (table,)).fetchone()[0]
+            partition.execute(sql.replace("CREATE TABLE", "CREATE TABLE IF NOT EXISTS", 1))
+            present = {row[1] for row in partition.execute(f"PRAGMA table_info({table})")}
+            for _, column, column_type, _, _, _ in conn.execute(f"PRAGMA main.table_info({table})"):
+                if column not in present:
+                    partition.execute(f"ALTER TABLE {table} ADD COLUMN {column} {column_type}")
+        partition.execute("CREATE INDEX IF NOT EXISTS idx_sales_created_ts ON sales (created_ts, final_amount)")
+        partition.execute("CREATE INDEX IF NOT EXISTS idx_sale_items_created_ts ON sale_items (created_ts)")
+        partition.execute("CREATE INDEX IF NOT EXISTS idx_sale_items_sale_id ON sale_items (sale_id)")
+        partition.commit()
+    finally:
+        partition.close()
+
+
+def archive_year(conn, db_path, year):
+    """
+    Move one closed fiscal year of sales into its partition file.
+
+    Rows are copied and deleted in a single transaction. Copies use INSERT
+    OR REPLACE, so re-running after an interruption is safe.
+
+    Args:
+        conn (sqlite3.Connection): Connection to the hot database
+        db_path (str): Path of the hot database
+        year (int): Fiscal year to archive
+
+    Returns:
+        int: Number of sales moved, or None on error
+    """
+    start_ts, end_ts = fiscal_year_bounds(year)
+    if end_ts > time.time():
+        log_error(logger, f"Fiscal year {year} is not closed yet")
+        return None
+
+    # database.rollup reads the partitions through this module
+    from database.rollup import add_rows, aggregate
+
+    path = partition_path(db_path, year)
+    schema = f"sales_{year}"
+    try:
+        _create_partition(conn, path)
+        if conn.in_transaction:
+            conn.commit()
+        conn.execute(f"ATTACH DATABASE ? AS {schema}", (path,))
+        try:
+            start = time.perf_counter()
+            conn.execute("BEGIN IMMEDIATE")
+            sale_ids = "SELECT id FROM main.sales WHERE created_ts >= ? AND created_ts < ?"
+            conn.execute(f"INSERT OR REPLACE INTO {schema}.sales SELECT * FROM main.sales "
+                         f"WHERE created_ts >= ? AND created_ts < ?", (start_ts, end_ts))
+            conn.execute(f"INSERT OR REPLACE INTO {schema}.sale_items SELECT * FROM main.sale_items "
+                         f"WHERE sale_id IN ({sale_ids})", (start_ts, end_ts))
+            conn.execute(f"DELETE FROM main.sale_items WHERE sale_id IN ({sale_ids})", (start_ts, end_ts))
+            moved = conn.execute("DELETE FROM main.sales WHERE created_ts >= ? AND created_ts < ?",
+                                 (start_ts, end_ts)).rowcount
+            # The delete triggers took the year out of the daily rollup;
+            # archived sales still count, so add them back from the partition
+            add_rows(conn, *aggregate(conn, schema, start_ts, end_ts))
+            conn.commit()
+        except Exception:
+            if conn.in_transaction:
+                conn.rollback()
+            raise
+        finally:
+            conn.execute(f"DETACH DATABASE {schema}")
+
+        log_info(logger, f"Archived {moved} sales of {year} into {path}",
+                 {"duration": round(time.perf_counter() - start, 3)})
+        return moved
+    except Exception as e:
+        log_error(logger, e, {"operation": "archive_year", "year": year})
+        return None
+
+
+def closed_years(conn):
+    """Fiscal years before the current one that still have sales in the hot database"""
+    row = conn.execute("SELECT MIN(created_ts) FROM sales").fetchone()
+    if row[0] is None:
+        return []
+    current = fiscal_year_of(time.time())
+    return list(range(fiscal_year_of(row[0]), current))
+
+
+def archive_closed_years(conn, db_path, vacuum=False):
+    """
+    Archive every closed fiscal year still held in the hot database.
+
+    Args:
+        vacuum (bool): VACUUM the hot database afterwards to return the space
+
+    Returns:
+        dict: Sales moved per year
+    """
+    moved = {}
+    for year in closed_years(conn):
+        count = archive_year(conn, db_path, year)
+        if count:
+            moved[year] = count
+    if vacuum and moved:
+        conn.execute("VACUUM")
+    return moved
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Move closed fiscal years into per-year archive files")
+    parser.add_argument('--db', default=DATABASE['path'], help="Hot database path, defaults to the POS database")
+    parser.add_argument('--year', type=int, help="Archive only this fiscal year")
+    parser.add_argument('--vacuum', action='store_true', help="VACUUM the hot database afterwards")
+    args = parser.parse_args()
+
+    if args.db == DATABASE['path']:
+        from database.db_manager import adopt_legacy_database
+        adopt_legacy_database(args.db)
+    # sqlite3.connect would silently create an empty database instead
+    if not os.path.exists(args.db):
+        parser.error(f"database not found: {args.db}")
+
+    conn = sqlite3.connect(args.db)
+    try:
+        if args.year:
+            moved = {args.year: archive_year(conn, args.db, args.year)}
+            if args.vacuum:
+                conn.execute("VACUUM")
+        else:
+            moved = archive_closed_years(conn, args.db, args.vacuum)
+    finally:
+        conn.close()
+
+    for year, count in sorted(moved.items()):
+        print(f"{year}: {count} sales archived")
+
+
+if __name__ == '__main__':
+    main()
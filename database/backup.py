@@ -2,58 +2,283 @@
 Database backup utility for the POS system.
 """
 
+import gzip
+import json
 import os
 import shutil
+import sqlite3
+import threading
+import time
 from datetime import datetime
 from config import DATABASE
+from database.migrate import migrate
+from database.pool import get_pool
 from utils.logger import setup_logger, log_info, log_error
 
 logger = setup_logger('database.backup')
 
-def create_backup():
+BACKUP_PREFIX = 'pos_backup_'
+INDEX_FILENAME = 'backup_index.json'
+STREAM_BUFFER = 1024 * 1024
+
+_index_lock = threading.Lock()
+
+def _index_path():
+    return os.path.join(DATABASE['backup_dir'], INDEX_FILENAME)
+
+def _scan_backups():
+    """Rebuild index entries from the files in the backup directory"""
+    entries = []
+    for filename in os.listdir(DATABASE['backup_dir']):
+        if filename.startswith(BACKUP_PREFIX) and (filename.endswith('.db') or filename.endswith('.db.gz')):
+            path = os.path.join(DATABASE['backup_dir'], filename)
+            stamp = filename[len(BACKUP_PREFIX):].split('.')[0]
+            size = os.path.getsize(path)
+            entries.append({
+                'path': path,
+                'created_at': datetime.strptime(stamp, '%Y%m%d_%H%M%S').isoformat(),
+                'size': size,
+                'original_size': size if filename.endswith('.db') else None,
+                'ratio': 1.0 if filename.endswith('.db') else None,
+                'duration': None
+            })
+    return entries
+
+def _load_index():
+    """Read the backup index, building it from the directory on first use"""
+    try:
+        with open(_index_path(), encoding='utf-8') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return _scan_backups()
+
+def _save_index(entries):
+    partial_path = _index_path() + '.partial'
+    with open(partial_path, 'w', encoding='utf-8') as f:
+        json.dump(sorted(entries, key=lambda e: e['created_at'], reverse=True), f, indent=1)
+    os.replace(partial_path, _index_path())
+
+def compress_file(source_path, target_path, level=None):
     """
-    Create a backup of the database.
+    Stream-compress a file with gzip using a fixed-size buffer.
+    
+    Returns:
+        int: Size of the compressed file in bytes
+    """
+    level = DATABASE['backup']['compress_level'] if level is None else level
+    with open(source_path, 'rb') as source, gzip.open(target_path, 'wb', compresslevel=level) as target:
+        shutil.copyfileobj(source, target, STREAM_BUFFER)
+    return os.path.getsize(target_path)
+
+def verify_database(path):
+    """
+    Run PRAGMA quick_check on a database file.
+    
+    Args:
+        path (str): Path to the database file
+        
+    Returns:
+        bool: True if the file passed the check
+    """
+    conn = sqlite3.connect(path)
+    try:
+        result = conn.execute("PRAGMA quick_check").fetchone()[0]
+        return result == 'ok'
+    finally:
+        conn.close()
+
+def snapshot_database(db_path, target_path, progress=None, pages=None, sleep=None):
+    """
+    Copy a live database into target_path with the SQLite online backup API.
+    
+    Pages are copied in batches with a pause between steps. A read
+    transaction is held on the source for the whole copy, so in WAL mode
+    concurrent writers are never blocked and never force the copy to restart.
+    
+    Args:
+        db_path (str): Path to the live database
+        target_path (str): Path of the file to create
+        progress (callable, optional): Called as progress(copied, total) pages
+        pages (int, optional): Pages per step
+        sleep (float, optional): Seconds to pause between steps
+    """
+    settings = DATABASE['backup']
+    source = sqlite3.connect(db_path)
+    target = sqlite3.connect(target_path)
+    try:
+        source.execute("BEGIN")
+        source.execute("SELECT COUNT(*) FROM sqlite_master").fetchone()
+
+        def report(status, remaining, total):
+            if progress:
+                progress(total - remaining, total)
+
+        source.backup(target,
+                      pages=pages or settings['pages_per_step'],
+                      progress=report,
+                      sleep=settings['step_sleep'] if sleep is None else sleep)
+        source.rollback()
+    finally:
+        target.close()
+        source.close()
+
+def create_backup(db_path=None, progress=None, prune=True):
+    """
+    Create an online, compressed backup of the database.
+    
+    The snapshot is verified with quick_check, stream-compressed with gzip
+    and only then renamed into the backup directory. The backup is recorded
+    in the backup index and the retention policy is applied.
+    
+    Args:
+        db_path (str, optional): Database to back up, defaults to DATABASE['path']
+        progress (callable, optional): Called as progress(copied, total) pages
+        prune (bool): Apply the retention policy afterwards
     
     Returns:
         str: Path to the backup file if successful, None otherwise
     """
+    snapshot_path = partial_path = None
     try:
+        start = time.perf_counter()
+        
         # Create backup filename with timestamp
-        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-        backup_filename = f"pos_backup_{timestamp}.db"
+        now = datetime.now()
+        backup_filename = f"{BACKUP_PREFIX}{now.strftime('%Y%m%d_%H%M%S')}.db.gz"
         backup_path = os.path.join(DATABASE['backup_dir'], backup_filename)
+        snapshot_path = backup_path + '.snapshot'
+        partial_path = backup_path + '.partial'
         
-        # Copy database file to backup location
-        shutil.copy2(DATABASE['path'], backup_path)
+        snapshot_database(db_path or DATABASE['path'], snapshot_path, progress)
         
-        log_info(logger, f"Database backup created successfully: {backup_path}")
+        if not verify_database(snapshot_path):
+            log_error(logger, f"Backup failed quick_check: {snapshot_path}")
+            return None
+        
+        original_size = os.path.getsize(snapshot_path)
+        size = compress_file(snapshot_path, partial_path)
+        os.replace(partial_path, backup_path)
+        
+        entry = {
+            'path': backup_path,
+            'created_at': now.isoformat(timespec='seconds'),
+            'size': size,
+            'original_size': original_size,
+            'ratio': round(size / original_size, 4) if original_size else None,
+            'duration': round(time.perf_counter() - start, 3)
+        }
+        with _index_lock:
+            entries = [e for e in _load_index() if e['path'] != backup_path]
+            entries.append(entry)
+            _save_index(entries)
+        
+        log_info(logger, f"Database backup created successfully: {backup_path}", {
+            "size": size, "original_size": original_size, "duration": entry['duration']
+        })
+        if prune:
+            apply_retention()
         return backup_path
     except Exception as e:
         log_error(logger, e, {"operation": "create_backup"})
         return None
+    finally:
+        for path in (snapshot_path, partial_path):
+            if path and os.path.exists(path):
+                os.remove(path)
 
-def restore_backup(backup_path):
+class BackupThread(threading.Thread):
+    """
+    Runs create_backup on a background thread.
+    
+    Args:
+        db_path (str, optional): Database to back up
+        progress (callable, optional): Called as progress(copied, total) pages
+        finished (callable, optional): Called with the backup path or None
+    """
+    
+    def __init__(self, db_path=None, progress=None, finished=None):
+        super().__init__(name='database-backup', daemon=True)
+        self.db_path = db_path
+        self.progress = progress
+        self.finished = finished
+        self.result = None
+    
+    def run(self):
+        # Registered with the pool so a restore waits for the copy to end
+        with get_pool(self.db_path or DATABASE['path']).worker():
+            self.result = create_backup(self.db_path, self.progress)
+        if self.finished:
+            self.finished(self.result)
+
+def _extract_backup(backup_path, target_path):
+    """Write the database contained in a backup file to target_path"""
+    if backup_path.endswith('.json'):
+        # Manifest: rebuild the file from the store's chunks
+        from database.backup_store import BackupStore
+        store = BackupStore(os.path.dirname(os.path.dirname(backup_path)))
+        backup_id = os.path.basename(backup_path)[:-len('.json')]
+        if not store.restore(backup_id, target_path):
+            raise ValueError(f"Could not rebuild backup {backup_id}")
+        return
+    
+    opener = gzip.open if backup_path.endswith('.gz') else open
+    with opener(backup_path, 'rb') as source, open(target_path, 'wb') as target:
+        shutil.copyfileobj(source, target, STREAM_BUFFER)
+        target.flush()
+        os.fsync(target.fileno())
+
+def restore_backup(backup_path, db_path=None, safety_backup=True):
     """
     Restore database from a backup file.
     
+    The backup is stream-decompressed into a temporary file next to the
+    database and checked with quick_check. Once no other thread holds a
+    pooled connection or runs a pool worker (waiting up to the busy
+    timeout), the pooled connections are closed, the file is renamed over
+    the database in one step, stale WAL files are removed and every
+    registered cache is invalidated. Threads reopen their connection on
+    next use.
+    
     Args:
-        backup_path (str): Path to the backup file
+        backup_path (str): Path to a backup file (.db or .db.gz), or to a
+            manifest in a deduplicated backup store
+        db_path (str, optional): Database to replace, defaults to DATABASE['path']
+        safety_backup (bool): Back up the current database first
         
     Returns:
         bool: True if restore was successful, False otherwise
     """
+    db_path = db_path or DATABASE['path']
+    restore_path = db_path + '.restore'
     try:
         if not os.path.exists(backup_path):
             log_error(logger, f"Backup file not found: {backup_path}")
             return False
-            
-        # Create a backup of current database before restore
-        current_backup = create_backup()
         
-        # Restore from backup
-        shutil.copy2(backup_path, DATABASE['path'])
+        start = time.perf_counter()
+        _extract_backup(backup_path, restore_path)
+        if not verify_database(restore_path):
+            log_error(logger, f"Backup failed quick_check: {backup_path}")
+            return False
+        
+        # Create a backup of current database before restore. Retention
+        # is skipped so it cannot prune the backup being restored.
+        current_backup = create_backup(db_path, prune=False) if safety_backup else None
+        
+        pool = get_pool(db_path)
+        with pool.exclusive(DATABASE['pool']['busy_timeout']):
+            os.replace(restore_path, db_path)
+            for suffix in ('-wal', '-shm'):
+                if os.path.exists(db_path + suffix):
+                    os.remove(db_path + suffix)
+            # The restored file may predate the latest migrations
+            migrate(pool.connection())
+        pool.invalidate_caches()
         
-        log_info(logger, f"Database restored successfully from: {backup_path}")
+        log_info(logger, f"Database restored successfully from: {backup_path}", {
+            "previous_database": current_backup,
+            "duration": round(time.perf_counter() - start, 3)
+        })
         return True
     except Exception as e:
         log_error(logger, e, {
@@ -61,21 +286,22 @@ def restore_backup(backup_path):
             "backup_path": backup_path
         })
         return False
+    finally:
+        if os.path.exists(restore_path):
+            os.remove(restore_path)
 
 def list_backups():
     """
-    List all available database backups.
+    List all available database backups from the backup index.
     
     Returns:
-        list: List of backup file paths
+        list: Dicts with path, created_at, size, original_size, ratio and
+        duration, newest first
     """
     try:
-        backups = []
-        for filename in os.listdir(DATABASE['backup_dir']):
-            if filename.startswith('pos_backup_') and filename.endswith('.db'):
-                backup_path = os.path.join(DATABASE['backup_dir'], filename)
-                backups.append(backup_path)
-        return sorted(backups, reverse=True)
+        with _index_lock:
+            entries = _load_index()
+        return sorted(entries, key=lambda e: e['created_at'], reverse=True)
     except Exception as e:
         log_error(logger, e, {"operation": "list_backups"})
         return []
@@ -91,11 +317,16 @@ def delete_backup(backup_path):
         bool: True if deletion was successful, False otherwise
     """
     try:
-        if not os.path.exists(backup_path):
-            log_error(logger, f"Backup file not found: {backup_path}")
-            return False
-            
-        os.remove(backup_path)
+        with _index_lock:
+            entries = _load_index()
+            remaining = [e for e in entries if e['path'] != backup_path]
+            if os.path.exists(backup_path):
+                os.remove(backup_path)
+            elif len(remaining) == len(entries):
+                log_error(logger, f"Backup file not found: {backup_path}")
+                return False
+            _save_index(remaining)
+        
         log_info(logger, f"Backup file deleted: {backup_path}")
         return True
     except Exception as e:
@@ -103,4 +334,57 @@ def delete_backup(backup_path):
             "operation": "delete_backup",
             "backup_path": backup_path
         })
-        return False 
\ No newline at end of file
+        return False
+
+def select_retained(entries, policy=None):
+    """
+    Pick the backups a grandparent/parent/child policy keeps.
+    
+    For each period (hour, day, month) the newest backup of each of the
+    most recent N periods that have a backup is kept.
+    
+    Args:
+        entries (list): Backup index entries
+        policy (dict, optional): hourly/daily/monthly counts
+        
+    Returns:
+        set: Paths of the backups to keep
+    """
+    policy = policy or DATABASE['backup']['retention']
+    newest_first = sorted(entries, key=lambda e: e['created_at'], reverse=True)
+    keep = set()
+    for period, bucket_format in (('hourly', '%Y%m%d%H'), ('daily', '%Y%m%d'), ('monthly', '%Y%m')):
+        buckets = set()
+        for entry in newest_first:
+            bucket = datetime.fromisoformat(entry['created_at']).strftime(bucket_format)
+            if bucket in buckets:
+                continue
+            if len(buckets) >= policy.get(period, 0):
+                break
+            buckets.add(bucket)
+            keep.add(entry['path'])
+    return keep
+
+def apply_retention(policy=None):
+    """
+    Delete the backups the retention policy does not keep.
+    
+    Returns:
+        list: Paths of the deleted backups
+    """
+    try:
+        with _index_lock:
+            entries = _load_index()
+            keep = select_retained(entries, policy)
+            pruned = [e['path'] for e in entries if e['path'] not in keep]
+            for path in pruned:
+                if os.path.exists(path):
+                    os.remove(path)
+            _save_index([e for e in entries if e['path'] in keep])
+        
+        if pruned:
+            log_info(logger, f"Retention pruned {len(pruned)} backups")
+        return pruned
+    except Exception as e:
+        log_error(logger, e, {"operation": "apply_retention"})
+        return []
\ No newline at end of file
@@ -0,0 +1,254 @@
+"""
+Incremental, deduplicated backup repository for the POS system.
+
+A consistent snapshot of the database is split into fixed-size chunks of
+whole pages.  Each chunk is stored once under its SHA-256 hash, so a backup
+only writes the chunks that changed since any earlier backup.  A backup is
+a small JSON manifest listing its chunk hashes in order.
+
+Layout::
+
+    <store>/chunks/<hh>/<sha256>
+    <store>/manifests/<backup id>.json
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import sqlite3
+import time
+from datetime import datetime
+
+from config import DATABASE
+from database.backup import snapshot_database, verify_database
+from utils.logger import setup_logger, log_info, log_error
+
+logger = setup_logger('database.backup_store')
+
+
+def _write_atomic(path, data):
+    partial_path = path + '.partial'
+    with open(partial_path, 'wb') as f:
+        f.write(data)
+    os.replace(partial_path, path)
+
+
+class BackupStore:
+    """
+    Content-addressed store of database backups.
+
+    Args:
+        root (str, optional): Store directory, defaults to the configured one
+        chunk_pages (int, optional): Pages per chunk
+    """
+
+    def __init__(self, root=None, chunk_pages=None):
+        settings = DATABASE['backup_store']
+        self.root = root or settings['dir']
+        self.chunk_pages = chunk_pages or settings['chunk_pages']
+        self.chunks_dir = os.path.join(self.root, 'chunks')
+        self.manifests_dir = os.path.join(self.root, 'manifests')
+        os.makedirs(self.chunks_dir, exist_ok=True)
+        os.makedirs(self.manifests_dir, exist_ok=True)
+
+    def chunk_path(self, digest):
+        return os.path.join(self.chunks_dir, digest[:2], digest)
+
+    def manifest_path(self, backup_id):
+        return os.path.join(self.manifests_dir, f"{backup_id}.json")
+
+    def _store_chunk(self, digest, data):
+        """Store a chunk unless it is already present; return bytes written"""
+        path = self.chunk_path(digest)
+        if os.path.exists(path):
+            return 0
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        _write_atomic(path, data)
+        return len(data)
+
+    def create_backup(self, db_path=None, progress=None):
+        """
+        Back up a live database, storing only chunks not already in the store.
+
+        Args:
+            db_path (str, optional): Database to back up, defaults to DATABASE['path']
+            progress (callable, optional): Called as progress(copied, total) pages
+                while the snapshot is taken
+
+        Returns:
+            dict: The manifest, including bytes_written and full_size
+        """
+        start = time.perf_counter()
+        backup_id = datetime.now().strftime('%Y%m%d_%H%M%S_%f')
+        snapshot_path = os.path.join(self.root, f"{backup_id}.snapshot")
+        try:
+            snapshot_database(db_path or DATABASE['path'], snapshot_path, progress)
+
+            conn = sqlite3.connect(snapshot_path)
+            try:
+                page_size = conn.execute("PRAGMA page_size").fetchone()[0]
+            finally:
+                conn.close()
+            chunk_size = page_size * self.chunk_pages
+
+            chunks = []
+            bytes_written = 0
+            full_size = 0
+            with open(snapshot_path, 'rb') as f:
+                while True:
+                    data = f.read(chunk_size)
+                    if not data:
+                        break
+                    digest = hashlib.sha256(data).hexdigest()
+                    bytes_written += self._store_chunk(digest, data)
+                    full_size += len(data)
+                    chunks.append(digest)
+
+            manifest = {
+                'id': backup_id,
+                'created_at': datetime.now().isoformat(timespec='seconds'),
+                'source': os.path.abspath(db_path or DATABASE['path']),
+                'page_size': page_size,
+                'chunk_size': chunk_size,
+                'full_size': full_size,
+                'bytes_written': bytes_written,
+                'duration': round(time.perf_counter() - start, 3),
+                'chunks': chunks
+            }
+            _write_atomic(self.manifest_path(backup_id),
+                          json.dumps(manifest, indent=1).encode('utf-8'))
+
+            log_info(logger, f"Backup {backup_id}: wrote {bytes_written:,} of "
+                             f"{full_size:,} bytes ({len(chunks)} chunks)")
+            return manifest
+        except Exception as e:
+            log_error(logger, e, {"operation": "create_backup", "store": self.root})
+            return None
+        finally:
+            if os.path.exists(snapshot_path):
+                os.remove(snapshot_path)
+
+    def load_manifest(self, backup_id):
+        with open(self.manifest_path(backup_id), encoding='utf-8') as f:
+            return json.load(f)
+
+    def list_backups(self):
+        """
+        List the backups in the store.
+
+        Returns:
+            list: Manifests without their chunk lists, newest first
+        """
+        backups = []
+        for filename in os.listdir(self.manifests_dir):
+            if filename.endswith('.json'):
+                manifest = self.load_manifest(filename[:-5])
+                manifest.pop('chunks', None)
+                backups.append(manifest)
+        return sorted(backups, key=lambda m: m['id'], reverse=True)
+
+    def restore(self, backup_id, target_path):
+        """
+        Rebuild a database file from a manifest.
+
+        The file is assembled next to target_path, every chunk is checked
+        against its hash, and the result must pass quick_check before it
+        replaces target_path.
+
+        Returns:
+            bool: True if the file was rebuilt
+        """
+        partial_path = target_path + '.partial'
+        try:
+            manifest = self.load_manifest(backup_id)
+            with open(partial_path, 'wb') as out:
+                for digest in manifest['chunks']:
+                    with open(self.chunk_path(digest), 'rb') as f:
+                        data = f.read()
+                    if hashlib.sha256(data).hexdigest() != digest:
+                        raise ValueError(f"Corrupt chunk {digest}")
+                    out.write(data)
+
+            if not verify_database(partial_path):
+                raise ValueError(f"Rebuilt backup {backup_id} failed quick_check")
+
+            os.replace(partial_path, target_path)
+            log_info(logger, f"Backup {backup_id} rebuilt into {target_path}")
+            return True
+        except Exception as e:
+            log_error(logger, e, {"operation": "restore", "backup_id": backup_id})
+            if os.path.exists(partial_path):
+                os.remove(partial_path)
+            return False
+
+    def delete_backup(self, backup_id):
+        """Delete a manifest; its chunks are reclaimed by collect_garbage"""
+        path = self.manifest_path(backup_id)
+        if not os.path.exists(path):
+            return False
+        os.remove(path)
+        return True
+
+    def collect_garbage(self):
+        """
+        Remove chunks no manifest references.
+
+        Returns:
+            tuple: (chunks removed, bytes freed)
+        """
+        referenced = set()
+        for filename in os.listdir(self.manifests_dir):
+            if filename.endswith('.json'):
+                referenced.update(self.load_manifest(filename[:-5])['chunks'])
+
+        removed = 0
+        freed = 0
+        for directory in os.listdir(self.chunks_dir):
+            directory_path = os.path.join(self.chunks_dir, directory)
+            for digest in os.listdir(directory_path):
+                if digest not in referenced:
+                    path = os.path.join(directory_path, digest)
+                    freed += os.path.getsize(path)
+                    os.remove(path)
+                    removed += 1
+
+        log_info(logger, f"Garbage collection removed {removed} chunks ({freed:,} bytes)")
+        return removed, freed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Deduplicated database backups")
+    parser.add_argument('--store', help="Store directory")
+    commands = parser.add_subparsers(dest='command', required=True)
+    backup = commands.add_parser('backup', help="Back up a database")
+    backup.add_argument('db_path', nargs='?')
+    commands.add_parser('list', help="List backups")
+    restore = commands.add_parser('restore', help="Rebuild a database file from a backup")
+    restore.add_argument('backup_id')
+    restore.add_argument('target_path')
+    delete = commands.add_parser('delete', help="Delete a backup manifest")
+    delete.add_argument('backup_id')
+    commands.add_parser('gc', help="Remove unreferenced chunks")
+    args = parser.parse_args()
+
+    store = BackupStore(args.store)
+    if args.command == 'backup':
+        manifest = store.create_backup(args.db_path)
+        if manifest:
+            print(f"{manifest['id']}: wrote {manifest['bytes_written']:,} bytes "
+                  f"(full copy: {manifest['full_size']:,} bytes)")
+    elif args.command == 'list':
+        for manifest in store.list_backups():
+            print(f"{manifest['id']}  {manifest['full_size']:>14,}  {manifest['bytes_written']:>14,}")
+    elif args.command == 'restore':
+        store.restore(args.backup_id, args.target_path)
+    elif args.command == 'delete':
+        store.delete_backup(args.backup_id)
+    elif args.command == 'gc':
+        removed, freed = store.collect_garbage()
+        print(f"Removed {removed} chunks, freed {freed:,} bytes")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,113 @@
+"""
+In-memory product catalog for the POS scan path.
+
+The catalog is loaded once per database and then kept current from the
+product insert/update/delete events raised by ``DatabaseManager``, so a
+barcode scan resolves with a dictionary lookup instead of a SQL round trip.
+"""
+
+
+class ProductRecord:
+    """Compact product row; supports ``record['name']`` like sqlite3.Row"""
+
+    __slots__ = ('id', 'name', 'barcode', 'price', 'cost', 'quantity',
+                 'min_quantity', 'category_id')
+
+    def __init__(self, id, name, barcode, price, cost, quantity, min_quantity, category_id):
+        self.id = id
+        self.name = name
+        self.barcode = barcode
+        self.price = price
+        self.cost = cost
+        self.quantity = quantity
+        self.min_quantity = min_quantity
+        self.category_id = category_id
+
+    def __getitem__(self, key):
+        try:
+            return getattr(self, key)
+        except AttributeError:
+            raise KeyError(key) from None
+
+    def get(self, key, default=None):
+        return getattr(self, key, default)
+
+    def keys(self):
+        return self.__slots__
+
+    def __repr__(self):
+        return f"ProductRecord(id={self.id!r}, barcode={self.barcode!r}, name={self.name!r})"
+
+
+class CatalogCache:
+    """Products indexed by id and by barcode"""
+
+    COLUMNS = "id, name, barcode, price, cost, quantity, min_quantity, category_id"
+
+    def __init__(self):
+        self.by_id = {}
+        self.by_barcode = {}
+        self.loaded = False
+        # Bumped on every change so dependent indexes know when to rebuild
+        self.version = 0
+
+    def load(self, conn):
+        """Load the whole catalog in one query"""
+        by_id = {}
+        by_barcode = {}
+        for row in conn.execute(f"SELECT {self.COLUMNS} FROM products"):
+            record = ProductRecord(*row)
+            by_id[record.id] = record
+            if record.barcode:
+                by_barcode[record.barcode] = record
+        self.by_id = by_id
+        self.by_barcode = by_barcode
+        self.loaded = True
+        self.version += 1
+
+    def get(self, product_id):
+        return self.by_id.get(product_id)
+
+    def get_by_barcode(self, barcode):
+        return self.by_barcode.get(barcode)
+
+    def __len__(self):
+        return len(self.by_id)
+
+    def refresh(self, conn, product_id):
+        """Re-read one product after an insert or update"""
+        row = conn.execute(f"SELECT {self.COLUMNS} FROM products WHERE id = ?",
+                           (product_id,)).fetchone()
+        if row is None:
+            self.discard(product_id)
+        else:
+            self.upsert(ProductRecord(*row))
+
+    def upsert(self, record):
+        previous = self.by_id.get(record.id)
+        if previous is not None and previous.barcode and previous.barcode != record.barcode:
+            self.by_barcode.pop(previous.barcode, None)
+        self.by_id[record.id] = record
+        if record.barcode:
+            self.by_barcode[record.barcode] = record
+        self.version += 1
+
+    def discard(self, product_id):
+        record = self.by_id.pop(product_id, None)
+        if record is not None:
+            if record.barcode and self.by_barcode.get(record.barcode) is record:
+                del self.by_barcode[record.barcode]
+            self.version += 1
+
+    def adjust_quantity(self, product_id, delta):
+        """Apply a committed stock change without re-reading the row"""
+        record = self.by_id.get(product_id)
+        if record is not None:
+            record.quantity += delta
+
+    def invalidate(self):
+        """Forget everything; the next access reloads from the database"""
+        self.by_id = {}
+        self.by_barcode = {}
+        self.loaded = False
+        self.version += 1
@@ -1,42 +1,98 @@
-import sqlite3
 import os
+import re
+import sqlite3
 import time
+import unicodedata
+from contextlib import contextmanager
 from datetime import datetime
 
+from config import DATABASE
+from .pool import get_pool
+from .migrate import migrate
+from .catalog import CatalogCache
+from .prefix_index import ProductPrefixIndex
+from .report_cache import data_versions
+from .invoice_sequence import InvoiceSequence
+from .archive import attached_partitions, partitions_for_range, union_query
+from .search_index import search_index_suspended, resume_search_index
+from .rollup import day_range_conditions
+from .backup import snapshot_database
+from utils.helpers import epoch_day_range
+
+# Token characters of the products_fts unicode61 tokenizer
+FTS_TOKEN = re.compile(r'[^\W_]+')
+
+
+def _phrase_at(tokens, phrase, i):
+    """Whether phrase starts at tokens[i], its last token as a prefix"""
+    last = len(phrase) - 1
+    if i + last >= len(tokens):
+        return False
+    return (all(tokens[i + j] == phrase[j] for j in range(last)) and
+            tokens[i + last].startswith(phrase[last]))
+
+
+def adopt_legacy_database(path):
+    """Copy the old default database to path if path does not exist yet
+
+    Before DATABASE['path'] was the default, the app used pos.db in the
+    working directory. Installs upgraded from then keep their data: that
+    file is copied with the online backup API (so committed WAL content
+    comes along) and left in place.
+
+    Returns:
+        bool: True if a legacy database was copied
+    """
+    legacy = os.path.abspath(DATABASE['name'])
+    if os.path.exists(path) or not os.path.isfile(legacy) or legacy == os.path.abspath(path):
+        return False
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    partial = path + '.partial'
+    snapshot_database(legacy, partial)
+    os.replace(partial, path)
+    print(f"Copied legacy database {legacy} to {path}")
+    return True
+
+
 class DatabaseManager:
-    def __init__(self):
-        self.db_path = 'pos.db'
-        self.conn = None
-        self.cursor = None
+    def __init__(self, db_path=None):
+        # One database for the app, the models and every CLI, wherever
+        # they are started from
+        if db_path is None:
+            adopt_legacy_database(DATABASE['path'])
+        self.db_path = db_path or DATABASE['path']
+        self.pool = get_pool(self.db_path)
+        self.invoice_sequence = InvoiceSequence()
         self.initialize_database()
 
+    @property
+    def conn(self):
+        """This thread's pooled connection"""
+        return self.pool.connection()
+
+    @property
+    def cursor(self):
+        """This thread's pooled cursor"""
+        return self.pool.cursor()
+
     def initialize_database(self):
-        """Initialize the database connection and create tables"""
-        try:
-            # Try to connect to existing database first
-            if os.path.exists(self.db_path):
-                try:
-                    self.conn = sqlite3.connect(self.db_path)
-                    self.cursor = self.conn.cursor()
-                    # Check if tables exist
-                    self.cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='users'")
-                    if not self.cursor.fetchone():
-                        self.create_tables()
+        """Initialize the pooled connection and create tables once per database"""
+        if self.pool.initialized:
+            return True
+        try:
+            with self.pool._lock:
+                if self.pool.initialized:
                     return True
-                except sqlite3.Error:
-                    # If connection fails, try to delete and recreate
-                    self.disconnect()
-                    time.sleep(1)  # Wait a bit before trying to delete
-                    try:
-                        os.remove(self.db_path)
-                    except:
-                        pass  # Ignore if file can't be deleted
-            else:
-                # Create new database
-                self.conn = sqlite3.connect(self.db_path)
-                self.cursor = self.conn.cursor()
-                self.create_tables()
-            
+                # Check if tables exist
+                self.cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='users'")
+                if not self.cursor.fetchone():
+                    self.create_tables()
+                migrate(self.conn)
+                if search_index_suspended(self.conn):
+                    # An import was interrupted before it rebuilt the index
+                    resume_search_index(self.conn)
+                self.pool.initialized = True
+
             print("Database initialized successfully")
             return True
         except Exception as e:
@@ -44,33 +100,24 @@ class DatabaseManager:
             return False
 
     def connect(self):
-        """Connect to the database"""
+        """Lease this thread's pooled connection and return a fresh cursor"""
         try:
-            if not self.conn:
-                self.conn = sqlite3.connect(self.db_path)
-                self.cursor = self.conn.cursor()
-                print("Successfully connected to database")
-            return True
+            return self.pool.acquire().cursor()
         except sqlite3.Error as e:
             print(f"Database connection error: {e}")
-            return False
+            return None
 
     def disconnect(self):
-        """Close the database connection"""
-        if self.conn:
-            try:
-                self.conn.close()
-                print("Successfully disconnected from database")
-            except:
-                print("Error closing database connection")
-            self.conn = None
-            self.cursor = None
+        """Return the lease; the pooled connection stays open"""
+        self.pool.release()
 
     def ensure_connection(self):
         """Ensure database connection is active"""
-        if not self.conn:
-            return self.connect()
-        return True
+        try:
+            return self.conn is not None
+        except sqlite3.Error as e:
+            print(f"Database connection error: {e}")
+            return False
 
     def create_tables(self):
         """Create necessary tables if they don't exist"""
@@ -250,6 +297,123 @@ class DatabaseManager:
             print(f"Error getting products: {e}")
             return []
 
+    PRODUCT_PAGE_COLUMNS = """
+        p.id, p.barcode, p.name, c.name as category_name,
+        p.cost, p.price, p.quantity, p.min_quantity
+    """
+
+    def get_product_page(self, after=None, limit=1000):
+        """Get the next page of products in name order, with category names
+
+        after is the (name, id) of the last row of the previous page. Keyset
+        paging keeps every page a range scan of idx_products_name, however
+        deep into the catalog it is.
+        """
+        try:
+            if not self.ensure_connection():
+                return []
+
+            query = f"""
+                SELECT {self.PRODUCT_PAGE_COLUMNS}
+                FROM products p
+                LEFT JOIN categories c ON p.category_id = c.id
+            """
+            params = []
+            if after is not None:
+                query += " WHERE (p.name, p.id) > (?, ?)"
+                params.extend(after)
+            query += " ORDER BY p.name, p.id LIMIT ?"
+            params.append(limit)
+
+            self.cursor.execute(query, params)
+            return self.cursor.fetchall()
+        except sqlite3.Error as e:
+            print(f"Error getting product page: {e}")
+            return []
+
+    @staticmethod
+    def fts_query(search_term):
+        """Turn free text into an FTS5 prefix query matching every word"""
+        words = search_term.split()
+        return " ".join('"' + word.replace('"', '""') + '"*' for word in words)
+
+    @staticmethod
+    def fts_tokens(text):
+        """Split text into tokens the way products_fts does: letters and
+        digits only, case and diacritics folded"""
+        text = text or ''
+        if not text.isascii():
+            text = unicodedata.normalize('NFKD', text)
+            text = ''.join(ch for ch in text if not unicodedata.combining(ch))
+        return FTS_TOKEN.findall(text.casefold())
+
+    @classmethod
+    def search_tokens(cls, product):
+        """The tokens of a product's searchable columns, for search_matches"""
+        return [cls.fts_tokens(product.get(column)) for column in ('name', 'barcode', 'description')]
+
+    @classmethod
+    def search_matches(cls, search_term, product, columns=None):
+        """Whether a product dict matches search_term like fts_query does
+
+        Each word must appear as a phrase in the name, barcode or
+        description, its last token as a prefix. Lets a result list be
+        narrowed in memory when the search term is extended; pass the
+        product's search_tokens as columns to skip re-tokenizing it.
+        """
+        if columns is None:
+            columns = cls.search_tokens(product)
+        for word in search_term.split():
+            phrase = cls.fts_tokens(word)
+            if phrase and not any(_phrase_at(tokens, phrase, i)
+                                  for tokens in columns for i in range(len(tokens))):
+                return False
+        return True
+
+    @classmethod
+    def product_search_query(cls, search_term, limit=50, category_id=None):
+        """Build the ranked product search; returns (sql, params), or None
+        when the term has no words"""
+        match = cls.fts_query(search_term)
+        if not match:
+            return None
+
+        # The category filter and the limit both apply after ranking, so
+        # the best matches are kept whatever their rowid
+        query = """
+            SELECT p.*, c.name as category_name
+            FROM products_fts
+            JOIN products p ON p.id = products_fts.rowid
+            LEFT JOIN categories c ON p.category_id = c.id
+            WHERE products_fts MATCH ?
+        """
+        params = [match]
+
+        if category_id:
+            query += " AND p.category_id = ?"
+            params.append(category_id)
+
+        query += " ORDER BY products_fts.rank LIMIT ?"
+        params.append(limit if limit else -1)
+        return query, params
+
+    def search_products(self, search_term, limit=50, category_id=None):
+        """Get the best-ranked products whose name, barcode or description
+        contain words starting with the search terms"""
+        try:
+            if not self.ensure_connection():
+                return []
+
+            search = self.product_search_query(search_term, limit, category_id)
+            if search is None:
+                return []
+
+            self.cursor.execute(*search)
+            return self.cursor.fetchall()
+        except sqlite3.Error as e:
+            print(f"Error searching products: {e}")
+            return []
+
     def add_product(self, name, description, barcode, price, cost, quantity, category_id, min_quantity=5):
         """Add a new product"""
         try:
@@ -263,11 +427,51 @@ class DatabaseManager:
                 (name, description, barcode, price, cost, quantity, category_id, min_quantity)
             )
             self.conn.commit()
+            self.product_saved(self.cursor.lastrowid)
             return True
         except sqlite3.Error as e:
             print(f"Error adding product: {e}")
             return False
 
+    def update_product(self, product_data):
+        """Update an existing product from a product form dict"""
+        try:
+            if not self.ensure_connection():
+                return False
+
+            self.cursor.execute(
+                """UPDATE products
+                   SET name = ?, description = ?, barcode = ?, price = ?, cost = ?,
+                       quantity = ?, category_id = ?, min_quantity = ?
+                   WHERE id = ?""",
+                (product_data['name'], product_data.get('description'),
+                 product_data.get('barcode') or None,
+                 product_data.get('price', product_data.get('selling_price')),
+                 product_data.get('cost', product_data.get('purchase_price')),
+                 product_data['quantity'], product_data.get('category_id'),
+                 product_data.get('min_quantity', 5), product_data['id'])
+            )
+            self.conn.commit()
+            self.product_saved(product_data['id'])
+            return self.cursor.rowcount > 0
+        except sqlite3.Error as e:
+            print(f"Error updating product: {e}")
+            return False
+
+    def delete_product(self, product_id):
+        """Delete a product"""
+        try:
+            if not self.ensure_connection():
+                return False
+
+            self.cursor.execute("DELETE FROM products WHERE id = ?", (product_id,))
+            self.conn.commit()
+            self.product_deleted(product_id)
+            return self.cursor.rowcount > 0
+        except sqlite3.Error as e:
+            print(f"Error deleting product: {e}")
+            return False
+
     def update_product_quantity(self, product_id, quantity):
         """Update product quantity"""
         try:
@@ -279,36 +483,246 @@ class DatabaseManager:
                 (quantity, product_id)
             )
             self.conn.commit()
+            self.product_stock_changed({product_id: quantity})
             return True
         except sqlite3.Error as e:
             print(f"Error updating product quantity: {e}")
             return False
 
+    @property
+    def catalog(self):
+        """The shared in-memory product catalog, loaded on first use"""
+        catalog = self.pool.caches.get('catalog')
+        if catalog is None:
+            catalog = self.pool.register_cache('catalog', CatalogCache())
+        if not catalog.loaded:
+            catalog.load(self.conn)
+        return catalog
+
+    def load_catalog(self):
+        """Load the product catalog and its type-ahead index ahead of the
+        first scan"""
+        try:
+            self.product_index
+            return len(self.catalog)
+        except sqlite3.Error as e:
+            print(f"Error loading product catalog: {e}")
+            return 0
+
+    @property
+    def product_index(self):
+        """The shared type-ahead index over the catalog, rebuilt when the
+        catalog has changed since it was built"""
+        index = self.pool.caches.get('product_index')
+        if index is None:
+            index = self.pool.register_cache('product_index', ProductPrefixIndex(self.fts_tokens))
+        catalog = self.catalog
+        if not index.is_current(catalog):
+            index.build(catalog)
+        return index
+
+    def search_product_prefix(self, text, limit=50):
+        """Products whose name, normalized name or barcode starts with text,
+        from the in-memory index"""
+        try:
+            return self.product_index.search(text, limit)
+        except sqlite3.Error as e:
+            print(f"Error searching products by prefix: {e}")
+            return []
+
+    @classmethod
+    def read_catalog(cls, conn):
+        """Load a catalog and its type-ahead index from conn, e.g. on a
+        worker thread, for install_catalog
+
+        Returns:
+            tuple: (catalog, index, products version they were read at)
+        """
+        # One read transaction, so the version matches the rows
+        conn.execute("BEGIN")
+        try:
+            version = data_versions(conn, ('products',))
+            catalog = CatalogCache()
+            catalog.load(conn)
+        finally:
+            conn.execute("COMMIT")
+        index = ProductPrefixIndex(cls.fts_tokens)
+        index.build(catalog)
+        return catalog, index, version
+
+    def install_catalog(self, catalog, index, version):
+        """Adopt a catalog and index from read_catalog as the shared ones
+
+        Skipped when the catalog is already loaded, or when products have
+        changed since it was read; it is then loaded on first use as usual.
+
+        Returns:
+            bool: Whether they were installed
+        """
+        current = self.pool.caches.get('catalog')
+        if current is not None and current.loaded:
+            return False
+        try:
+            if data_versions(self.conn, ('products',)) != version:
+                return False
+        except sqlite3.Error as e:
+            print(f"Error installing product catalog: {e}")
+            return False
+        self.pool.register_cache('catalog', catalog)
+        self.pool.register_cache('product_index', index)
+        return True
+
+    def get_product_by_barcode(self, barcode):
+        """Get a product by barcode from the in-memory catalog"""
+        try:
+            return self.catalog.get_by_barcode(barcode)
+        except sqlite3.Error as e:
+            print(f"Error getting product by barcode: {e}")
+            return None
+
+    def product_saved(self, product_id):
+        """Product insert/update event: refresh the cached row"""
+        catalog = self.pool.caches.get('catalog')
+        if catalog is not None and catalog.loaded:
+            index = self._current_product_index(catalog)
+            catalog.refresh(self.conn, product_id)
+            if index is not None:
+                index.update(catalog, product_id)
+
+    def product_deleted(self, product_id):
+        """Product delete event: drop the cached row"""
+        catalog = self.pool.caches.get('catalog')
+        if catalog is not None and catalog.loaded:
+            index = self._current_product_index(catalog)
+            catalog.discard(product_id)
+            if index is not None:
+                index.update(catalog, product_id)
+
+    def _current_product_index(self, catalog):
+        # The type-ahead index, if it is up to date and can follow one change
+        index = self.pool.caches.get('product_index')
+        return index if index is not None and index.is_current(catalog) else None
+
+    def product_stock_changed(self, deltas):
+        """Committed stock changes ({product_id: delta}) for the cached rows"""
+        catalog = self.pool.caches.get('catalog')
+        if catalog is not None and catalog.loaded:
+            for product_id, delta in deltas.items():
+                catalog.adjust_quantity(product_id, delta)
+
+    @staticmethod
+    def date_range_conditions(column, start_date=None, end_date=None):
+        """Build index-friendly conditions for an inclusive date range
+
+        Dates are translated into a half-open range on an integer epoch
+        column, so the column is never wrapped in a function.
+        """
+        start_ts, end_ts = epoch_day_range(start_date, end_date)
+        conditions = []
+        params = []
+        if start_ts is not None:
+            conditions.append(f"{column} >= ?")
+            params.append(start_ts)
+        if end_ts is not None:
+            conditions.append(f"{column} < ?")
+            params.append(end_ts)
+        return conditions, params
+
+    @contextmanager
+    def sales_source(self, table, start_date=None, end_date=None, columns=None):
+        """Yield (sql, params) selecting a sales table's rows in a date range
+
+        The archive partitions the range touches are attached for the
+        duration of the block and read together with the hot table.
+        columns limits the selected columns, by default all of them.
+        """
+        start_ts, end_ts = epoch_day_range(start_date, end_date)
+        conditions, params = self.date_range_conditions('created_ts', start_date, end_date)
+        with attached_partitions(self.conn, self.db_path, start_ts, end_ts) as schemas:
+            yield union_query(self.conn, table, schemas, conditions, params, columns)
+
     def get_sales(self, start_date=None, end_date=None):
         """Get all sales or sales within a date range"""
         try:
             if not self.ensure_connection():
                 return []
 
-            query = """
-                SELECT s.*, u.full_name as user_name 
-                FROM sales s 
-                LEFT JOIN users u ON s.user_id = u.id
-            """
-            params = []
-            
-            if start_date and end_date:
-                query += " WHERE s.created_at BETWEEN ? AND ?"
-                params.extend([start_date, end_date])
-            
-            query += " ORDER BY s.created_at DESC"
-            
-            self.cursor.execute(query, params)
-            return self.cursor.fetchall()
+            with self.sales_source('sales', start_date, end_date) as (sales, params):
+                self.cursor.execute(f"""
+                    SELECT s.*, u.full_name as user_name 
+                    FROM ({sales}) s 
+                    LEFT JOIN users u ON s.user_id = u.id
+                    ORDER BY s.created_ts DESC
+                """, params)
+                return self.cursor.fetchall()
         except sqlite3.Error as e:
             print(f"Error getting sales: {e}")
             return []
 
+    def sales_schemas(self, start_date=None, end_date=None):
+        """Schemas holding sales in a date range, oldest first
+
+        Archive partitions are listed by year before the hot database, so
+        walking them in order visits sales in created_ts order.
+        """
+        start_ts, end_ts = epoch_day_range(start_date, end_date)
+        return [f"sales_{year}" for year in partitions_for_range(self.db_path, start_ts, end_ts)] + ['main']
+
+    def iter_query(self, query, params=(), batch=5000):
+        """Yield the rows of a query, fetching batch rows at a time
+
+        A dedicated cursor is used, so the shared cursor stays free while
+        the caller consumes the rows.
+        """
+        cursor = self.conn.cursor()
+        try:
+            cursor.execute(query, params)
+            while True:
+                rows = cursor.fetchmany(batch)
+                if not rows:
+                    break
+                yield from rows
+        finally:
+            cursor.close()
+
+    def iter_sales(self, start_date=None, end_date=None, batch=5000):
+        """Yield sales in a date range, oldest first, batch rows at a time"""
+        conditions, params = self.date_range_conditions('s.created_ts', start_date, end_date)
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        with attached_partitions(self.conn, self.db_path, *epoch_day_range(start_date, end_date)):
+            for schema in self.sales_schemas(start_date, end_date):
+                yield from self.iter_query(f"""
+                    SELECT s.*, u.full_name as user_name
+                    FROM {schema}.sales s
+                    LEFT JOIN main.users u ON s.user_id = u.id
+                    {where}
+                    ORDER BY s.created_ts
+                """, params, batch)
+
+    def iter_sale_lines(self, start_date=None, end_date=None, batch=5000):
+        """Yield one joined sale + item row per sale line, oldest sale first
+
+        The lines of a sale are always consecutive: CROSS JOIN keeps sales
+        as the outer loop, walked in created_ts index order, with each
+        sale's items looked up by sale_id. No sort is needed, so memory use
+        does not depend on the size of the range.
+        """
+        conditions, params = self.date_range_conditions('s.created_ts', start_date, end_date)
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        with attached_partitions(self.conn, self.db_path, *epoch_day_range(start_date, end_date)):
+            for schema in self.sales_schemas(start_date, end_date):
+                yield from self.iter_query(f"""
+                    SELECT s.id as sale_id, s.invoice_number, s.created_at, s.payment_method,
+                           s.user_id, s.total_amount, s.discount, s.tax, s.final_amount,
+                           si.product_id, p.name as product_name, p.barcode,
+                           si.quantity, si.price, si.total
+                    FROM {schema}.sales s
+                    CROSS JOIN {schema}.sale_items si ON si.sale_id = s.id
+                    LEFT JOIN main.products p ON p.id = si.product_id
+                    {where}
+                    ORDER BY s.created_ts
+                """, params, batch)
+
     def get_sale_items(self, sale_id):
         """Get items for a specific sale"""
         try:
@@ -362,6 +776,85 @@ class DatabaseManager:
             print(f"Error adding sale item: {e}")
             return False
 
+    def checkout(self, sale, items):
+        """Write a sale, its items and the stock decrements in one transaction
+
+        Args:
+            sale (dict): total_amount, discount, tax, final_amount,
+                payment_method, user_id and optionally customer_name and
+                customer_phone. When invoice_number is missing
+                one is allocated in the same transaction and stored back
+                into the dict on success
+            items (list): dicts with product_id, quantity, price and
+                optionally total
+
+        Returns:
+            int: The new sale id, or None if nothing was written (including
+            when any product has insufficient stock)
+        """
+        if not items:
+            print("Checkout error: sale has no items")
+            return None
+
+        conn = None
+        try:
+            if not self.ensure_connection():
+                return None
+
+            conn = self.conn
+            if conn.in_transaction:
+                conn.commit()
+            cursor = conn.cursor()
+            cursor.execute("BEGIN IMMEDIATE")
+
+            invoice_number = sale.get('invoice_number') or self.invoice_sequence.allocate(cursor)
+
+            created_ts = int(time.time())
+            cursor.execute(
+                """INSERT INTO sales 
+                   (invoice_number, customer_name, customer_phone, total_amount, discount, tax,
+                    final_amount, payment_method, user_id, created_ts)
+                   VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)""",
+                (invoice_number, sale.get('customer_name') or None, sale.get('customer_phone') or None,
+                 sale['total_amount'], sale.get('discount', 0),
+                 sale.get('tax', 0), sale['final_amount'], sale['payment_method'],
+                 sale.get('user_id'), created_ts)
+            )
+            sale_id = cursor.lastrowid
+
+            cursor.executemany(
+                """INSERT INTO sale_items 
+                   (sale_id, product_id, quantity, price, total, created_ts)
+                   VALUES (?, ?, ?, ?, ?, ?)""",
+                [(sale_id, item['product_id'], item['quantity'], item['price'],
+                  item.get('total', item['quantity'] * item['price']), created_ts)
+                 for item in items]
+            )
+
+            # The same product may appear on several lines
+            quantities = {}
+            for item in items:
+                quantities[item['product_id']] = quantities.get(item['product_id'], 0) + item['quantity']
+
+            cursor.executemany(
+                "UPDATE products SET quantity = quantity - ? WHERE id = ? AND quantity >= ?",
+                [(quantity, product_id, quantity) for product_id, quantity in quantities.items()]
+            )
+            if cursor.rowcount != len(quantities):
+                conn.rollback()
+                print("Checkout error: insufficient stock")
+                return None
+
+            conn.commit()
+            sale['invoice_number'] = invoice_number
+            self.product_stock_changed({product_id: -quantity for product_id, quantity in quantities.items()})
+            return sale_id
+        except sqlite3.Error as e:
+            if conn is not None and conn.in_transaction:
+                conn.rollback()
+            print(f"Checkout error: {e}")
+            return None
+
     def get_sale_by_id(self, sale_id):
         """Get a specific sale by ID"""
         try:
@@ -380,7 +873,11 @@ class DatabaseManager:
             return None
 
     def get_sales_summary(self, start_date=None, end_date=None):
-        """Get sales summary (total sales, total items, average sale)"""
+        """Get sales summary (total sales, total items, average sale)
+
+        Reads the sales_daily rollup, one row per day in the range,
+        archived years included.
+        """
         try:
             if not self.ensure_connection():
                 return {
@@ -389,25 +886,21 @@ class DatabaseManager:
                     'average_sale': 0
                 }
 
-            query = """
+            conditions, params = day_range_conditions(start_date, end_date)
+            where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+            self.cursor.execute(f"""
                 SELECT 
-                    COUNT(*) as total_sales,
-                    COALESCE(SUM(final_amount), 0) as total_amount,
-                    COALESCE(AVG(final_amount), 0) as average_sale
-                FROM sales
-            """
-            params = []
-            
-            if start_date and end_date:
-                query += " WHERE created_at BETWEEN ? AND ?"
-                params.extend([start_date, end_date])
-            
-            self.cursor.execute(query, params)
+                    COALESCE(SUM(sales_count), 0) as total_sales,
+                    COALESCE(SUM(final_amount), 0) as total_amount
+                FROM sales_daily
+                {where}
+            """, params)
             result = self.cursor.fetchone()
+            total_sales, total_amount = result[0] or 0, result[1] or 0
             return {
-                'total_sales': result[0] or 0,
-                'total_amount': result[1] or 0,
-                'average_sale': result[2] or 0
+                'total_sales': total_sales,
+                'total_amount': total_amount,
+                'average_sale': total_amount / total_sales if total_sales else 0
             }
         except sqlite3.Error as e:
             print(f"Error getting sales summary: {e}")
@@ -437,51 +930,59 @@ class DatabaseManager:
 
     def commit(self):
         """حفظ التغييرات"""
-        if self.conn:
-            self.conn.commit()
+        self.conn.commit()
 
     def execute_query(self, query, params=None):
         """تنفيذ استعلام"""
-        try:
-            if self.connect():
-                if params:
-                    self.cursor.execute(query, params)
-                else:
-                    self.cursor.execute(query)
-                self.commit()
-                return True
+        cursor = self.connect()
+        if not cursor:
             return False
+        try:
+            if params:
+                cursor.execute(query, params)
+            else:
+                cursor.execute(query)
+            self.commit()
+            return True
         except sqlite3.Error as e:
             print(f"Query execution error: {e}")
             return False
+        finally:
+            self.disconnect()
 
     def fetch_one(self, query, params=None):
         """جلب سجل واحد"""
-        try:
-            if self.connect():
-                if params:
-                    self.cursor.execute(query, params)
-                else:
-                    self.cursor.execute(query)
-                return self.cursor.fetchone()
+        cursor = self.connect()
+        if not cursor:
             return None
+        try:
+            if params:
+                cursor.execute(query, params)
+            else:
+                cursor.execute(query)
+            return cursor.fetchone()
         except sqlite3.Error as e:
             print(f"Query execution error: {e}")
             return None
+        finally:
+            self.disconnect()
 
     def fetch_all(self, query, params=None):
         """جلب جميع السجلات"""
-        try:
-            if self.connect():
-                if params:
-                    self.cursor.execute(query, params)
-                else:
-                    self.cursor.execute(query)
-                return self.cursor.fetchall()
+        cursor = self.connect()
+        if not cursor:
             return []
+        try:
+            if params:
+                cursor.execute(query, params)
+            else:
+                cursor.execute(query)
+            return cursor.fetchall()
         except sqlite3.Error as e:
             print(f"Query execution error: {e}")
             return []
+        finally:
+            self.disconnect()
 
     # User management methods
     def get_user(self, user_id):
@@ -539,7 +1040,3 @@ class DatabaseManager:
             return True
         except sqlite3.Error:
             return False
-
-    def __del__(self):
-        """Cleanup when the object is destroyed"""
-        self.disconnect()
\ No newline at end of file
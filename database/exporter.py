@@ -0,0 +1,172 @@
+"""
+Streaming sales export for the POS system.
+
+Rows come from ``DatabaseManager.iter_sales`` / ``iter_sale_lines`` and are
+written as they arrive, so memory use stays flat however long the date
+range is.  Two layouts are supported:
+
+``lines``
+    One joined sale + item record per sale line.  As JSON Lines, the lines
+    of a sale are grouped into one object with an ``items`` list.
+``sales``
+    One record per sale.
+
+The format follows the file extension: ``.csv`` or ``.jsonl``.
+"""
+
+import argparse
+import csv
+import json
+import os
+import threading
+import time
+
+from config import DATABASE
+from utils.logger import setup_logger, log_info, log_error
+
+logger = setup_logger('database.exporter')
+
+SALE_FIELDS = ['sale_id', 'invoice_number', 'created_at', 'payment_method', 'user_id',
+               'total_amount', 'discount', 'tax', 'final_amount']
+ITEM_FIELDS = ['product_id', 'product_name', 'barcode', 'quantity', 'price', 'total']
+SALES_LAYOUT_FIELDS = ['id', 'invoice_number', 'created_at', 'payment_method', 'user_id',
+                       'user_name', 'total_amount', 'discount', 'tax', 'final_amount']
+
+
+def _write_csv(f, rows, fields):
+    writer = csv.writer(f)
+    writer.writerow(fields)
+    count = 0
+    for row in rows:
+        writer.writerow([row[field] for field in fields])
+        count += 1
+    return count
+
+
+def _write_jsonl(f, rows, fields):
+    count = 0
+    for row in rows:
+        f.write(json.dumps({field: row[field] for field in fields}, ensure_ascii=False))
+        f.write('\n')
+        count += 1
+    return count
+
+
+def _write_jsonl_grouped(f, lines):
+    """Write one object per sale, holding its consecutive lines as items"""
+    count = 0
+    sale = None
+    for line in lines:
+        if sale is None or sale['sale_id'] != line['sale_id']:
+            if sale is not None:
+                f.write(json.dumps(sale, ensure_ascii=False))
+                f.write('\n')
+            sale = {field: line[field] for field in SALE_FIELDS}
+            sale['items'] = []
+        sale['items'].append({field: line[field] for field in ITEM_FIELDS})
+        count += 1
+    if sale is not None:
+        f.write(json.dumps(sale, ensure_ascii=False))
+        f.write('\n')
+    return count
+
+
+def export_sales(db, path, start_date=None, end_date=None, layout='lines', batch=5000):
+    """
+    Export sales in a date range to a CSV or JSON Lines file.
+
+    Args:
+        db (DatabaseManager): Source database
+        path (str): Output file; the extension picks the format
+        start_date (str, optional): First day, YYYY-MM-DD
+        end_date (str, optional): Last day, YYYY-MM-DD
+        layout (str): 'lines' for one record per sale line, 'sales' for one
+            per sale
+        batch (int): Rows fetched from SQLite at a time
+
+    Returns:
+        int: Number of rows read, or None on failure
+    """
+    jsonl = path.endswith('.jsonl')
+    if not jsonl and not path.endswith('.csv'):
+        log_error(logger, f"Unsupported export format: {path}")
+        return None
+
+    start = time.perf_counter()
+    try:
+        with open(path, 'w', newline='', encoding='utf-8') as f:
+            if layout == 'lines':
+                rows = db.iter_sale_lines(start_date, end_date, batch)
+                if jsonl:
+                    count = _write_jsonl_grouped(f, rows)
+                else:
+                    count = _write_csv(f, rows, SALE_FIELDS + ITEM_FIELDS)
+            else:
+                rows = db.iter_sales(start_date, end_date, batch)
+                write = _write_jsonl if jsonl else _write_csv
+                count = write(f, rows, SALES_LAYOUT_FIELDS)
+
+        log_info(logger, f"Exported {count} rows to {path}",
+                 {"layout": layout, "duration": round(time.perf_counter() - start, 3)})
+        return count
+    except Exception as e:
+        log_error(logger, e, {"operation": "export_sales", "path": path})
+        return None
+
+
+class ExportThread(threading.Thread):
+    """
+    Runs export_sales on a background thread.
+
+    Args:
+        db (DatabaseManager): Source database
+        path (str): Output file
+        start_date (str, optional): First day
+        end_date (str, optional): Last day
+        layout (str): 'lines' or 'sales'
+        finished (callable, optional): Called with the row count or None
+    """
+
+    def __init__(self, db, path, start_date=None, end_date=None, layout='lines', finished=None):
+        super().__init__(name='sales-export', daemon=True)
+        self.db = db
+        self.path = path
+        self.start_date = start_date
+        self.end_date = end_date
+        self.layout = layout
+        self.finished = finished
+        self.result = None
+
+    def run(self):
+        with self.db.pool.worker():
+            self.result = export_sales(self.db, self.path, self.start_date, self.end_date, self.layout)
+        if self.finished:
+            self.finished(self.result)
+
+
+def main():
+    from database.db_manager import DatabaseManager, adopt_legacy_database
+
+    parser = argparse.ArgumentParser(description="Export sales to CSV or JSON Lines")
+    parser.add_argument('path', help="Output file (.csv or .jsonl)")
+    parser.add_argument('--db', default=DATABASE['path'], help="Database path, defaults to the POS database")
+    parser.add_argument('--start', help="First day, YYYY-MM-DD")
+    parser.add_argument('--end', help="Last day, YYYY-MM-DD")
+    parser.add_argument('--layout', choices=['lines', 'sales'], default='lines')
+    args = parser.parse_args()
+
+    if args.db == DATABASE['path']:
+        adopt_legacy_database(args.db)
+    # DatabaseManager would create an empty database and export nothing
+    if not os.path.exists(args.db):
+        parser.error(f"database not found: {args.db}")
+
+    count = export_sales(DatabaseManager(args.db), args.path, args.start, args.end, args.layout)
+    if count is None:
+        print("Export failed, see the log for details")
+    else:
+        print(f"Exported {count:,} rows to {args.path}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,233 @@
+"""
+Bulk product import from CSV for the POS system.
+
+The file is streamed row by row, barcodes are checked with
+``validate_barcode`` and valid rows are upserted on the barcode with
+``executemany`` in chunks, one transaction per chunk.  Category names are
+resolved to ids through a dict, creating missing categories on the way.
+The full-text search triggers are suspended for the duration of the import
+and the index is rebuilt once at the end.
+
+Recognised columns (header names, case-insensitive)::
+
+    name, barcode, price | selling_price, cost | purchase_price,
+    quantity, min_quantity, category, description
+"""
+
+import argparse
+import csv
+import re
+import threading
+import time
+
+from database.search_index import suspend_search_index, resume_search_index
+from utils.helpers import validate_barcode
+from utils.logger import setup_logger, log_info, log_error
+
+logger = setup_logger('database.importer')
+
+CHUNK_SIZE = 5000
+MAX_REPORTED_ERRORS = 100
+NON_DIGITS = re.compile(r'[^0-9]')
+
+UPSERT_PRODUCT = """
+    INSERT INTO products (name, description, barcode, price, cost, quantity, min_quantity, category_id)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+    ON CONFLICT (barcode) DO UPDATE SET
+        name = excluded.name,
+        description = excluded.description,
+        price = excluded.price,
+        cost = excluded.cost,
+        quantity = excluded.quantity,
+        min_quantity = excluded.min_quantity,
+        category_id = excluded.category_id
+"""
+
+COLUMN_ALIASES = {
+    'selling_price': 'price',
+    'purchase_price': 'cost',
+    'category_name': 'category',
+}
+
+
+def read_rows(path):
+    """Yield (line number, row dict) for every data row of a CSV file"""
+    with open(path, newline='', encoding='utf-8-sig') as f:
+        reader = csv.reader(f)
+        header = next(reader, None)
+        if header is None:
+            return
+        columns = [COLUMN_ALIASES.get(name.strip().lower(), name.strip().lower()) for name in header]
+        for row in reader:
+            if any(row):
+                yield reader.line_num, dict(zip(columns, row))
+
+
+class CategoryResolver:
+    """Category name -> id, creating categories that do not exist yet"""
+
+    def __init__(self, conn):
+        self.conn = conn
+        self.ids = {name.strip().lower(): id for id, name in
+                    conn.execute("SELECT id, name FROM categories")}
+        self.created = 0
+
+    def resolve(self, name):
+        name = (name or '').strip()
+        if not name:
+            return None
+        key = name.lower()
+        category_id = self.ids.get(key)
+        if category_id is None:
+            category_id = self.conn.execute("INSERT INTO categories (name) VALUES (?)", (name,)).lastrowid
+            self.ids[key] = category_id
+            self.created += 1
+        return category_id
+
+
+def parse_row(row, categories):
+    """Turn a CSV row into upsert parameters; raises ValueError if invalid"""
+    name = (row.get('name') or '').strip()
+    if not name:
+        raise ValueError("missing name")
+    barcode = row.get('barcode') or ''
+    if not validate_barcode(barcode):
+        raise ValueError(f"invalid barcode {barcode!r}")
+    barcode = NON_DIGITS.sub('', barcode)
+    price = float(row.get('price') or 0)
+    cost = float(row.get('cost') or 0)
+    if price < 0 or cost < 0:
+        raise ValueError("negative price")
+    return (name, row.get('description') or None, barcode, price, cost,
+            int(float(row.get('quantity') or 0)), int(float(row.get('min_quantity') or 5)),
+            categories.resolve(row.get('category')))
+
+
+def import_products(db, path, chunk_size=None, progress=None, defer_search_index=True):
+    """
+    Import products from a CSV file, updating existing barcodes in place.
+
+    Args:
+        db (DatabaseManager): Target database
+        path (str): CSV file to read
+        chunk_size (int, optional): Rows per transaction
+        progress (callable, optional): Called as progress(rows read) after
+            every chunk
+        defer_search_index (bool): Suspend the search index triggers and
+            rebuild the index once at the end; rebuilding costs time in
+            proportion to the whole catalog, so small imports into a large
+            catalog may be faster without it
+
+    Returns:
+        dict: rows, imported, skipped, categories_created, errors
+        [(line, message)], seconds and rows_per_second; None on failure
+    """
+    chunk_size = chunk_size or CHUNK_SIZE
+    conn = db.conn
+    stats = {'rows': 0, 'imported': 0, 'skipped': 0, 'errors': []}
+    start = time.perf_counter()
+    try:
+        if conn.in_transaction:
+            conn.commit()
+        if defer_search_index:
+            suspend_search_index(conn)
+        categories = CategoryResolver(conn)
+        chunk = []
+
+        def flush():
+            # One transaction per chunk, together with any categories the
+            # chunk created
+            conn.executemany(UPSERT_PRODUCT, chunk)
+            conn.commit()
+            stats['imported'] += len(chunk)
+            chunk.clear()
+            if progress:
+                progress(stats['rows'])
+
+        for line, row in read_rows(path):
+            stats['rows'] += 1
+            try:
+                chunk.append(parse_row(row, categories))
+            except ValueError as e:
+                stats['skipped'] += 1
+                if len(stats['errors']) < MAX_REPORTED_ERRORS:
+                    stats['errors'].append((line, str(e)))
+                continue
+            if len(chunk) >= chunk_size:
+                flush()
+        if chunk:
+            flush()
+        if conn.in_transaction:
+            # New categories outside the last chunk
+            conn.commit()
+    except Exception as e:
+        if conn.in_transaction:
+            conn.rollback()
+        log_error(logger, e, {"operation": "import_products", "path": path})
+        return None
+    finally:
+        if defer_search_index:
+            resume_search_index(conn)
+        # The catalog and search caches no longer match the table
+        db.pool.invalidate_caches()
+
+    stats['categories_created'] = categories.created
+    stats['seconds'] = round(time.perf_counter() - start, 3)
+    stats['rows_per_second'] = round(stats['rows'] / stats['seconds']) if stats['seconds'] else stats['rows']
+    log_info(logger, f"Imported {stats['imported']} of {stats['rows']} rows from {path}", {
+        "skipped": stats['skipped'], "rows_per_second": stats['rows_per_second']
+    })
+    return stats
+
+
+class ImportThread(threading.Thread):
+    """
+    Runs import_products on a background thread.
+
+    Args:
+        db (DatabaseManager): Target database
+        path (str): CSV file to read
+        progress (callable, optional): Called as progress(rows read)
+        finished (callable, optional): Called with the import stats or None
+    """
+
+    def __init__(self, db, path, progress=None, finished=None):
+        super().__init__(name='product-import', daemon=True)
+        self.db = db
+        self.path = path
+        self.progress = progress
+        self.finished = finished
+        self.result = None
+
+    def run(self):
+        with self.db.pool.worker():
+            self.result = import_products(self.db, self.path, progress=self.progress)
+        if self.finished:
+            self.finished(self.result)
+
+
+def main():
+    from database.db_manager import DatabaseManager
+
+    parser = argparse.ArgumentParser(description="Import products from a CSV file")
+    parser.add_argument('csv_path')
+    parser.add_argument('--db', help="Database path, defaults to the POS database (DATABASE['path'])")
+    parser.add_argument('--chunk-size', type=int, default=CHUNK_SIZE, help="Rows per transaction")
+    parser.add_argument('--index-per-row', action='store_true',
+                        help="Keep the search index triggers on instead of rebuilding at the end")
+    args = parser.parse_args()
+
+    stats = import_products(DatabaseManager(args.db), args.csv_path, args.chunk_size,
+                            defer_search_index=not args.index_per_row)
+    if stats is None:
+        print("Import failed, see the log for details")
+        return
+    print(f"Imported {stats['imported']:,} of {stats['rows']:,} rows in {stats['seconds']:.2f}s "
+          f"({stats['rows_per_second']:,} rows/s), {stats['skipped']:,} skipped, "
+          f"{stats['categories_created']} new categories")
+    for line, message in stats['errors']:
+        print(f"  line {line}: {message}")
+
+
+if __name__ == '__main__':
+    main()
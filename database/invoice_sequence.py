@@ -0,0 +1,57 @@
+"""
+Invoice number sequence for the POS system.
+
+Numbers come from a per-terminal, per-day counter row in the
+``invoice_counters`` table.  ``allocate`` must run inside the transaction
+that inserts the sale, so the number is committed (or rolled back) together
+with it and two sales can never receive the same number.
+"""
+
+from datetime import datetime
+
+from config import APP
+from utils.helpers import format_invoice_number
+
+
+class InvoiceSequence:
+    """Allocates invoice numbers for one terminal"""
+
+    def __init__(self, terminal=None, prefix=None):
+        self.terminal = terminal or APP['terminal_id']
+        self.prefix = prefix or APP['invoice_prefix']
+
+    @staticmethod
+    def today():
+        return datetime.now().strftime('%Y%m%d')
+
+    def allocate(self, cursor, day=None):
+        """
+        Take the next invoice number.
+
+        Args:
+            cursor (sqlite3.Cursor): Cursor inside the sale's write transaction
+            day (str, optional): YYYYMMDD, defaults to today
+
+        Returns:
+            str: The allocated invoice number
+        """
+        day = day or self.today()
+        cursor.execute(
+            """INSERT INTO invoice_counters (terminal, day, last_value) VALUES (?, ?, 1)
+               ON CONFLICT (terminal, day) DO UPDATE SET last_value = last_value + 1""",
+            (self.terminal, day)
+        )
+        cursor.execute(
+            "SELECT last_value FROM invoice_counters WHERE terminal = ? AND day = ?",
+            (self.terminal, day)
+        )
+        return format_invoice_number(self.prefix, self.terminal, day, cursor.fetchone()[0])
+
+    def peek(self, conn, day=None):
+        """Return the number the next allocation will take, without taking it"""
+        day = day or self.today()
+        row = conn.execute(
+            "SELECT last_value FROM invoice_counters WHERE terminal = ? AND day = ?",
+            (self.terminal, day)
+        ).fetchone()
+        return format_invoice_number(self.prefix, self.terminal, day, (row[0] if row else 0) + 1)
@@ -0,0 +1,80 @@
+"""
+Versioned schema migrations for the POS system.
+
+Migrations are numbered SQL files in ``database/migrations`` named
+``NNNN_description.sql``.  The number of the last applied migration is kept
+in ``PRAGMA user_version``, so every file runs exactly once per database,
+in order, each inside its own transaction.
+"""
+
+import os
+import re
+import time
+
+from utils.logger import setup_logger, log_info, log_error
+
+logger = setup_logger('database.migrate')
+
+MIGRATIONS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'migrations')
+MIGRATION_FILE = re.compile(r'^(\d+)_(\w+)\.sql$')
+
+
+def available_migrations(directory=MIGRATIONS_DIR):
+    """
+    List the migration files in a directory.
+
+    Returns:
+        list: (version, name, path) tuples sorted by version
+    """
+    migrations = []
+    for filename in os.listdir(directory):
+        match = MIGRATION_FILE.match(filename)
+        if match:
+            migrations.append((int(match.group(1)), match.group(2),
+                               os.path.join(directory, filename)))
+    return sorted(migrations)
+
+
+def current_version(conn):
+    """Return the schema version stored in the database"""
+    return conn.execute("PRAGMA user_version").fetchone()[0]
+
+
+def migrate(conn, directory=MIGRATIONS_DIR):
+    """
+    Apply every pending migration to a database.
+
+    Args:
+        conn (sqlite3.Connection): Open connection to the database
+        directory (str): Directory holding the migration files
+
+    Returns:
+        list: Versions that were applied
+    """
+    if conn.in_transaction:
+        conn.commit()
+
+    applied = []
+    version = current_version(conn)
+    for number, name, path in available_migrations(directory):
+        if number <= version:
+            continue
+
+        with open(path, encoding='utf-8') as f:
+            sql = f.read()
+
+        start = time.perf_counter()
+        try:
+            conn.executescript(f"BEGIN;\n{sql}\nPRAGMA user_version = {number};\nCOMMIT;")
+        except Exception as e:
+            if conn.in_transaction:
+                conn.rollback()
+            log_error(logger, e, {"operation": "migrate", "migration": os.path.basename(path)})
+            raise
+        elapsed = (time.perf_counter() - start) * 1000
+
+        log_info(logger, f"Applied migration {number:04d}_{name} in {elapsed:.1f} ms")
+        applied.append(number)
+        version = number
+
+    return applied
@@ -0,0 +1,17 @@
+-- Secondary indexes for the hot read paths
+
+-- get_sales: range filter and ORDER BY on created_at
+CREATE INDEX IF NOT EXISTS idx_sales_created_at ON sales (created_at);
+
+-- get_sale_items: lookup by sale
+CREATE INDEX IF NOT EXISTS idx_sale_items_sale_id ON sale_items (sale_id);
+
+-- get_products(category_id): filter by category, already sorted by name
+CREATE INDEX IF NOT EXISTS idx_products_category_name ON products (category_id, name);
+
+-- get_products(): full list sorted by name
+CREATE INDEX IF NOT EXISTS idx_products_name ON products (name);
+
+-- get_low_stock_products: only the rows at or below their minimum
+CREATE INDEX IF NOT EXISTS idx_products_low_stock ON products (quantity)
+    WHERE quantity <= min_quantity;
@@ -0,0 +1,33 @@
+-- Integer epoch timestamps (seconds, UTC) so date ranges can use an index.
+-- Queries translate (start_date, end_date) into half-open ranges on these
+-- columns instead of wrapping created_at in DATE(); new ledger tables
+-- should carry the same created_ts column.
+
+ALTER TABLE sales ADD COLUMN created_ts INTEGER;
+UPDATE sales SET created_ts = CAST(strftime('%s', created_at) AS INTEGER);
+
+ALTER TABLE sale_items ADD COLUMN created_ts INTEGER;
+UPDATE sale_items
+SET created_ts = (SELECT s.created_ts FROM sales s WHERE s.id = sale_items.sale_id);
+
+-- final_amount makes the daily stats an index-only scan
+CREATE INDEX IF NOT EXISTS idx_sales_created_ts ON sales (created_ts, final_amount);
+CREATE INDEX IF NOT EXISTS idx_sale_items_created_ts ON sale_items (created_ts);
+
+-- Superseded by idx_sales_created_ts
+DROP INDEX IF EXISTS idx_sales_created_at;
+
+-- Rows inserted without an explicit created_ts derive it from created_at
+CREATE TRIGGER IF NOT EXISTS sales_created_ts AFTER INSERT ON sales
+WHEN NEW.created_ts IS NULL
+BEGIN
+    UPDATE sales SET created_ts = CAST(strftime('%s', NEW.created_at) AS INTEGER)
+    WHERE id = NEW.id;
+END;
+
+CREATE TRIGGER IF NOT EXISTS sale_items_created_ts AFTER INSERT ON sale_items
+WHEN NEW.created_ts IS NULL
+BEGIN
+    UPDATE sale_items SET created_ts = (SELECT created_ts FROM sales WHERE id = NEW.sale_id)
+    WHERE id = NEW.id;
+END;
@@ -0,0 +1,36 @@
+-- Full-text index over products for prefix search, kept in sync by triggers
+
+CREATE VIRTUAL TABLE IF NOT EXISTS products_fts USING fts5(
+    name,
+    barcode,
+    description,
+    content='products',
+    content_rowid='id',
+    tokenize='unicode61 remove_diacritics 2',
+    prefix='1 2 3'
+);
+
+-- Matches in the name outrank the barcode, which outranks the description
+INSERT INTO products_fts (products_fts, rank) VALUES ('rank', 'bm25(10.0, 5.0, 1.0)');
+
+INSERT INTO products_fts (products_fts) VALUES ('rebuild');
+
+CREATE TRIGGER IF NOT EXISTS products_fts_insert AFTER INSERT ON products
+BEGIN
+    INSERT INTO products_fts (rowid, name, barcode, description)
+    VALUES (NEW.id, NEW.name, NEW.barcode, NEW.description);
+END;
+
+CREATE TRIGGER IF NOT EXISTS products_fts_delete AFTER DELETE ON products
+BEGIN
+    INSERT INTO products_fts (products_fts, rowid, name, barcode, description)
+    VALUES ('delete', OLD.id, OLD.name, OLD.barcode, OLD.description);
+END;
+
+CREATE TRIGGER IF NOT EXISTS products_fts_update AFTER UPDATE OF name, barcode, description ON products
+BEGIN
+    INSERT INTO products_fts (products_fts, rowid, name, barcode, description)
+    VALUES ('delete', OLD.id, OLD.name, OLD.barcode, OLD.description);
+    INSERT INTO products_fts (rowid, name, barcode, description)
+    VALUES (NEW.id, NEW.name, NEW.barcode, NEW.description);
+END;
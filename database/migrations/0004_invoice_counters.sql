@@ -0,0 +1,9 @@
+-- Per-terminal, per-day invoice counters; allocated inside the checkout
+-- transaction so invoice numbers never collide and never need a retry
+
+CREATE TABLE IF NOT EXISTS invoice_counters (
+    terminal TEXT NOT NULL,
+    day TEXT NOT NULL,
+    last_value INTEGER NOT NULL,
+    PRIMARY KEY (terminal, day)
+) WITHOUT ROWID;
@@ -0,0 +1,41 @@
+-- Bulk imports suspend the products_fts sync triggers and rebuild the index
+-- once at the end, which is several times faster than indexing row by row.
+-- A suspended flag left behind by an interrupted import is repaired on the
+-- next start (see database.search_index.resume_search_index).
+
+CREATE TABLE IF NOT EXISTS search_index_state (
+    name TEXT PRIMARY KEY,
+    suspended INTEGER NOT NULL DEFAULT 0
+) WITHOUT ROWID;
+
+INSERT OR IGNORE INTO search_index_state (name, suspended) VALUES ('products_fts', 0);
+
+DROP TRIGGER IF EXISTS products_fts_insert;
+DROP TRIGGER IF EXISTS products_fts_delete;
+DROP TRIGGER IF EXISTS products_fts_update;
+
+CREATE TRIGGER products_fts_insert AFTER INSERT ON products
+WHEN (SELECT suspended FROM search_index_state WHERE name = 'products_fts') = 0
+BEGIN
+    INSERT INTO products_fts (rowid, name, barcode, description)
+    VALUES (NEW.id, NEW.name, NEW.barcode, NEW.description);
+END;
+
+CREATE TRIGGER products_fts_delete AFTER DELETE ON products
+WHEN (SELECT suspended FROM search_index_state WHERE name = 'products_fts') = 0
+BEGIN
+    INSERT INTO products_fts (products_fts, rowid, name, barcode, description)
+    VALUES ('delete', OLD.id, OLD.name, OLD.barcode, OLD.description);
+END;
+
+-- Upserts rewrite every column; only reindex when indexed text changed
+CREATE TRIGGER products_fts_update AFTER UPDATE OF name, barcode, description ON products
+WHEN (SELECT suspended FROM search_index_state WHERE name = 'products_fts') = 0
+    AND (OLD.name IS NOT NEW.name OR OLD.barcode IS NOT NEW.barcode
+         OR OLD.description IS NOT NEW.description)
+BEGIN
+    INSERT INTO products_fts (products_fts, rowid, name, barcode, description)
+    VALUES ('delete', OLD.id, OLD.name, OLD.barcode, OLD.description);
+    INSERT INTO products_fts (rowid, name, barcode, description)
+    VALUES (NEW.id, NEW.name, NEW.barcode, NEW.description);
+END;
@@ -0,0 +1,71 @@
+-- Per-table change counters. Every insert, update and delete bumps the
+-- table's version inside the writing transaction, so a cached result keyed
+-- by the versions it was computed from is stale exactly when a version moved.
+
+CREATE TABLE IF NOT EXISTS data_versions (
+    name TEXT PRIMARY KEY,
+    version INTEGER NOT NULL DEFAULT 0
+) WITHOUT ROWID;
+
+INSERT OR IGNORE INTO data_versions (name) VALUES
+    ('products'), ('categories'), ('sales'), ('sale_items');
+
+CREATE TRIGGER IF NOT EXISTS products_version_insert AFTER INSERT ON products
+BEGIN
+    UPDATE data_versions SET version = version + 1 WHERE name = 'products';
+END;
+
+CREATE TRIGGER IF NOT EXISTS products_version_update AFTER UPDATE ON products
+BEGIN
+    UPDATE data_versions SET version = version + 1 WHERE name = 'products';
+END;
+
+CREATE TRIGGER IF NOT EXISTS products_version_delete AFTER DELETE ON products
+BEGIN
+    UPDATE data_versions SET version = version + 1 WHERE name = 'products';
+END;
+
+CREATE TRIGGER IF NOT EXISTS categories_version_insert AFTER INSERT ON categories
+BEGIN
+    UPDATE data_versions SET version = version + 1 WHERE name = 'categories';
+END;
+
+CREATE TRIGGER IF NOT EXISTS categories_version_update AFTER UPDATE ON categories
+BEGIN
+    UPDATE data_versions SET version = version + 1 WHERE name = 'categories';
+END;
+
+CREATE TRIGGER IF NOT EXISTS categories_version_delete AFTER DELETE ON categories
+BEGIN
+    UPDATE data_versions SET version = version + 1 WHERE name = 'categories';
+END;
+
+CREATE TRIGGER IF NOT EXISTS sales_version_insert AFTER INSERT ON sales
+BEGIN
+    UPDATE data_versions SET version = version + 1 WHERE name = 'sales';
+END;
+
+CREATE TRIGGER IF NOT EXISTS sales_version_update AFTER UPDATE ON sales
+BEGIN
+    UPDATE data_versions SET version = version + 1 WHERE name = 'sales';
+END;
+
+CREATE TRIGGER IF NOT EXISTS sales_version_delete AFTER DELETE ON sales
+BEGIN
+    UPDATE data_versions SET version = version + 1 WHERE name = 'sales';
+END;
+
+CREATE TRIGGER IF NOT EXISTS sale_items_version_insert AFTER INSERT ON sale_items
+BEGIN
+    UPDATE data_versions SET version = version + 1 WHERE name = 'sale_items';
+END;
+
+CREATE TRIGGER IF NOT EXISTS sale_items_version_update AFTER UPDATE ON sale_items
+BEGIN
+    UPDATE data_versions SET version = version + 1 WHERE name = 'sale_items';
+END;
+
+CREATE TRIGGER IF NOT EXISTS sale_items_version_delete AFTER DELETE ON sale_items
+BEGIN
+    UPDATE data_versions SET version = version + 1 WHERE name = 'sale_items';
+END;
@@ -0,0 +1,145 @@
+-- Per-day sales totals kept current by triggers on sales, so summaries
+-- read one row per day instead of re-aggregating every sale.  Days are
+-- local calendar days, the same ones epoch_day_range() uses.  Rows for
+-- archived fiscal years stay here after their sales move to the archive
+-- partitions (see database.rollup).
+
+CREATE TABLE IF NOT EXISTS sales_daily (
+    day TEXT PRIMARY KEY,
+    sales_count INTEGER NOT NULL DEFAULT 0,
+    total_amount REAL NOT NULL DEFAULT 0,
+    discount REAL NOT NULL DEFAULT 0,
+    tax REAL NOT NULL DEFAULT 0,
+    final_amount REAL NOT NULL DEFAULT 0
+) WITHOUT ROWID;
+
+-- The same totals per payment method; a missing method is stored as ''
+CREATE TABLE IF NOT EXISTS sales_daily_payment (
+    day TEXT NOT NULL,
+    payment_method TEXT NOT NULL,
+    sales_count INTEGER NOT NULL DEFAULT 0,
+    total_amount REAL NOT NULL DEFAULT 0,
+    discount REAL NOT NULL DEFAULT 0,
+    tax REAL NOT NULL DEFAULT 0,
+    final_amount REAL NOT NULL DEFAULT 0,
+    PRIMARY KEY (day, payment_method)
+) WITHOUT ROWID;
+
+INSERT OR REPLACE INTO sales_daily
+SELECT date(created_ts, 'unixepoch', 'localtime'), COUNT(*), COALESCE(SUM(total_amount), 0),
+       COALESCE(SUM(discount), 0), COALESCE(SUM(tax), 0), COALESCE(SUM(final_amount), 0)
+FROM sales
+WHERE created_ts IS NOT NULL
+GROUP BY 1;
+
+INSERT OR REPLACE INTO sales_daily_payment
+SELECT date(created_ts, 'unixepoch', 'localtime'), COALESCE(payment_method, ''), COUNT(*),
+       COALESCE(SUM(total_amount), 0), COALESCE(SUM(discount), 0), COALESCE(SUM(tax), 0),
+       COALESCE(SUM(final_amount), 0)
+FROM sales
+WHERE created_ts IS NOT NULL
+GROUP BY 1, 2;
+
+-- Sales inserted without created_ts are counted once the sales_created_ts
+-- trigger fills it in, through sales_daily_update
+CREATE TRIGGER IF NOT EXISTS sales_daily_insert AFTER INSERT ON sales
+WHEN NEW.created_ts IS NOT NULL
+BEGIN
+    INSERT INTO sales_daily (day, sales_count, total_amount, discount, tax, final_amount)
+    VALUES (date(NEW.created_ts, 'unixepoch', 'localtime'), 1, COALESCE(NEW.total_amount, 0),
+            COALESCE(NEW.discount, 0), COALESCE(NEW.tax, 0), COALESCE(NEW.final_amount, 0))
+    ON CONFLICT (day) DO UPDATE SET
+        sales_count = sales_count + 1,
+        total_amount = total_amount + excluded.total_amount,
+        discount = discount + excluded.discount,
+        tax = tax + excluded.tax,
+        final_amount = final_amount + excluded.final_amount;
+
+    INSERT INTO sales_daily_payment (day, payment_method, sales_count, total_amount, discount, tax, final_amount)
+    VALUES (date(NEW.created_ts, 'unixepoch', 'localtime'), COALESCE(NEW.payment_method, ''), 1,
+            COALESCE(NEW.total_amount, 0), COALESCE(NEW.discount, 0), COALESCE(NEW.tax, 0),
+            COALESCE(NEW.final_amount, 0))
+    ON CONFLICT (day, payment_method) DO UPDATE SET
+        sales_count = sales_count + 1,
+        total_amount = total_amount + excluded.total_amount,
+        discount = discount + excluded.discount,
+        tax = tax + excluded.tax,
+        final_amount = final_amount + excluded.final_amount;
+END;
+
+CREATE TRIGGER IF NOT EXISTS sales_daily_delete AFTER DELETE ON sales
+WHEN OLD.created_ts IS NOT NULL
+BEGIN
+    UPDATE sales_daily SET
+        sales_count = sales_count - 1,
+        total_amount = total_amount - COALESCE(OLD.total_amount, 0),
+        discount = discount - COALESCE(OLD.discount, 0),
+        tax = tax - COALESCE(OLD.tax, 0),
+        final_amount = final_amount - COALESCE(OLD.final_amount, 0)
+    WHERE day = date(OLD.created_ts, 'unixepoch', 'localtime');
+    DELETE FROM sales_daily
+    WHERE day = date(OLD.created_ts, 'unixepoch', 'localtime') AND sales_count <= 0;
+
+    UPDATE sales_daily_payment SET
+        sales_count = sales_count - 1,
+        total_amount = total_amount - COALESCE(OLD.total_amount, 0),
+        discount = discount - COALESCE(OLD.discount, 0),
+        tax = tax - COALESCE(OLD.tax, 0),
+        final_amount = final_amount - COALESCE(OLD.final_amount, 0)
+    WHERE day = date(OLD.created_ts, 'unixepoch', 'localtime')
+      AND payment_method = COALESCE(OLD.payment_method, '');
+    DELETE FROM sales_daily_payment
+    WHERE day = date(OLD.created_ts, 'unixepoch', 'localtime')
+      AND payment_method = COALESCE(OLD.payment_method, '') AND sales_count <= 0;
+END;
+
+-- An update is the old row leaving its day and the new row joining its
+-- day; either side is skipped while created_ts is NULL
+CREATE TRIGGER IF NOT EXISTS sales_daily_update
+AFTER UPDATE OF created_ts, total_amount, discount, tax, final_amount, payment_method ON sales
+BEGIN
+    UPDATE sales_daily SET
+        sales_count = sales_count - 1,
+        total_amount = total_amount - COALESCE(OLD.total_amount, 0),
+        discount = discount - COALESCE(OLD.discount, 0),
+        tax = tax - COALESCE(OLD.tax, 0),
+        final_amount = final_amount - COALESCE(OLD.final_amount, 0)
+    WHERE day = date(OLD.created_ts, 'unixepoch', 'localtime');
+    DELETE FROM sales_daily
+    WHERE day = date(OLD.created_ts, 'unixepoch', 'localtime') AND sales_count <= 0;
+
+    UPDATE sales_daily_payment SET
+        sales_count = sales_count - 1,
+        total_amount = total_amount - COALESCE(OLD.total_amount, 0),
+        discount = discount - COALESCE(OLD.discount, 0),
+        tax = tax - COALESCE(OLD.tax, 0),
+        final_amount = final_amount - COALESCE(OLD.final_amount, 0)
+    WHERE day = date(OLD.created_ts, 'unixepoch', 'localtime')
+      AND payment_method = COALESCE(OLD.payment_method, '');
+    DELETE FROM sales_daily_payment
+    WHERE day = date(OLD.created_ts, 'unixepoch', 'localtime')
+      AND payment_method = COALESCE(OLD.payment_method, '') AND sales_count <= 0;
+
+    INSERT INTO sales_daily (day, sales_count, total_amount, discount, tax, final_amount)
+    SELECT date(NEW.created_ts, 'unixepoch', 'localtime'), 1, COALESCE(NEW.total_amount, 0),
+           COALESCE(NEW.discount, 0), COALESCE(NEW.tax, 0), COALESCE(NEW.final_amount, 0)
+    WHERE NEW.created_ts IS NOT NULL
+    ON CONFLICT (day) DO UPDATE SET
+        sales_count = sales_count + 1,
+        total_amount = total_amount + excluded.total_amount,
+        discount = discount + excluded.discount,
+        tax = tax + excluded.tax,
+        final_amount = final_amount + excluded.final_amount;
+
+    INSERT INTO sales_daily_payment (day, payment_method, sales_count, total_amount, discount, tax, final_amount)
+    SELECT date(NEW.created_ts, 'unixepoch', 'localtime'), COALESCE(NEW.payment_method, ''), 1,
+           COALESCE(NEW.total_amount, 0), COALESCE(NEW.discount, 0), COALESCE(NEW.tax, 0),
+           COALESCE(NEW.final_amount, 0)
+    WHERE NEW.created_ts IS NOT NULL
+    ON CONFLICT (day, payment_method) DO UPDATE SET
+        sales_count = sales_count + 1,
+        total_amount = total_amount + excluded.total_amount,
+        discount = discount + excluded.discount,
+        tax = tax + excluded.tax,
+        final_amount = final_amount + excluded.final_amount;
+END;
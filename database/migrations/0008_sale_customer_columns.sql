@@ -0,0 +1,5 @@
+-- The sale dialog asks for the customer's name and phone, and the sales
+-- list shows the name; both are optional, so older sales read as NULL.
+
+ALTER TABLE sales ADD COLUMN customer_name TEXT;
+ALTER TABLE sales ADD COLUMN customer_phone TEXT;
@@ -0,0 +1,211 @@
+"""
+SQLite connection pool for the POS system.
+
+Every thread gets one long-lived connection per database file, opened in
+WAL mode with the pragmas from ``config.DATABASE['pool']``.  Leasing and
+returning a connection is only a counter update, so callers can keep the
+familiar ``connect()``/``disconnect()`` pairs without paying for a file
+open, schema read and close on every call.
+"""
+
+import os
+import sqlite3
+import threading
+from contextlib import contextmanager
+
+from config import DATABASE
+
+
+class ConnectionPool:
+    """Per-thread pooled connections to a single SQLite database file."""
+
+    def __init__(self, path, **settings):
+        self.path = path
+        self.settings = dict(DATABASE['pool'])
+        self.settings.update(settings)
+        self.initialized = False
+        self.generation = 0
+        self.caches = {}
+        self.stats = {'opened': 0, 'leases': 0}
+        self._local = threading.local()
+        self._lock = threading.RLock()
+        self._connections = []
+        # Leases and workers of all threads; exclusive() waits for zero
+        self._active = 0
+        self._idle = threading.Condition(self._lock)
+
+    def _open(self):
+        """Open and configure a new connection for the calling thread"""
+        settings = self.settings
+        if settings['shared_cache']:
+            target = f"file:{os.path.abspath(self.path)}?cache=shared"
+            conn = sqlite3.connect(target, uri=True, timeout=settings['busy_timeout'],
+                                   check_same_thread=False)
+        else:
+            conn = sqlite3.connect(self.path, timeout=settings['busy_timeout'],
+                                   check_same_thread=False)
+        conn.row_factory = sqlite3.Row
+        conn.execute(f"PRAGMA journal_mode = {settings['journal_mode']}")
+        conn.execute(f"PRAGMA synchronous = {settings['synchronous']}")
+        conn.execute(f"PRAGMA cache_size = -{int(settings['cache_size_kb'])}")
+        conn.execute(f"PRAGMA mmap_size = {int(settings['mmap_size'])}")
+        conn.execute("PRAGMA temp_store = MEMORY")
+
+        with self._lock:
+            self._connections.append(conn)
+            self.stats['opened'] += 1
+        return conn
+
+    def connection(self):
+        """Return the calling thread's connection, opening it on first use"""
+        local = self._local
+        conn = getattr(local, 'conn', None)
+        if conn is None or local.generation != self.generation:
+            conn = self._open()
+            local.conn = conn
+            local.cursor = conn.cursor()
+            local.generation = self.generation
+            local.leases = getattr(local, 'leases', 0)
+        return conn
+
+    def cursor(self):
+        """Return the calling thread's shared cursor"""
+        self.connection()
+        return self._local.cursor
+
+    def acquire(self):
+        """Lease the calling thread's connection"""
+        conn = self.connection()
+        with self._lock:
+            self._active += 1
+        self._local.leases += 1
+        self.stats['leases'] += 1
+        return conn
+
+    def release(self):
+        """Return a lease; the connection itself stays open"""
+        local = self._local
+        if getattr(local, 'leases', 0) > 0:
+            local.leases -= 1
+            with self._lock:
+                self._active -= 1
+                self._idle.notify_all()
+
+    def release_thread(self):
+        """Close and forget the calling thread's connection
+
+        Threads that finish, such as import or export workers, call this
+        last so their connection does not stay open until close_all().
+        """
+        local = self._local
+        leases = getattr(local, 'leases', 0)
+        if leases:
+            local.leases = 0
+            with self._lock:
+                self._active -= leases
+                self._idle.notify_all()
+        conn = getattr(local, 'conn', None)
+        if conn is None:
+            return
+        local.conn = local.cursor = None
+        with self._lock:
+            if conn in self._connections:
+                self._connections.remove(conn)
+        try:
+            conn.close()
+        except sqlite3.Error:
+            pass
+
+    @contextmanager
+    def worker(self):
+        """Run a background job on the calling thread
+
+        The job counts as active until it ends, so exclusive() does not
+        replace the database under it, and the thread's connection is
+        released afterwards.
+        """
+        with self._lock:
+            self._active += 1
+        try:
+            yield self
+        finally:
+            self.release_thread()
+            with self._lock:
+                self._active -= 1
+                self._idle.notify_all()
+
+    @contextmanager
+    def exclusive(self, timeout=None):
+        """Hold the whole pool, e.g. to replace the database file
+
+        Waits until no other thread holds a lease or runs a worker(),
+        then closes every connection. Until the block ends, other threads
+        wait in acquire() and worker(); afterwards they reopen their
+        connection on next use.
+
+        Args:
+            timeout (float, optional): Seconds to wait, None for no limit
+
+        Raises:
+            TimeoutError: Other threads were still busy after timeout
+        """
+        own = getattr(self._local, 'leases', 0)
+        with self._lock:
+            if not self._idle.wait_for(lambda: self._active <= own, timeout):
+                raise TimeoutError(f"{self._active - own} lease(s) or worker(s) still active on {self.path}")
+            self.close_all()
+            yield self
+
+    def close_all(self):
+        """Close every connection of every thread
+
+        Threads transparently reopen their connection on next use.
+        """
+        with self._lock:
+            for conn in self._connections:
+                try:
+                    conn.close()
+                except sqlite3.Error:
+                    pass
+            self._connections = []
+            self.generation += 1
+
+    def register_cache(self, name, cache):
+        """Register an in-process cache that depends on this database"""
+        self.caches[name] = cache
+        return cache
+
+    def invalidate_caches(self):
+        """Drop the contents of every registered cache"""
+        for cache in self.caches.values():
+            cache.invalidate()
+
+
+def open_readonly(path):
+    """
+    Open a private read-only connection, e.g. for a report worker thread.
+
+    The connection is not pooled: its owner closes it, and may interrupt()
+    it from another thread to cancel a running query.
+    """
+    settings = DATABASE['pool']
+    conn = sqlite3.connect(f"file:{os.path.abspath(path)}?mode=ro", uri=True,
+                           timeout=settings['busy_timeout'], check_same_thread=False)
+    conn.execute("PRAGMA query_only = ON")
+    conn.execute(f"PRAGMA cache_size = -{int(settings['cache_size_kb'])}")
+    conn.execute(f"PRAGMA mmap_size = {int(settings['mmap_size'])}")
+    return conn
+
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def get_pool(path):
+    """Return the process-wide pool for a database path"""
+    key = os.path.abspath(path)
+    with _pools_lock:
+        pool = _pools.get(key)
+        if pool is None:
+            pool = _pools[key] = ConnectionPool(path)
+        return pool
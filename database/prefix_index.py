@@ -0,0 +1,134 @@
+"""
+Sorted prefix index over the in-memory product catalog, for type-ahead.
+
+Every product contributes a few keys: its case-folded name, its name
+normalized like the search index (letters and digits only, diacritics
+folded) starting at each word, and its barcode. The keys are kept in one
+sorted list, so the products whose keys start with a prefix form a single
+run found with bisect, and the first matches cost O(log n + limit).
+
+The index is built from a CatalogCache and remembers the catalog version
+it was built from. ``DatabaseManager`` updates it in place when a product
+is saved or deleted, and ``DatabaseManager.product_index`` rebuilds it
+when the catalog has changed in any other way (reload, invalidation).
+"""
+
+from array import array
+from bisect import bisect_left
+
+
+class ProductPrefixIndex:
+    """
+    Product ids sorted by every prefix-searchable key.
+
+    Args:
+        tokens (callable): Splits text into normalized tokens, usually
+            DatabaseManager.fts_tokens
+    """
+
+    def __init__(self, tokens):
+        self.tokens = tokens
+        self.keys = []
+        self.ids = array('q')
+        # Product id -> its keys, to find them again on update
+        self.product_keys = {}
+        self.catalog = None
+        self.version = None
+
+    def product_key_set(self, record):
+        keys = {record.name.casefold()} if record.name else set()
+        words = self.tokens(record.name)
+        for i in range(len(words)):
+            keys.add(' '.join(words[i:]))
+        if record.barcode:
+            keys.add(record.barcode)
+        return keys
+
+    def build(self, catalog):
+        """Index every product of catalog"""
+        entries = []
+        product_keys = {}
+        for record in catalog.by_id.values():
+            keys = self.product_key_set(record)
+            product_keys[record.id] = keys
+            entries.extend((key, record.id) for key in keys)
+        entries.sort()
+        self.product_keys = product_keys
+        self.keys = [key for key, _ in entries]
+        self.ids = array('q', (product_id for _, product_id in entries))
+        self.catalog = catalog
+        self.version = catalog.version
+
+    def is_current(self, catalog):
+        return self.catalog is catalog and self.version == catalog.version
+
+    def _position(self, key, product_id):
+        # Entries are sorted by (key, id)
+        keys, ids = self.keys, self.ids
+        i = bisect_left(keys, key)
+        while i < len(keys) and keys[i] == key and ids[i] < product_id:
+            i += 1
+        return i
+
+    def update(self, catalog, product_id):
+        """Re-index one product after catalog has saved or dropped it
+
+        Only valid when the index was current before that change; moves
+        a few entries instead of rebuilding.
+        """
+        keys, ids = self.keys, self.ids
+        for key in self.product_keys.pop(product_id, ()):
+            i = self._position(key, product_id)
+            if i < len(keys) and keys[i] == key and ids[i] == product_id:
+                del keys[i]
+                del ids[i]
+
+        record = catalog.by_id.get(product_id)
+        if record is not None:
+            new_keys = self.product_key_set(record)
+            self.product_keys[product_id] = new_keys
+            for key in new_keys:
+                i = self._position(key, product_id)
+                keys.insert(i, key)
+                ids.insert(i, product_id)
+        self.version = catalog.version
+
+    def __len__(self):
+        return len(self.keys)
+
+    def search(self, text, limit=50):
+        """Products with a key starting with text, in key order
+
+        Args:
+            text (str): What was typed so far
+            limit (int): Maximum number of products returned
+
+        Returns:
+            list: ProductRecord objects from the catalog, each at most once
+        """
+        prefixes = []
+        for prefix in (text.strip().casefold(), ' '.join(self.tokens(text))):
+            if prefix and prefix not in prefixes:
+                prefixes.append(prefix)
+
+        keys, ids, by_id = self.keys, self.ids, self.catalog.by_id if self.catalog else {}
+        seen = set()
+        matches = []
+        for prefix in prefixes:
+            i = bisect_left(keys, prefix)
+            while i < len(keys) and len(matches) < limit and keys[i].startswith(prefix):
+                product_id = ids[i]
+                if product_id not in seen:
+                    seen.add(product_id)
+                    record = by_id.get(product_id)
+                    if record is not None:
+                        matches.append(record)
+                i += 1
+        return matches
+
+    def invalidate(self):
+        self.keys = []
+        self.ids = array('q')
+        self.product_keys = {}
+        self.catalog = None
+        self.version = None
@@ -0,0 +1,84 @@
+"""
+Versioned report result cache for the POS system.
+
+A finished report is stored under (report name, parameters, data
+versions), where the data versions are the ``data_versions`` counters of
+the tables the report reads.  Triggers bump those counters on every write,
+so a lookup with the current versions can only ever return a result that
+is still correct; stale entries are never served and simply age out.
+
+Entries are kept in least-recently-used order and evicted once their
+estimated size exceeds ``DATABASE['report_cache']['max_bytes']``.
+"""
+
+import sys
+import threading
+from collections import OrderedDict
+
+from config import DATABASE
+
+
+def data_versions(conn, tables):
+    """Return the current change counters of tables, in the given order"""
+    placeholders = ', '.join('?' for _ in tables)
+    versions = dict(conn.execute(
+        f"SELECT name, version FROM data_versions WHERE name IN ({placeholders})", tuple(tables)).fetchall())
+    return tuple(versions.get(table, 0) for table in tables)
+
+
+def report_size(report):
+    """Rough number of bytes a report holds"""
+    size = sys.getsizeof(report['rows'])
+    for row in report['rows']:
+        size += sys.getsizeof(row) + sum(sys.getsizeof(value) for value in row)
+    return size
+
+
+class ReportCache:
+    """LRU cache of finished reports bounded by estimated memory"""
+
+    def __init__(self, max_bytes=None):
+        self.max_bytes = max_bytes or DATABASE['report_cache']['max_bytes']
+        self.entries = OrderedDict()
+        self.bytes = 0
+        self.stats = {'hits': 0, 'misses': 0, 'evictions': 0}
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                self.stats['misses'] += 1
+                return None
+            self.entries.move_to_end(key)
+            self.stats['hits'] += 1
+            return entry[0]
+
+    def put(self, key, report):
+        size = report_size(report)
+        with self._lock:
+            if size > self.max_bytes:
+                return
+            previous = self.entries.pop(key, None)
+            if previous is not None:
+                self.bytes -= previous[1]
+            self.entries[key] = (report, size)
+            self.bytes += size
+            while self.bytes > self.max_bytes:
+                _, (_, evicted_size) = self.entries.popitem(last=False)
+                self.bytes -= evicted_size
+                self.stats['evictions'] += 1
+
+    @property
+    def hit_rate(self):
+        lookups = self.stats['hits'] + self.stats['misses']
+        return self.stats['hits'] / lookups if lookups else 0.0
+
+    def __len__(self):
+        return len(self.entries)
+
+    def invalidate(self):
+        """Forget every entry, e.g. after the database file was replaced"""
+        with self._lock:
+            self.entries.clear()
+            self.bytes = 0
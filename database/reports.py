@@ -0,0 +1,217 @@
+"""
+Set-based report queries for the POS system.
+
+Every report is one SQL statement that joins and aggregates in SQLite and
+returns rows ready for display, instead of a query per row from the
+widget.  A finished report is a dict::
+
+    {
+        'title': 'Sales Summary',
+        'headers': [...],
+        'rows': [tuple, ...],
+        'summary': [(label, value), ...]
+    }
+
+Summary totals are accumulated from the returned rows, so they never cost
+another query.  ``iter_report`` yields the rows in chunks on any
+connection, which lets the GUI run reports on a worker thread with its own
+read-only connection (see ``ui.workers``).  Finished reports are cached by
+``report_cache`` until one of the tables they read changes.
+"""
+
+from contextlib import contextmanager
+
+from database.archive import attached_partitions
+from database.db_manager import DatabaseManager
+from database.report_cache import ReportCache, data_versions
+from utils.helpers import epoch_day_range
+
+
+@contextmanager
+def _sales_query(conn, db_path, start_date, end_date):
+    conditions, params = DatabaseManager.date_range_conditions('s.created_ts', start_date, end_date)
+    where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+    with attached_partitions(conn, db_path, *epoch_day_range(start_date, end_date)) as schemas:
+        # One branch per archive partition plus the hot database; item
+        # counts come from the sale_id index of the same database
+        branches = [f"""
+            SELECT s.created_ts, s.created_at, s.invoice_number,
+                   (SELECT COALESCE(SUM(si.quantity), 0) FROM {schema}.sale_items si
+                    WHERE si.sale_id = s.id) as items,
+                   s.total_amount, s.discount, s.tax, s.final_amount
+            FROM {schema}.sales s
+            {where}
+        """ for schema in schemas + ['main']]
+        yield f"""
+            SELECT created_at, invoice_number, items, total_amount, discount, tax, final_amount
+            FROM ({" UNION ALL ".join(branches)})
+            ORDER BY created_ts DESC
+        """, params * len(branches)
+
+
+def _sales_summary(rows, start_date, end_date):
+    return [
+        ('Period', f"{start_date} to {end_date}"),
+        ('Total Sales', sum(row[6] for row in rows)),
+        ('Total Items Sold', sum(row[2] for row in rows)),
+        ('Total Discounts', sum(row[4] or 0.0 for row in rows)),
+        ('Total Tax', sum(row[5] or 0.0 for row in rows)),
+    ]
+
+
+PRODUCTS_SQL = """
+    SELECT p.name, COALESCE(c.name, 'Unknown'), p.cost, p.price,
+           p.quantity, p.min_quantity, p.quantity * p.cost
+    FROM products p
+    LEFT JOIN categories c ON c.id = p.category_id
+    ORDER BY p.name
+"""
+
+
+def _products_summary(rows, start_date, end_date):
+    return [
+        ('Total Products', len(rows)),
+        ('Total Items in Stock', sum(row[4] for row in rows)),
+        ('Total Stock Value', sum(row[6] for row in rows)),
+    ]
+
+
+LOW_STOCK_SQL = """
+    SELECT p.name, COALESCE(c.name, 'Unknown'), p.quantity, p.min_quantity,
+           CASE WHEN p.quantity = 0 THEN 'Out of Stock' ELSE 'Low Stock' END
+    FROM products p
+    LEFT JOIN categories c ON c.id = p.category_id
+    WHERE p.quantity <= p.min_quantity
+    ORDER BY p.quantity
+"""
+
+
+def _low_stock_summary(rows, start_date, end_date):
+    return [
+        ('Total Low Stock Items', len(rows)),
+        ('Out of Stock Items', sum(1 for row in rows if row[2] == 0)),
+    ]
+
+
+CATEGORIES_SQL = """
+    SELECT c.name, COUNT(p.id), COALESCE(SUM(p.quantity), 0),
+           COALESCE(SUM(p.quantity * p.cost), 0.0)
+    FROM categories c
+    LEFT JOIN products p ON p.category_id = c.id
+    GROUP BY c.id
+    ORDER BY c.name
+"""
+
+
+def _categories_summary(rows, start_date, end_date):
+    return [
+        ('Total Categories', len(rows)),
+        ('Total Products', sum(row[1] for row in rows)),
+        ('Total Stock', sum(row[2] for row in rows)),
+        ('Total Value', sum(row[3] for row in rows)),
+    ]
+
+
+def _static_query(sql):
+    @contextmanager
+    def query(conn, db_path, start_date, end_date):
+        yield sql, []
+    return query
+
+
+REPORTS = {
+    'Sales Report': {
+        'title': 'Sales Summary',
+        'headers': ['Date', 'Invoice', 'Items', 'Total', 'Discount', 'Tax', 'Final'],
+        'query': _sales_query,
+        'summary': _sales_summary,
+        'tables': ('sales', 'sale_items'),
+        'dated': True,
+    },
+    'Products Report': {
+        'title': 'Products Summary',
+        'headers': ['Product', 'Category', 'Cost', 'Price', 'Stock', 'Min Stock', 'Value'],
+        'query': _static_query(PRODUCTS_SQL),
+        'summary': _products_summary,
+        'tables': ('products', 'categories'),
+    },
+    'Low Stock Report': {
+        'title': 'Low Stock Summary',
+        'headers': ['Product', 'Category', 'Stock', 'Min Stock', 'Status'],
+        'query': _static_query(LOW_STOCK_SQL),
+        'summary': _low_stock_summary,
+        'tables': ('products', 'categories'),
+    },
+    'Categories Report': {
+        'title': 'Categories Summary',
+        'headers': ['Category', 'Products', 'Total Stock', 'Total Value'],
+        'query': _static_query(CATEGORIES_SQL),
+        'summary': _categories_summary,
+        'tables': ('products', 'categories'),
+    },
+}
+
+
+def count_rows(conn, db_path, name, start_date=None, end_date=None):
+    """Number of rows a report will return"""
+    with REPORTS[name]['query'](conn, db_path, start_date, end_date) as (sql, params):
+        return conn.execute(f"SELECT COUNT(*) FROM ({sql})", params).fetchone()[0]
+
+
+def iter_report(conn, db_path, name, start_date=None, end_date=None, batch=500):
+    """Yield a report's rows as lists of at most batch tuples"""
+    with REPORTS[name]['query'](conn, db_path, start_date, end_date) as (sql, params):
+        cursor = conn.cursor()
+        try:
+            cursor.execute(sql, params)
+            while True:
+                rows = cursor.fetchmany(batch)
+                if not rows:
+                    break
+                yield [tuple(row) for row in rows]
+        finally:
+            cursor.close()
+
+
+def finish_report(name, rows, start_date=None, end_date=None):
+    """Wrap a report's rows with its title, headers and summary"""
+    report = REPORTS[name]
+    return {
+        'title': report['title'],
+        'headers': report['headers'],
+        'rows': rows,
+        'summary': report['summary'](rows, start_date, end_date)
+    }
+
+
+def run_report(db, name, start_date=None, end_date=None):
+    """Run a report by its ReportsWidget name on the calling thread"""
+    rows = []
+    for chunk in iter_report(db.conn, db.db_path, name, start_date, end_date, batch=5000):
+        rows.extend(chunk)
+    return finish_report(name, rows, start_date, end_date)
+
+
+def report_cache(db):
+    """The report cache shared by every user of db's connection pool"""
+    cache = db.pool.caches.get('reports')
+    if cache is None:
+        cache = db.pool.register_cache('reports', ReportCache())
+    return cache
+
+
+def report_key(conn, name, start_date=None, end_date=None):
+    """Cache key of a report: its name, parameters and input data versions"""
+    params = (start_date, end_date) if REPORTS[name].get('dated') else ()
+    return name, params, data_versions(conn, REPORTS[name]['tables'])
+
+
+def cached_report(db, name, start_date=None, end_date=None):
+    """Run a report, or return it from the cache if its tables are unchanged"""
+    cache = report_cache(db)
+    key = report_key(db.conn, name, start_date, end_date)
+    report = cache.get(key)
+    if report is None:
+        report = run_report(db, name, start_date, end_date)
+        cache.put(key, report)
+    return report
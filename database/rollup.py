@@ -0,0 +1,220 @@
+"""
+Daily sales rollup for the POS system.
+
+``sales_daily`` holds one row per local calendar day with the number of
+sales and the sums of total_amount, discount, tax and final_amount;
+``sales_daily_payment`` holds the same per day and payment method.  The
+triggers from migration 0007 keep both current on every insert, update and
+delete on ``sales``, so a summary over any date range reads one row per
+day (at most 366 per year) instead of every sale.
+
+Archived fiscal years keep their rollup rows: ``archive_year`` adds the
+moved sales back after deleting them from the hot table.  This module also
+rebuilds the rollup from scratch (``backfill``) and compares it with the
+sales it summarises (``check``)::
+
+    python -m database.rollup --check
+    python -m database.rollup --backfill
+"""
+
+import argparse
+import os
+import sqlite3
+import sys
+import time
+from collections import defaultdict
+
+from config import DATABASE
+from database.archive import archived_years, partition_path
+from database.pool import open_readonly
+from utils.logger import setup_logger, log_info, log_error
+
+logger = setup_logger('database.rollup')
+
+TOTALS = ('sales_count', 'total_amount', 'discount', 'tax', 'final_amount')
+# Float sums drift by rounding as sales are added and removed
+TOLERANCE = 0.005
+
+_DAY = "date(created_ts, 'unixepoch', 'localtime')"
+_SUMS = ("COUNT(*), COALESCE(SUM(total_amount), 0), COALESCE(SUM(discount), 0), "
+         "COALESCE(SUM(tax), 0), COALESCE(SUM(final_amount), 0)")
+
+_ADD = """
+    ON CONFLICT ({key}) DO UPDATE SET
+        sales_count = sales_count + excluded.sales_count,
+        total_amount = total_amount + excluded.total_amount,
+        discount = discount + excluded.discount,
+        tax = tax + excluded.tax,
+        final_amount = final_amount + excluded.final_amount
+"""
+ADD_DAILY = "INSERT INTO sales_daily VALUES (?, ?, ?, ?, ?, ?)" + _ADD.format(key='day')
+ADD_PAYMENT = ("INSERT INTO sales_daily_payment VALUES (?, ?, ?, ?, ?, ?, ?)"
+               + _ADD.format(key='day, payment_method'))
+
+
+def day_range_conditions(start_date=None, end_date=None):
+    """Conditions on the rollup's day column for an inclusive date range"""
+    conditions = []
+    params = []
+    if start_date:
+        conditions.append("day >= ?")
+        params.append(str(start_date)[:10])
+    if end_date:
+        conditions.append("day <= ?")
+        params.append(str(end_date)[:10])
+    return conditions, params
+
+
+def aggregate(conn, schema='main', start_ts=None, end_ts=None):
+    """
+    Aggregate a sales table into rollup rows.
+
+    Args:
+        conn (sqlite3.Connection): Connection that can read schema.sales
+        schema (str): Schema holding the sales table
+        start_ts (int, optional): First epoch second to include
+        end_ts (int, optional): First epoch second to exclude
+
+    Returns:
+        tuple: (daily rows, payment rows), shaped like the rollup tables
+    """
+    conditions = ["created_ts IS NOT NULL"]
+    params = []
+    if start_ts is not None:
+        conditions.append("created_ts >= ?")
+        params.append(start_ts)
+    if end_ts is not None:
+        conditions.append("created_ts < ?")
+        params.append(end_ts)
+    where = ' AND '.join(conditions)
+    daily = conn.execute(f"SELECT {_DAY}, {_SUMS} FROM {schema}.sales WHERE {where} GROUP BY 1",
+                         params).fetchall()
+    payment = conn.execute(f"SELECT {_DAY}, COALESCE(payment_method, ''), {_SUMS} "
+                           f"FROM {schema}.sales WHERE {where} GROUP BY 1, 2", params).fetchall()
+    return [tuple(row) for row in daily], [tuple(row) for row in payment]
+
+
+def add_rows(conn, daily, payment):
+    """Add aggregated rows onto the rollup, inside the caller's transaction"""
+    conn.executemany(ADD_DAILY, daily)
+    conn.executemany(ADD_PAYMENT, payment)
+
+
+def _all_sales(conn, db_path):
+    """Aggregate the hot sales table and every archive partition"""
+    sources = [aggregate(conn)]
+    for year in archived_years(db_path):
+        partition = open_readonly(partition_path(db_path, year))
+        try:
+            sources.append(aggregate(partition))
+        finally:
+            partition.close()
+    return sources
+
+
+def backfill(conn, db_path):
+    """
+    Rebuild the rollup tables from the hot database and the archive.
+
+    The partitions are read first; the rollup is then replaced in a single
+    transaction, so readers never see it half built.
+
+    Returns:
+        int: Number of days in the rollup, or None on error
+    """
+    start = time.perf_counter()
+    try:
+        sources = _all_sales(conn, db_path)
+        if conn.in_transaction:
+            conn.commit()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.execute("DELETE FROM sales_daily")
+            conn.execute("DELETE FROM sales_daily_payment")
+            for daily, payment in sources:
+                add_rows(conn, daily, payment)
+            days = conn.execute("SELECT COUNT(*) FROM sales_daily").fetchone()[0]
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        log_info(logger, f"Rebuilt sales rollup: {days} days",
+                 {"duration": round(time.perf_counter() - start, 3)})
+        return days
+    except Exception as e:
+        log_error(logger, e, {"operation": "rollup_backfill"})
+        return None
+
+
+def _differs(expected, actual):
+    if expected is None or actual is None:
+        return True
+    return (expected[0] != actual[0] or
+            any(abs(e - a) > TOLERANCE for e, a in zip(expected[1:], actual[1:])))
+
+
+def check(conn, db_path):
+    """
+    Compare the rollup with the sales it summarises.
+
+    Returns:
+        list: (table, key, expected totals, stored totals) for every row
+        that differs; totals are None where a row is missing
+    """
+    expected = {'sales_daily': defaultdict(lambda: [0] * len(TOTALS)),
+                'sales_daily_payment': defaultdict(lambda: [0] * len(TOTALS))}
+    for daily, payment in _all_sales(conn, db_path):
+        for table, rows, width in (('sales_daily', daily, 1), ('sales_daily_payment', payment, 2)):
+            for row in rows:
+                totals = expected[table][row[:width]]
+                for i, value in enumerate(row[width:]):
+                    totals[i] += value
+
+    mismatches = []
+    for table, width in (('sales_daily', 1), ('sales_daily_payment', 2)):
+        stored = {row[:width]: row[width:]
+                  for row in map(tuple, conn.execute(f"SELECT * FROM {table}"))}
+        for key in sorted(set(stored) | set(expected[table])):
+            totals = expected[table].get(key)
+            totals = tuple(totals) if totals else None
+            if _differs(totals, stored.get(key)):
+                mismatches.append((table, key, totals, stored.get(key)))
+    return mismatches
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Maintain the daily sales rollup")
+    parser.add_argument('--db', default=DATABASE['path'], help="Database path, defaults to the POS database")
+    action = parser.add_mutually_exclusive_group(required=True)
+    action.add_argument('--backfill', action='store_true', help="Rebuild the rollup from all sales")
+    action.add_argument('--check', action='store_true', help="Report days where the rollup is wrong")
+    args = parser.parse_args()
+
+    if args.db == DATABASE['path']:
+        from database.db_manager import adopt_legacy_database
+        adopt_legacy_database(args.db)
+    # sqlite3.connect would create an empty database and check nothing
+    if not os.path.exists(args.db):
+        parser.error(f"database not found: {args.db}")
+
+    conn = sqlite3.connect(args.db)
+    try:
+        if args.backfill:
+            days = backfill(conn, args.db)
+            if days is None:
+                print("Backfill failed, see the log for details")
+                sys.exit(1)
+            print(f"Rollup rebuilt: {days:,} days")
+        else:
+            mismatches = check(conn, args.db)
+            for table, key, expected, stored in mismatches:
+                print(f"{table} {' '.join(key)}: expected {expected}, stored {stored}")
+            print(f"{len(mismatches)} mismatched rows")
+            if mismatches:
+                sys.exit(1)
+    finally:
+        conn.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,27 @@
+"""
+Maintenance of the products_fts full-text index for the POS system.
+
+Triggers keep ``products_fts`` in step with ``products`` (migration 0003).
+Bulk writers such as the CSV importer suspend them through the
+``search_index_state`` flag (migration 0005) and rebuild the index once at
+the end. ``DatabaseManager`` resumes an index left suspended by an
+interrupted import when it initializes the database.
+"""
+
+
+def suspend_search_index(conn):
+    """Stop the products_fts triggers; rows written meanwhile are not indexed"""
+    conn.execute("UPDATE search_index_state SET suspended = 1 WHERE name = 'products_fts'")
+    conn.commit()
+
+
+def resume_search_index(conn):
+    """Rebuild products_fts and re-enable its triggers in one transaction"""
+    conn.execute("INSERT INTO products_fts (products_fts) VALUES ('rebuild')")
+    conn.execute("UPDATE search_index_state SET suspended = 0 WHERE name = 'products_fts'")
+    conn.commit()
+
+
+def search_index_suspended(conn):
+    row = conn.execute("SELECT suspended FROM search_index_state WHERE name = 'products_fts'").fetchone()
+    return bool(row and row[0])
@@ -3,7 +3,7 @@ import os
 from PyQt5.QtWidgets import (QApplication, QMainWindow, QTabWidget, QMessageBox, 
                            QWidget, QVBoxLayout, QMenuBar, QMenu, QAction, 
                            QStatusBar)
-from PyQt5.QtCore import Qt
+from PyQt5.QtCore import Qt, QTimer, QThreadPool
 from PyQt5.QtGui import QIcon
 
 from database.db_manager import DatabaseManager
@@ -13,6 +13,9 @@ from ui.sales import SalesWidget
 from ui.products import ProductsWidget
 from ui.categories import CategoriesWidget
 from ui.reports import ReportsWidget
+from ui.backup import BackupDialog
+from ui.lazy_tab import LazyTab
+from ui.workers import CatalogPrefetchWorker
 from utils.notifications import NotificationSystem
 from utils.styles import MAIN_STYLE
 
@@ -21,6 +24,7 @@ class MainWindow(QMainWindow):
         super().__init__()
         self.db_manager = DatabaseManager()
         self.current_user = None
+        self.prefetch_worker = None
         self.notifications = NotificationSystem(self)
         self.init_ui()
         self.hide()  # Hide the main window initially
@@ -51,12 +55,13 @@ class MainWindow(QMainWindow):
         self.tabs = QTabWidget()
         main_layout.addWidget(self.tabs)
         
-        # Initialize tab widgets with icons
-        self.dashboard = DashboardWidget(self)
-        self.sales = SalesWidget(self)
-        self.products = ProductsWidget(self)
-        self.categories = CategoriesWidget(self)
-        self.reports = ReportsWidget(self)
+        # Tab pages are placeholders; each widget is built, and queries the
+        # database, the first time its tab is shown
+        self.dashboard = LazyTab(lambda: DashboardWidget(self))
+        self.sales = LazyTab(lambda: SalesWidget(self))
+        self.products = LazyTab(lambda: ProductsWidget(self))
+        self.categories = LazyTab(lambda: CategoriesWidget(self))
+        self.reports = LazyTab(lambda: ReportsWidget(self))
         
         # Add tabs with icons
         self.tabs.addTab(self.dashboard, QIcon("resources/images/dashboard.png"), "Dashboard")
@@ -64,6 +69,7 @@ class MainWindow(QMainWindow):
         self.tabs.addTab(self.products, QIcon("resources/images/products.png"), "Products")
         self.tabs.addTab(self.categories, QIcon("resources/images/categories.png"), "Categories")
         self.tabs.addTab(self.reports, QIcon("resources/images/reports.png"), "Reports")
+        self.tabs.currentChanged.connect(self.tab_activated)
         
         # Set application style
         self.setStyleSheet(MAIN_STYLE)
@@ -81,6 +87,10 @@ class MainWindow(QMainWindow):
         new_sale_action.triggered.connect(lambda: self.set_current_tab(1))  # Switch to Sales tab
         file_menu.addAction(new_sale_action)
         
+        backup_action = QAction("Backup Database", self)
+        backup_action.triggered.connect(self.backup_database)
+        file_menu.addAction(backup_action)
+        
         file_menu.addSeparator()
         
         exit_action = QAction("Exit", self)
@@ -119,6 +129,12 @@ class MainWindow(QMainWindow):
         about_action.triggered.connect(self.show_about)
         help_menu.addAction(about_action)
 
+    def backup_database(self):
+        """Back up the database in the background while the POS stays usable"""
+        self.backup_dialog = BackupDialog(self.db_manager.db_path, self)
+        self.backup_dialog.show()
+        self.backup_dialog.start()
+
     def show_about(self):
         """Show about dialog"""
         QMessageBox.about(self, "About POS System",
@@ -132,11 +148,41 @@ class MainWindow(QMainWindow):
 
     def on_login_successful(self, user_data):
         self.current_user = user_data
-        self.show()  # Show the main window after successful login
         self.update_ui_for_user()
-        self.dashboard.update_summary()  # Update dashboard after login
+        if self.dashboard.widget is None:
+            self.dashboard.ensure_built()  # Loads its summary
+        else:
+            self.dashboard.widget.update_summary()
+        self.show()  # Show the main window after successful login
+        # Once the window is up, load the catalog for scans and type-ahead;
+        # the timer also fires while the welcome message below is open
+        QTimer.singleShot(0, self.prefetch)
         self.notifications.show_success("Login Successful", f"Welcome back, {user_data['full_name']}!")
 
+    def prefetch(self):
+        """Load the product catalog and its index off the GUI thread"""
+        if self.prefetch_worker is not None:
+            return
+        self.prefetch_worker = CatalogPrefetchWorker(self.db_manager.db_path)
+        self.prefetch_worker.signals.finished.connect(self.prefetch_finished)
+        self.prefetch_worker.signals.failed.connect(self.prefetch_failed)
+        QThreadPool.globalInstance().start(self.prefetch_worker)
+
+    def prefetch_finished(self, result):
+        self.prefetch_worker = None
+        self.db_manager.install_catalog(*result)
+
+    def prefetch_failed(self, message):
+        # Nothing lost: the catalog loads on first use instead
+        self.prefetch_worker = None
+
+    def tab_activated(self, index):
+        """Build a tab the first time it is shown, after its placeholder
+        has been painted"""
+        page = self.tabs.widget(index)
+        if isinstance(page, LazyTab) and page.widget is None:
+            QTimer.singleShot(0, page.ensure_built)
+
     def update_ui_for_user(self):
         # Update UI based on user role
         if self.current_user['role'] != 'admin':
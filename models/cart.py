@@ -0,0 +1,146 @@
+from decimal import Decimal, ROUND_HALF_UP
+
+# Minor units (halalas, cents) per currency unit
+MINOR_UNITS = 100
+
+
+def to_minor(amount):
+    """Convert an amount in currency units to integer minor units, rounding half up"""
+    return int((Decimal(str(amount or 0)) * MINOR_UNITS).to_integral_value(ROUND_HALF_UP))
+
+
+def to_major(minor):
+    """Convert integer minor units back to a float amount"""
+    return minor / MINOR_UNITS
+
+
+def format_minor(minor):
+    """Format minor units as an amount with two decimals"""
+    sign = '-' if minor < 0 else ''
+    units, cents = divmod(abs(minor), MINOR_UNITS)
+    return f"{sign}{units}.{cents:02d}"
+
+
+class CartLine:
+    """One product in a cart; prices are in minor units"""
+
+    __slots__ = ('product', 'product_id', 'name', 'unit_price', 'quantity', 'stock')
+
+    def __init__(self, product, quantity):
+        self.product = product
+        self.product_id = product['id']
+        self.name = product['name']
+        self.unit_price = to_minor(product['price'])
+        self.quantity = quantity
+        self.stock = product.get('quantity', 0)
+
+    @property
+    def total(self):
+        return self.unit_price * self.quantity
+
+
+class Cart:
+    """
+    The lines of a sale being rung up, and its running totals.
+
+    Lines are kept in the order they were added, with an index from
+    product id to row, so adding a product that is already in the cart
+    finds its line without a scan. All amounts are integer minor units.
+    The subtotal is adjusted by the change of each line as it is added,
+    changed or removed. Tax and the final total are derived from the
+    subtotal, so recalculating never walks the lines.
+
+    Tax is a percentage of the subtotal before discount, as on the sale
+    screen: total = subtotal - discount + tax.
+    """
+
+    def __init__(self):
+        self.lines = []
+        self.rows = {}
+        self.subtotal = 0
+        self.discount = 0
+        # Hundredths of a percent, so 15% is 1500
+        self.tax_rate = 0
+
+    def __len__(self):
+        return len(self.lines)
+
+    def line(self, product_id):
+        """The line of a product, or None"""
+        row = self.rows.get(product_id)
+        return None if row is None else self.lines[row]
+
+    def row_of(self, product_id):
+        return self.rows.get(product_id)
+
+    def add(self, product, quantity=1):
+        """Add quantity of product, merging with its existing line
+
+        Args:
+            product (dict): id, name, price and quantity (stock on hand)
+            quantity (int): Units to add
+
+        Returns:
+            tuple: (row, created) where created is False when an existing
+            line was increased
+        """
+        row = self.rows.get(product['id'])
+        if row is not None:
+            self.set_quantity(row, self.lines[row].quantity + quantity)
+            return row, False
+
+        line = CartLine(product, quantity)
+        row = len(self.lines)
+        self.lines.append(line)
+        self.rows[line.product_id] = row
+        self.subtotal += line.total
+        return row, True
+
+    def set_quantity(self, row, quantity):
+        line = self.lines[row]
+        self.subtotal += line.unit_price * (quantity - line.quantity)
+        line.quantity = quantity
+
+    def remove(self, row):
+        """Remove the line at row and return it"""
+        line = self.lines.pop(row)
+        del self.rows[line.product_id]
+        for later in self.lines[row:]:
+            self.rows[later.product_id] -= 1
+        self.subtotal -= line.total
+        return line
+
+    def clear(self):
+        self.lines = []
+        self.rows = {}
+        self.subtotal = 0
+
+    def set_discount(self, amount):
+        self.discount = to_minor(amount)
+
+    def set_tax_rate(self, percent):
+        self.tax_rate = to_minor(percent)
+
+    @property
+    def tax(self):
+        # Rounded half up to the nearest minor unit
+        return (self.subtotal * self.tax_rate + 5000) // 10000
+
+    @property
+    def total(self):
+        return self.subtotal - self.discount + self.tax
+
+    def sale_totals(self):
+        """The amounts of DatabaseManager.checkout's sale dict, as floats"""
+        return {
+            'total_amount': to_major(self.subtotal),
+            'discount': to_major(self.discount),
+            'tax': to_major(self.tax),
+            'final_amount': to_major(self.total),
+        }
+
+    def items(self):
+        """The lines as DatabaseManager.checkout items"""
+        return [{'product_id': line.product_id, 'quantity': line.quantity,
+                 'price': to_major(line.unit_price), 'total': to_major(line.total)}
+                for line in self.lines]
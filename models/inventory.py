@@ -32,8 +32,9 @@ class Inventory:
     
     def update_stock(self, product_id, new_quantity, notes=""):
         """تحديث كمية المخزون"""
+        cursor = None
         try:
-            conn, cursor = self.db.connect()
+            cursor = self.db.connect()
             
             # الحصول على الكمية الحالية
             cursor.execute("SELECT quantity FROM products WHERE id = ?", (product_id,))
@@ -58,16 +59,16 @@ class Inventory:
                 (product_id, current_quantity, new_quantity, quantity_change, notes)
             )
             
-            conn.commit()
+            self.db.commit()
             return True
             
         except Exception as e:
-            if conn:
-                conn.rollback()
+            if cursor:
+                self.db.conn.rollback()
             print(f"خطأ في تحديث المخزون: {e}")
             return False
         finally:
-            self.db.close()
+            self.db.disconnect()
     
     def get_inventory_history(self, product_id=None, start_date=None, end_date=None, limit=100):
         """الحصول على سجل تغييرات المخزون"""
@@ -14,6 +14,7 @@ class Product:
             ''', (barcode, name, description, category_id, price, cost_price, quantity, min_quantity))
             self.db_manager.commit()
             product_id = cursor.lastrowid
+            self.db_manager.product_saved(product_id)
             return product_id
         except Exception as e:
             print(f"خطأ في إضافة المنتج: {e}")
@@ -32,6 +33,7 @@ class Product:
             WHERE id = ?
             ''', (barcode, name, description, category_id, price, cost_price, quantity, min_quantity, product_id))
             self.db_manager.commit()
+            self.db_manager.product_saved(product_id)
             return cursor.rowcount > 0
         except Exception as e:
             print(f"خطأ في تحديث المنتج: {e}")
@@ -45,6 +47,7 @@ class Product:
             cursor = self.db_manager.connect()
             cursor.execute("DELETE FROM products WHERE id = ?", (product_id,))
             self.db_manager.commit()
+            self.db_manager.product_deleted(product_id)
             return cursor.rowcount > 0
         except Exception as e:
             print(f"خطأ في حذف المنتج: {e}")
@@ -87,8 +90,13 @@ class Product:
         finally:
             self.db_manager.disconnect()
     
-    def get_all_products(self, search_term=None, category_id=None):
+    def get_all_products(self, search_term=None, category_id=None, limit=None):
         """الحصول على جميع المنتجات مع إمكانية البحث والتصفية"""
+        if search_term and search_term.strip():
+            # البحث عبر فهرس النص الكامل مرتباً حسب الصلة
+            products = self.db_manager.search_products(search_term, limit, category_id)
+            return [dict(row) for row in products]
+        
         try:
             cursor = self.db_manager.connect()
             query = '''
@@ -98,21 +106,16 @@ class Product:
             '''
             params = []
             
-            if search_term or category_id:
-                query += " WHERE "
-                conditions = []
-                
-                if search_term:
-                    conditions.append("(p.name LIKE ? OR p.barcode LIKE ? OR p.description LIKE ?)")
-                    params.extend([f"%{search_term}%", f"%{search_term}%", f"%{search_term}%"])
-                
-                if category_id:
-                    conditions.append("p.category_id = ?")
-                    params.append(category_id)
-                
-                query += " AND ".join(conditions)
+            if category_id:
+                query += " WHERE p.category_id = ?"
+                params.append(category_id)
             
             query += " ORDER BY p.name"
+            
+            if limit:
+                query += " LIMIT ?"
+                params.append(limit)
+            
             cursor.execute(query, params)
             
             return [dict(row) for row in cursor.fetchall()]
@@ -132,6 +135,7 @@ class Product:
             WHERE id = ?
             ''', (quantity_change, product_id))
             self.db_manager.commit()
+            self.db_manager.product_stock_changed({product_id: quantity_change})
             return cursor.rowcount > 0
         except Exception as e:
             print(f"خطأ في تحديث المخزون: {e}")
@@ -1,26 +1,19 @@
 from database.db_manager import DatabaseManager
+from database.rollup import day_range_conditions
+from utils.helpers import epoch_day_range
 import datetime
-import random
-import string
 
 class Sale:
     def __init__(self, db_manager=None):
         self.db_manager = db_manager or DatabaseManager()
     
-    def generate_invoice_number(self):
-        """توليد رقم فاتورة فريد"""
-        # توليد رقم فاتورة بتنسيق: INV-YYYYMMDD-XXXX
-        today = datetime.datetime.now().strftime('%Y%m%d')
-        random_chars = ''.join(random.choices(string.ascii_uppercase + string.digits, k=4))
-        return f"INV-{today}-{random_chars}"
-    
     def add_sale(self, customer_name, customer_phone, total_amount, discount, tax, final_amount, payment_method, user_id):
         """إضافة فاتورة جديدة"""
         try:
             cursor = self.db_manager.connect()
             
-            # توليد رقم فاتورة فريد
-            invoice_number = self.generate_invoice_number()
+            # حجز رقم الفاتورة التالي ضمن نفس المعاملة
+            invoice_number = self.db_manager.invoice_sequence.allocate(cursor)
             
             cursor.execute('''
             INSERT INTO sales (invoice_number, customer_name, customer_phone, total_amount, discount, tax, final_amount, payment_method, user_id)
@@ -31,6 +24,8 @@ class Sale:
             sale_id = cursor.lastrowid
             return sale_id
         except Exception as e:
+            # التراجع عن حجز رقم الفاتورة مع الفاتورة
+            self.db_manager.conn.rollback()
             print(f"خطأ في إضافة الفاتورة: {e}")
             return None
         finally:
@@ -57,16 +52,7 @@ class Sale:
             cursor = self.db_manager.connect()
             
             query = "SELECT * FROM sales"
-            params = []
-            conditions = []
-            
-            if start_date:
-                conditions.append("DATE(created_at) >= ?")
-                params.append(start_date)
-            
-            if end_date:
-                conditions.append("DATE(created_at) <= ?")
-                params.append(end_date)
+            conditions, params = self.db_manager.date_range_conditions('created_ts', start_date, end_date)
             
             if customer_name:
                 conditions.append("customer_name LIKE ?")
@@ -75,7 +61,7 @@ class Sale:
             if conditions:
                 query += " WHERE " + " AND ".join(conditions)
             
-            query += " ORDER BY created_at DESC"
+            query += " ORDER BY created_ts DESC"
             
             cursor.execute(query, params)
             return [dict(row) for row in cursor.fetchall()]
@@ -89,19 +75,22 @@ class Sale:
         """الحصول على تقرير المبيعات خلال فترة زمنية محددة"""
         try:
             cursor = self.db_manager.connect()
-            cursor.execute('''
+            # من جدول الملخص اليومي، ويشمل السنوات المؤرشفة
+            conditions, params = day_range_conditions(start_date, end_date)
+            where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+            cursor.execute(f'''
             SELECT 
-                COUNT(*) as total_sales,
+                SUM(sales_count) as total_sales,
                 SUM(total_amount) as total_amount,
                 SUM(discount) as total_discount,
                 SUM(tax) as total_tax,
                 SUM(final_amount) as total_final_amount,
-                payment_method,
-                COUNT(DISTINCT DATE(created_at)) as days_count
-            FROM sales
-            WHERE DATE(created_at) BETWEEN ? AND ?
+                NULLIF(payment_method, '') as payment_method,
+                COUNT(DISTINCT day) as days_count
+            FROM sales_daily_payment
+            {where}
             GROUP BY payment_method
-            ''', (start_date, end_date))
+            ''', params)
             
             return [dict(row) for row in cursor.fetchall()]
         except Exception as e:
@@ -115,14 +104,15 @@ class Sale:
         try:
             cursor = self.db_manager.connect()
             today = datetime.datetime.now().strftime('%Y-%m-%d')
+            start_ts, end_ts = epoch_day_range(today, today)
             
             cursor.execute('''
             SELECT 
                 COUNT(*) as count,
                 SUM(final_amount) as total_amount
             FROM sales
-            WHERE DATE(created_at) = ?
-            ''', (today,))
+            WHERE created_ts >= ? AND created_ts < ?
+            ''', (start_ts, end_ts))
             
             result = cursor.fetchone()
             if result and result['count'] > 0:
@@ -9,6 +9,7 @@ from .sales import SalesWidget
 from .products import ProductsWidget
 from .categories import CategoriesWidget
 from .reports import ReportsWidget
+from .backup import BackupDialog
 
 __all__ = [
     'LoginWindow',
@@ -16,5 +17,6 @@ __all__ = [
     'SalesWidget',
     'ProductsWidget',
     'CategoriesWidget',
-    'ReportsWidget'
+    'ReportsWidget',
+    'BackupDialog'
 ] 
\ No newline at end of file
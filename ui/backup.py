@@ -0,0 +1,69 @@
+from PyQt5.QtWidgets import (QDialog, QVBoxLayout, QHBoxLayout, QLabel,
+                             QProgressBar, QPushButton)
+from PyQt5.QtCore import QObject, pyqtSignal
+
+from database.backup import BackupThread
+
+class BackupSignals(QObject):
+    """Carries backup progress from the worker thread to the GUI thread"""
+    progress = pyqtSignal(int, int)
+    finished = pyqtSignal(object)
+
+class BackupDialog(QDialog):
+    """Non-modal progress window for an online database backup"""
+
+    def __init__(self, db_path, parent=None):
+        super().__init__(parent)
+        self.db_path = db_path
+        self.worker = None
+        self.signals = BackupSignals()
+        self.signals.progress.connect(self.update_progress)
+        self.signals.finished.connect(self.backup_finished)
+        self.init_ui()
+
+    def init_ui(self):
+        self.setWindowTitle('Database Backup')
+        self.setMinimumWidth(400)
+
+        layout = QVBoxLayout()
+        layout.setSpacing(10)
+        layout.setContentsMargins(20, 20, 20, 20)
+
+        self.status_label = QLabel('Preparing backup...')
+        layout.addWidget(self.status_label)
+
+        self.progress_bar = QProgressBar()
+        self.progress_bar.setRange(0, 0)
+        layout.addWidget(self.progress_bar)
+
+        button_layout = QHBoxLayout()
+        button_layout.addStretch()
+        self.close_button = QPushButton('Close')
+        self.close_button.setEnabled(False)
+        self.close_button.clicked.connect(self.accept)
+        button_layout.addWidget(self.close_button)
+        layout.addLayout(button_layout)
+
+        self.setLayout(layout)
+
+    def start(self):
+        """Start the backup on a background thread; sales can continue meanwhile"""
+        self.worker = BackupThread(self.db_path,
+                                   progress=self.signals.progress.emit,
+                                   finished=self.signals.finished.emit)
+        self.worker.start()
+
+    def update_progress(self, copied, total):
+        self.progress_bar.setRange(0, total)
+        self.progress_bar.setValue(copied)
+        self.status_label.setText(f'Copying pages {copied:,} of {total:,}...')
+
+    def backup_finished(self, backup_path):
+        self.close_button.setEnabled(True)
+        if backup_path:
+            self.progress_bar.setValue(self.progress_bar.maximum())
+            self.status_label.setText(f'Backup verified and saved to:\n{backup_path}')
+        else:
+            self.progress_bar.setRange(0, 1)
+            self.progress_bar.setValue(0)
+            self.status_label.setText('Backup failed. See the log for details.')
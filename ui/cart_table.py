@@ -0,0 +1,85 @@
+from PyQt5.QtCore import Qt, QAbstractTableModel, QModelIndex
+
+from models.cart import format_minor
+
+
+class CartTableModel(QAbstractTableModel):
+    """
+    The lines of a models.cart.Cart for a QTableView.
+
+    Changes to the cart go through the model so the view is told about
+    them. Only the affected row is inserted, updated or removed. Cells are
+    formatted from the cart's integer amounts when painted and are never
+    parsed back. The Remove column holds no data; it is painted by
+    ui.delegates.ActionColumnDelegate.
+
+    Args:
+        cart (Cart): The cart to show
+    """
+
+    HEADERS = ['Product', 'Price', 'Quantity', 'Total', 'Stock', 'Remove']
+    REMOVE_COLUMN = 5
+
+    def __init__(self, cart, parent=None):
+        super().__init__(parent)
+        self.cart = cart
+
+    def add(self, product, quantity):
+        """Add to the cart; returns the row of the product's line"""
+        cart = self.cart
+        row = cart.row_of(product['id'])
+        if row is None:
+            row = len(cart)
+            self.beginInsertRows(QModelIndex(), row, row)
+            cart.add(product, quantity)
+            self.endInsertRows()
+        else:
+            cart.add(product, quantity)
+            self.dataChanged.emit(self.index(row, 2), self.index(row, 3))
+        return row
+
+    def remove(self, row):
+        self.beginRemoveRows(QModelIndex(), row, row)
+        line = self.cart.remove(row)
+        self.endRemoveRows()
+        return line
+
+    def clear(self):
+        self.beginResetModel()
+        self.cart.clear()
+        self.endResetModel()
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.cart)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.HEADERS)
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role == Qt.DisplayRole and orientation == Qt.Horizontal:
+            return self.HEADERS[section]
+        return None
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid() or role != Qt.DisplayRole:
+            return None
+        line = self.cart.lines[index.row()]
+        column = index.column()
+        if column == 0:
+            return line.name
+        if column == 1:
+            return format_minor(line.unit_price)
+        if column == 2:
+            return str(line.quantity)
+        if column == 3:
+            return format_minor(line.total)
+        if column == 4:
+            return str(line.stock)
+        return None
+
+    def flags(self, index):
+        if not index.isValid():
+            return Qt.NoItemFlags
+        if index.column() == self.REMOVE_COLUMN:
+            return Qt.ItemIsEnabled
+        return Qt.ItemIsEnabled | Qt.ItemIsSelectable
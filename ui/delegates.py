@@ -0,0 +1,65 @@
+from PyQt5.QtWidgets import QStyledItemDelegate, QStyleOptionButton, QStyle, QApplication
+from PyQt5.QtCore import Qt, QEvent, QModelIndex, QSize, pyqtSignal
+
+
+class ActionColumnDelegate(QStyledItemDelegate):
+    """
+    Paints a push button in every cell of a column and reports clicks.
+
+    Nothing is created per row: the button is drawn with the current style
+    and a click is dispatched by the model index it landed on, so rows can
+    be inserted, removed or re-sorted without rewiring anything. Connect
+    clicked(QModelIndex) and read the row from the index at click time.
+
+    Args:
+        text (str): Button label
+        parent (QObject, optional): Usually the view
+    """
+
+    clicked = pyqtSignal(QModelIndex)
+
+    MARGIN = 2
+
+    def __init__(self, text, parent=None):
+        super().__init__(parent)
+        self.text = text
+        self.pressed = None
+
+    def button_rect(self, option):
+        return option.rect.adjusted(self.MARGIN, self.MARGIN, -self.MARGIN, -self.MARGIN)
+
+    def paint(self, painter, option, index):
+        button = QStyleOptionButton()
+        button.rect = self.button_rect(option)
+        button.text = self.text
+        button.state = QStyle.State_Enabled
+        if self.pressed is not None and self.pressed == (index.row(), index.column()):
+            button.state |= QStyle.State_Sunken
+        else:
+            button.state |= QStyle.State_Raised
+        widget = option.widget
+        style = widget.style() if widget is not None else QApplication.style()
+        style.drawControl(QStyle.CE_PushButton, button, painter, widget)
+
+    def sizeHint(self, option, index):
+        size = option.fontMetrics.size(Qt.TextSingleLine, self.text)
+        return QSize(size.width() + 24, size.height() + 10)
+
+    def set_pressed(self, pressed, option):
+        self.pressed = pressed
+        if option.widget is not None:
+            option.widget.viewport().update(option.rect)
+
+    def editorEvent(self, event, model, option, index):
+        if event.type() == QEvent.MouseButtonPress and event.button() == Qt.LeftButton:
+            if self.button_rect(option).contains(event.pos()):
+                self.set_pressed((index.row(), index.column()), option)
+                return True
+        elif event.type() == QEvent.MouseButtonRelease and event.button() == Qt.LeftButton:
+            pressed = self.pressed
+            self.set_pressed(None, option)
+            if pressed == (index.row(), index.column()) and self.button_rect(option).contains(event.pos()):
+                self.clicked.emit(index)
+                return True
+            return pressed is not None
+        return False
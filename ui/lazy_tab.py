@@ -0,0 +1,40 @@
+from PyQt5.QtWidgets import QWidget, QVBoxLayout, QLabel
+from PyQt5.QtCore import Qt, pyqtSignal
+
+
+class LazyTab(QWidget):
+    """
+    Tab page that builds its real widget the first time it is needed.
+
+    Until then it shows a light placeholder label, so adding the tab costs
+    nothing and runs no queries. ensure_built() creates the widget with
+    factory() and puts it in place of the placeholder; widget stays None
+    before that.
+
+    Args:
+        factory (callable): Returns the tab's widget
+        parent (QWidget, optional): Parent widget
+    """
+
+    built = pyqtSignal(QWidget)
+
+    def __init__(self, factory, parent=None):
+        super().__init__(parent)
+        self.factory = factory
+        self.widget = None
+        self.page_layout = QVBoxLayout(self)
+        self.page_layout.setContentsMargins(0, 0, 0, 0)
+        self.placeholder = QLabel("Loading...")
+        self.placeholder.setAlignment(Qt.AlignCenter)
+        self.page_layout.addWidget(self.placeholder)
+
+    def ensure_built(self):
+        """Build the real widget if needed and return it"""
+        if self.widget is None:
+            self.widget = self.factory()
+            self.page_layout.removeWidget(self.placeholder)
+            self.placeholder.deleteLater()
+            self.placeholder = None
+            self.page_layout.addWidget(self.widget)
+            self.built.emit(self.widget)
+        return self.widget
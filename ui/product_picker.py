@@ -0,0 +1,88 @@
+from PyQt5.QtWidgets import QLineEdit, QCompleter
+from PyQt5.QtCore import Qt, QAbstractListModel, QModelIndex, pyqtSignal
+
+RESULT_LIMIT = 50
+
+
+class ProductCompleterModel(QAbstractListModel):
+    """The current matches of a ProductPicker; Qt.UserRole is the product"""
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.products = []
+
+    def set_products(self, products):
+        self.beginResetModel()
+        self.products = products
+        self.endResetModel()
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.products)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        product = self.products[index.row()]
+        if role == Qt.DisplayRole:
+            return f"{product['name']}  [{product['barcode']}]" if product['barcode'] else product['name']
+        if role == Qt.EditRole:
+            return product['name']
+        if role == Qt.UserRole:
+            return product
+        return None
+
+
+class ProductPicker(QLineEdit):
+    """
+    Type-ahead product field.
+
+    Each edit looks the text up in the shared prefix index
+    (DatabaseManager.product_index) and shows the first matches by name,
+    normalized name or barcode in a QCompleter popup. Nothing is loaded
+    per picker, so creating one costs the same for any catalog size.
+    Picking a match sets product and emits product_selected; editing the
+    text afterwards clears it.
+
+    Args:
+        db_manager (DatabaseManager): Owner of the shared index
+        limit (int): Matches shown in the popup
+    """
+
+    product_selected = pyqtSignal(object)
+
+    def __init__(self, db_manager, limit=RESULT_LIMIT, parent=None):
+        super().__init__(parent)
+        self.db_manager = db_manager
+        self.limit = limit
+        self.product = None
+        self.matches = ProductCompleterModel(self)
+        self.completer = QCompleter(self.matches, self)
+        # The index has already filtered; the completer only shows the popup
+        self.completer.setCompletionMode(QCompleter.UnfilteredPopupCompletion)
+        self.completer.setMaxVisibleItems(10)
+        self.completer.activated[QModelIndex].connect(self.select_index)
+        self.setCompleter(self.completer)
+        self.textEdited.connect(self.update_matches)
+
+    def update_matches(self, text):
+        self.product = None
+        products = self.db_manager.search_product_prefix(text, self.limit) if text.strip() else []
+        self.matches.set_products(products)
+        if products:
+            self.completer.complete()
+        else:
+            self.completer.popup().hide()
+
+    def select_index(self, index):
+        self.select_product(index.data(Qt.UserRole))
+
+    def select_product(self, product):
+        self.product = product
+        if product is not None:
+            self.setText(product['name'])
+        self.product_selected.emit(product)
+
+    def clear_product(self):
+        self.product = None
+        self.matches.set_products([])
+        self.clear()
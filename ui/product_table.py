@@ -0,0 +1,179 @@
+from array import array
+
+from PyQt5.QtCore import Qt, QAbstractTableModel, QModelIndex
+from PyQt5.QtGui import QBrush
+
+PAGE_SIZE = 1000
+
+
+class ProductColumns:
+    """
+    Product rows for the products table, stored column by column.
+
+    Numbers live in typed arrays (8 bytes per value instead of a Python
+    object each) and category names are shared between rows, so a large
+    catalog costs little more than its name and barcode strings.
+    """
+
+    def __init__(self):
+        self.clear()
+
+    def clear(self):
+        self.ids = array('q')
+        self.barcodes = []
+        self.names = []
+        self.categories = []
+        self.costs = array('d')
+        self.prices = array('d')
+        self.quantities = array('q')
+        self.min_quantities = array('q')
+        self._category_names = {}
+
+    def __len__(self):
+        return len(self.ids)
+
+    def extend(self, rows):
+        """Append rows of (id, barcode, name, category_name, cost, price,
+        quantity, min_quantity)"""
+        categories = self._category_names
+        for id, barcode, name, category, cost, price, quantity, min_quantity in rows:
+            self.ids.append(id)
+            self.barcodes.append(barcode or '')
+            self.names.append(name)
+            self.categories.append(categories.setdefault(category or '', category or ''))
+            self.costs.append(cost or 0.0)
+            self.prices.append(price or 0.0)
+            self.quantities.append(quantity or 0)
+            self.min_quantities.append(min_quantity or 0)
+
+    def last_key(self):
+        """(name, id) of the last row, where the next page starts"""
+        if not self.ids:
+            return None
+        return self.names[-1], self.ids[-1]
+
+    def row(self, i):
+        return {
+            'id': self.ids[i],
+            'barcode': self.barcodes[i],
+            'name': self.names[i],
+            'category_name': self.categories[i],
+            'cost': self.costs[i],
+            'price': self.prices[i],
+            'quantity': self.quantities[i],
+            'min_quantity': self.min_quantities[i],
+        }
+
+
+class ProductTableModel(QAbstractTableModel):
+    """
+    Products for a QTableView, read from the database a page at a time.
+
+    The view asks for more rows through canFetchMore/fetchMore as it is
+    scrolled, so opening the tab only costs the first page. Search results
+    are queried off the GUI thread (ui.search.SearchController) and shown
+    with set_results. The last two columns hold no data; they are
+    painted as edit and delete buttons by ui.delegates.ActionColumnDelegate.
+
+    Args:
+        db_manager (DatabaseManager): Source of the product pages
+        page_size (int): Rows fetched per page
+    """
+
+    HEADERS = ["الباركود", "اسم المنتج", "الفئة", "سعر الشراء", "سعر البيع",
+               "الكمية", "الحد الأدنى", "تعديل", "حذف"]
+    QUANTITY_COLUMN = 5
+    EDIT_COLUMN = 7
+    DELETE_COLUMN = 8
+
+    def __init__(self, db_manager, page_size=PAGE_SIZE, parent=None):
+        super().__init__(parent)
+        self.db_manager = db_manager
+        self.page_size = page_size
+        self.columns = ProductColumns()
+        self.search_term = ''
+        self.exhausted = True
+
+    def load(self):
+        """Reset to the first page of the catalog"""
+        self.beginResetModel()
+        self.columns.clear()
+        self.search_term = ''
+        self.exhausted = False
+        self.columns.extend(self._fetch_page())
+        self.endResetModel()
+
+    def set_results(self, search_term, rows):
+        """Show a finished search instead of the paged catalog"""
+        self.beginResetModel()
+        self.columns.clear()
+        self.search_term = search_term
+        self.columns.extend((row['id'], row['barcode'], row['name'], row['category_name'],
+                             row['cost'], row['price'], row['quantity'], row['min_quantity'])
+                            for row in rows)
+        self.exhausted = True
+        self.endResetModel()
+
+    def _fetch_page(self):
+        rows = self.db_manager.get_product_page(self.columns.last_key(), self.page_size)
+        if len(rows) < self.page_size:
+            self.exhausted = True
+        return rows
+
+    def canFetchMore(self, parent=QModelIndex()):
+        return not parent.isValid() and not self.exhausted
+
+    def fetchMore(self, parent=QModelIndex()):
+        if parent.isValid() or self.exhausted:
+            return
+        rows = self._fetch_page()
+        if not rows:
+            return
+        first = len(self.columns)
+        self.beginInsertRows(QModelIndex(), first, first + len(rows) - 1)
+        self.columns.extend(rows)
+        self.endInsertRows()
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.columns)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.HEADERS)
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role == Qt.DisplayRole and orientation == Qt.Horizontal:
+            return self.HEADERS[section]
+        return None
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        row, column = index.row(), index.column()
+        columns = self.columns
+
+        if role == Qt.DisplayRole:
+            if column == 0:
+                return columns.barcodes[row]
+            if column == 1:
+                return columns.names[row]
+            if column == 2:
+                return columns.categories[row]
+            if column == 3:
+                return f"{columns.costs[row]:.2f}"
+            if column == 4:
+                return f"{columns.prices[row]:.2f}"
+            if column == 5:
+                return str(columns.quantities[row])
+            if column == 6:
+                return str(columns.min_quantities[row])
+            return None
+
+        # تلوين الكمية إذا كانت أقل من الحد الأدنى
+        if column == self.QUANTITY_COLUMN and role in (Qt.BackgroundRole, Qt.ForegroundRole):
+            if columns.quantities[row] <= columns.min_quantities[row]:
+                return QBrush(Qt.red if role == Qt.BackgroundRole else Qt.white)
+        return None
+
+    def product(self, row):
+        """The cached fields of a row as a dict"""
+        return self.columns.row(row)
@@ -1,13 +1,17 @@
 from PyQt5.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QPushButton, 
-                            QLabel, QLineEdit, QTableWidget, QTableWidgetItem,
+                            QLabel, QLineEdit, QTableView,
                             QHeaderView, QMessageBox, QDialog, QFormLayout,
                             QDialogButtonBox, QTextEdit, QComboBox, QDoubleSpinBox,
-                            QSpinBox, QFileDialog)
-from PyQt5.QtCore import Qt
+                            QSpinBox, QFileDialog, QProgressBar)
+from PyQt5.QtCore import Qt, QObject, pyqtSignal
 from PyQt5.QtGui import QFont, QIcon, QPixmap
 
 from models.product import Product
 from models.category import Category
+from database.importer import ImportThread
+from ui.delegates import ActionColumnDelegate
+from ui.product_table import ProductTableModel
+from ui.search import SearchController
 
 class ProductDialog(QDialog):
     def __init__(self, parent=None, product_data=None):
@@ -164,6 +168,72 @@ class ProductDialog(QDialog):
                 QMessageBox.critical(self, "خطأ", "فشل في حفظ المنتج")
 
 
+class ImportSignals(QObject):
+    """ينقل تقدم الاستيراد من خيط العمل إلى واجهة المستخدم"""
+    progress = pyqtSignal(int)
+    finished = pyqtSignal(object)
+
+
+class ImportDialog(QDialog):
+    """نافذة تقدم استيراد المنتجات من ملف CSV"""
+
+    def __init__(self, db_manager, csv_path, parent=None):
+        super().__init__(parent)
+        self.db_manager = db_manager
+        self.csv_path = csv_path
+        self.worker = None
+        self.stats = None
+        self.signals = ImportSignals()
+        self.signals.progress.connect(self.update_progress)
+        self.signals.finished.connect(self.import_finished)
+        self.init_ui()
+
+    def init_ui(self):
+        self.setWindowTitle("استيراد المنتجات")
+        self.setMinimumWidth(400)
+
+        layout = QVBoxLayout(self)
+
+        self.status_label = QLabel("جاري قراءة الملف...")
+        layout.addWidget(self.status_label)
+
+        self.progress_bar = QProgressBar()
+        self.progress_bar.setRange(0, 0)
+        layout.addWidget(self.progress_bar)
+
+        self.close_button = QPushButton("إغلاق")
+        self.close_button.setEnabled(False)
+        self.close_button.clicked.connect(self.accept)
+        layout.addWidget(self.close_button)
+
+    def start(self):
+        """بدء الاستيراد في خيط منفصل"""
+        self.worker = ImportThread(self.db_manager, self.csv_path,
+                                   progress=self.signals.progress.emit,
+                                   finished=self.signals.finished.emit)
+        self.worker.start()
+
+    def update_progress(self, rows):
+        self.status_label.setText(f"تمت قراءة {rows:,} صف...")
+
+    def import_finished(self, stats):
+        self.stats = stats
+        self.close_button.setEnabled(True)
+        self.progress_bar.setRange(0, 1)
+        if stats is None:
+            self.progress_bar.setValue(0)
+            self.status_label.setText("فشل الاستيراد. راجع السجل لمزيد من التفاصيل.")
+            return
+
+        self.progress_bar.setValue(1)
+        text = (f"تم استيراد {stats['imported']:,} من {stats['rows']:,} صف "
+                f"خلال {stats['seconds']:.1f} ثانية ({stats['rows_per_second']:,} صف/ثانية)\n"
+                f"الصفوف المرفوضة: {stats['skipped']:,}")
+        for line, message in stats['errors'][:5]:
+            text += f"\nالسطر {line}: {message}"
+        self.status_label.setText(text)
+
+
 class ProductsWidget(QWidget):
     def __init__(self, parent=None):
         super().__init__(parent)
@@ -192,27 +262,42 @@ class ProductsWidget(QWidget):
         
         self.search_input = QLineEdit()
         self.search_input.setPlaceholderText("ابحث عن منتج...")
-        self.search_input.textChanged.connect(self.load_products)
+        # البحث بعد توقف الكتابة، في خيط منفصل
+        self.search_controller = SearchController(self.product_model.db_manager.db_path, parent=self)
+        self.search_controller.results.connect(self.show_search_results)
+        self.search_input.textChanged.connect(self.search_controller.set_term)
         
         add_btn = QPushButton("إضافة منتج جديد")
         add_btn.clicked.connect(self.add_product)
         
+        import_btn = QPushButton("استيراد من CSV")
+        import_btn.clicked.connect(self.import_products)
+        
         search_section.addWidget(QLabel("البحث:"))
         search_section.addWidget(self.search_input)
         search_section.addWidget(add_btn)
+        search_section.addWidget(import_btn)
         
         main_layout.addLayout(search_section)
         
-        # جدول المنتجات
-        self.products_table = QTableWidget()
-        self.products_table.setColumnCount(9)
-        self.products_table.setHorizontalHeaderLabels([
-            "الباركود", "اسم المنتج", "الفئة", "سعر الشراء", "سعر البيع",
-            "الكمية", "الحد الأدنى", "تعديل", "حذف"
-        ])
+        # جدول المنتجات: نموذج يُحمّل صفحة تلو الأخرى عند التمرير
+        self.products_model = ProductTableModel(self.product_model.db_manager, parent=self)
+        self.products_table = QTableView()
+        self.products_table.setModel(self.products_model)
         self.products_table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
+        # ارتفاع ثابت للصفوف حتى لا يُقاس كل صف
+        self.products_table.verticalHeader().setSectionResizeMode(QHeaderView.Fixed)
+        
+        # أزرار التعديل والحذف مرسومة وليست عناصر حقيقية
+        self.edit_delegate = ActionColumnDelegate("تعديل", self.products_table)
+        self.edit_delegate.clicked.connect(self.edit_product_at)
+        self.delete_delegate = ActionColumnDelegate("حذف", self.products_table)
+        self.delete_delegate.clicked.connect(self.delete_product_at)
+        self.products_table.setItemDelegateForColumn(ProductTableModel.EDIT_COLUMN, self.edit_delegate)
+        self.products_table.setItemDelegateForColumn(ProductTableModel.DELETE_COLUMN, self.delete_delegate)
         
         main_layout.addWidget(self.products_table)
+        self.search_controller.watch(self.products_table.viewport())
         
         # زر تحديث البيانات
         refresh_btn = QPushButton("تحديث البيانات")
@@ -220,40 +305,25 @@ class ProductsWidget(QWidget):
         main_layout.addWidget(refresh_btn)
     
     def load_products(self):
-        """تحميل المنتجات"""
-        search_term = self.search_input.text()
-        products = self.product_model.get_all_products(search_term)
-        
-        self.products_table.setRowCount(0)
-        
-        for row, product in enumerate(products):
-            self.products_table.insertRow(row)
-            
-            # إضافة بيانات المنتج
-            self.products_table.setItem(row, 0, QTableWidgetItem(product.get('barcode', '')))
-            self.products_table.setItem(row, 1, QTableWidgetItem(product['name']))
-            self.products_table.setItem(row, 2, QTableWidgetItem(product.get('category_name', '')))
-            self.products_table.setItem(row, 3, QTableWidgetItem(f"{product['purchase_price']:.2f}"))
-            self.products_table.setItem(row, 4, QTableWidgetItem(f"{product['selling_price']:.2f}"))
-            
-            # تلوين الكمية إذا كانت أقل من الحد الأدنى
-            quantity_item = QTableWidgetItem(str(product['quantity']))
-            if product['quantity'] <= product['min_quantity']:
-                quantity_item.setBackground(Qt.red)
-                quantity_item.setForeground(Qt.white)
-            
-            self.products_table.setItem(row, 5, quantity_item)
-            self.products_table.setItem(row, 6, QTableWidgetItem(str(product['min_quantity'])))
-            
-            # أزرار التعديل والحذف
-            edit_btn = QPushButton("تعديل")
-            edit_btn.clicked.connect(lambda checked, p=product: self.edit_product(p))
-            
-            delete_btn = QPushButton("حذف")
-            delete_btn.clicked.connect(lambda checked, p=product: self.delete_product(p))
-            
-            self.products_table.setCellWidget(row, 7, edit_btn)
-            self.products_table.setCellWidget(row, 8, delete_btn)
+        """تحميل المنتجات، أو إعادة البحث الحالي في خيط منفصل"""
+        self.search_controller.refresh()
+    
+    def show_search_results(self, search_term, products):
+        """عرض نتائج البحث، أو كل المنتجات إذا كان حقل البحث فارغاً"""
+        if products is None:
+            self.products_model.load()
+        else:
+            self.products_model.set_results(search_term, products)
+    
+    def edit_product_at(self, index):
+        """تعديل المنتج في الصف الذي نُقر عليه"""
+        product = self.product_model.get_product(self.products_model.product(index.row())['id'])
+        if product:
+            self.edit_product(product)
+    
+    def delete_product_at(self, index):
+        """حذف المنتج في الصف الذي نُقر عليه"""
+        self.delete_product(self.products_model.product(index.row()))
     
     def add_product(self):
         """إضافة منتج جديد"""
@@ -275,6 +345,19 @@ class ProductsWidget(QWidget):
             else:
                 QMessageBox.critical(self, "خطأ", "فشل في إضافة المنتج")
     
+    def import_products(self):
+        """استيراد المنتجات من ملف CSV"""
+        csv_path, _ = QFileDialog.getOpenFileName(
+            self, "اختر ملف المنتجات", "", "CSV Files (*.csv)"
+        )
+        if not csv_path:
+            return
+        
+        self.import_dialog = ImportDialog(self.product_model.db_manager, csv_path, self)
+        self.import_dialog.finished.connect(self.load_products)
+        self.import_dialog.show()
+        self.import_dialog.start()
+    
     def edit_product(self, product):
         """تعديل منتج"""
         dialog = ProductDialog(self, product)
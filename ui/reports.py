@@ -1,13 +1,26 @@
 from PyQt5.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QPushButton, 
                             QLabel, QTableWidget, QTableWidgetItem, QHeaderView,
-                            QComboBox, QDateEdit, QGroupBox, QFormLayout)
-from PyQt5.QtCore import Qt, QDate
+                            QComboBox, QDateEdit, QGroupBox, QFormLayout,
+                            QFileDialog, QMessageBox, QProgressBar)
+from PyQt5.QtCore import Qt, QDate, QObject, QThreadPool, pyqtSignal
 from PyQt5.QtGui import QFont
 from datetime import datetime, timedelta
+from functools import partial
 
 from models.sale import Sale
 from models.product import Product
 from models.sale_item import SaleItem
+from database.exporter import ExportThread
+from database.reports import REPORTS, report_cache, report_key
+from ui.product_picker import ProductPicker
+from ui.workers import QueryWorker, StallWatchdog
+from utils.logger import setup_logger, log_info
+
+logger = setup_logger('ui.reports')
+
+class ExportSignals(QObject):
+    """Carries the export result from the worker thread to the GUI thread"""
+    finished = pyqtSignal(object)
 
 class ReportsWidget(QWidget):
     def __init__(self, parent=None):
@@ -16,6 +29,11 @@ class ReportsWidget(QWidget):
         self.sale_model = Sale()
         self.product_model = Product()
         self.sale_item_model = SaleItem()
+        self.report_worker = None
+        # Cancelled workers stay referenced until their thread has finished
+        self.workers = set()
+        self.watchdog = StallWatchdog(parent=self)
+        self.last_stall_ms = 0.0
         
         self.setup_ui()
     
@@ -57,18 +75,14 @@ class ReportsWidget(QWidget):
         self.end_date.setDate(QDate.currentDate())
         
         # المنتج (للتقارير المتعلقة بالمنتجات)
-        self.product_combo = QComboBox()
-        self.product_combo.addItem("كل المنتجات", None)
-        
-        # تحميل المنتجات
-        products = self.product_model.get_all_products()
-        for product in products:
-            self.product_combo.addItem(product['name'], product['id'])
+        # بحث فوري في فهرس المنتجات المشترك بدلاً من تحميل كل المنتجات
+        self.product_picker = ProductPicker(self.parent.db_manager)
+        self.product_picker.setPlaceholderText("كل المنتجات")
         
         options_layout.addRow("نوع التقرير:", self.report_type)
         options_layout.addRow("من تاريخ:", self.start_date)
         options_layout.addRow("إلى تاريخ:", self.end_date)
-        options_layout.addRow("المنتج:", self.product_combo)
+        options_layout.addRow("المنتج:", self.product_picker)
         
         options_group.setLayout(options_layout)
         main_layout.addWidget(options_group)
@@ -82,11 +96,25 @@ class ReportsWidget(QWidget):
         self.print_btn = QPushButton("طباعة")
         self.print_btn.clicked.connect(self.print_report)
         
+        self.export_btn = QPushButton("تصدير المبيعات")
+        self.export_btn.clicked.connect(self.export_sales)
+        
         actions_layout.addWidget(self.generate_btn)
         actions_layout.addWidget(self.print_btn)
+        actions_layout.addWidget(self.export_btn)
         
         main_layout.addLayout(actions_layout)
         
+        # تقدم التقرير الجاري
+        progress_layout = QHBoxLayout()
+        self.report_progress = QProgressBar()
+        self.cancel_btn = QPushButton("إلغاء")
+        self.cancel_btn.clicked.connect(self.cancel_report)
+        progress_layout.addWidget(self.report_progress)
+        progress_layout.addWidget(self.cancel_btn)
+        main_layout.addLayout(progress_layout)
+        self.set_running(False)
+        
         # جدول التقرير
         self.report_table = QTableWidget()
         self.report_table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
@@ -110,221 +138,128 @@ class ReportsWidget(QWidget):
         self.load_report()
     
     def load_report(self):
+        """Run the selected report on a worker thread, streaming rows into the table"""
+        self.cancel_report()
+        
         report_type = self.report_type.currentText()
+        start_date = self.start_date.date().toString(Qt.ISODate)
+        end_date = self.end_date.date().toString(Qt.ISODate)
         
-        if report_type == 'Sales Report':
-            self.load_sales_report()
-        elif report_type == 'Products Report':
-            self.load_products_report()
-        elif report_type == 'Low Stock Report':
-            self.load_low_stock_report()
-        elif report_type == 'Categories Report':
-            self.load_categories_report()
-    
-    def load_sales_report(self):
+        headers = REPORTS[report_type]['headers']
         self.report_table.setRowCount(0)
-        self.report_table.setColumnCount(8)
-        self.report_table.setHorizontalHeaderLabels([
-            'Date', 'Invoice', 'Customer', 'Items', 'Total', 'Discount', 'Tax', 'Final'
-        ])
+        self.report_table.setColumnCount(len(headers))
+        self.report_table.setHorizontalHeaderLabels(headers)
+        self.summary_label.setText("")
         
-        if self.parent.db_manager.connect():
-            start_date = self.start_date.date().toString(Qt.ISODate)
-            end_date = self.end_date.date().toString(Qt.ISODate)
-            
-            # Get sales data
-            sales = self.parent.db_manager.get_sales(start_date, end_date)
-            
-            self.report_table.setRowCount(len(sales))
-            
-            total_sales = 0
-            total_items = 0
-            total_discount = 0
-            total_tax = 0
-            
-            for i, sale in enumerate(sales):
-                # Get sale items
-                items = self.parent.db_manager.get_sale_items(sale['id'])
-                items_count = sum(item['quantity'] for item in items)
-                
-                self.report_table.insertRow(i)
-                
-                self.report_table.setItem(i, 0, QTableWidgetItem(str(sale['created_at'])))
-                self.report_table.setItem(i, 1, QTableWidgetItem(sale['invoice_number']))
-                self.report_table.setItem(i, 2, QTableWidgetItem(sale['customer_name'] or '-'))
-                self.report_table.setItem(i, 3, QTableWidgetItem(str(items_count)))
-                self.report_table.setItem(i, 4, QTableWidgetItem(f"{sale['total_amount']:.2f}"))
-                self.report_table.setItem(i, 5, QTableWidgetItem(f"{sale['discount']:.2f}"))
-                self.report_table.setItem(i, 6, QTableWidgetItem(f"{sale['tax']:.2f}"))
-                self.report_table.setItem(i, 7, QTableWidgetItem(f"{sale['final_amount']:.2f}"))
-                
-                total_sales += sale['final_amount']
-                total_items += items_count
-                total_discount += sale['discount']
-                total_tax += sale['tax']
-            
-            self.parent.db_manager.disconnect()
-            
-            # Update summary
-            summary = f"""
-                <h3>Sales Summary</h3>
-                <p>
-                    Period: {start_date} to {end_date}<br>
-                    Total Sales: {total_sales:.2f}<br>
-                    Total Items Sold: {total_items}<br>
-                    Total Discounts: {total_discount:.2f}<br>
-                    Total Tax: {total_tax:.2f}
-                </p>
-            """
-            self.summary_label.setText(summary)
-    
-    def load_products_report(self):
-        self.report_table.setRowCount(0)
-        self.report_table.setColumnCount(7)
-        self.report_table.setHorizontalHeaderLabels([
-            'Product', 'Category', 'Cost', 'Price', 'Stock', 'Min Stock', 'Value'
-        ])
+        # Unchanged data: show the cached result without touching the worker
+        db_manager = self.parent.db_manager
+        cache_key = report_key(db_manager.conn, report_type, start_date, end_date)
+        report = report_cache(db_manager).get(cache_key)
+        if report is not None:
+            self.append_rows(None, report['rows'])
+            self.show_summary(report)
+            return
         
-        if self.parent.db_manager.connect():
-            products = self.parent.db_manager.get_products()
-            
-            self.report_table.setRowCount(len(products))
-            
-            total_value = 0
-            total_items = 0
-            
-            for i, product in enumerate(products):
-                self.report_table.insertRow(i)
-                
-                self.report_table.setItem(i, 0, QTableWidgetItem(product['name']))
-                self.report_table.setItem(i, 1, QTableWidgetItem(self.get_category_name(product['category_id'])))
-                self.report_table.setItem(i, 2, QTableWidgetItem(f"{product['purchase_price']:.2f}"))
-                self.report_table.setItem(i, 3, QTableWidgetItem(f"{product['selling_price']:.2f}"))
-                self.report_table.setItem(i, 4, QTableWidgetItem(str(product['quantity'])))
-                self.report_table.setItem(i, 5, QTableWidgetItem(str(product['min_quantity'])))
-                
-                value = product['quantity'] * product['purchase_price']
-                self.report_table.setItem(i, 6, QTableWidgetItem(f"{value:.2f}"))
-                
-                total_value += value
-                total_items += product['quantity']
-            
-            self.parent.db_manager.disconnect()
-            
-            # Update summary
-            summary = f"""
-                <h3>Products Summary</h3>
-                <p>
-                    Total Products: {len(products)}<br>
-                    Total Items in Stock: {total_items}<br>
-                    Total Stock Value: {total_value:.2f}
-                </p>
-            """
-            self.summary_label.setText(summary)
-    
-    def load_low_stock_report(self):
-        self.report_table.setRowCount(0)
-        self.report_table.setColumnCount(5)
-        self.report_table.setHorizontalHeaderLabels([
-            'Product', 'Category', 'Stock', 'Min Stock', 'Status'
-        ])
+        worker = QueryWorker(db_manager.db_path, report_type, start_date, end_date)
+        worker.cache_key = cache_key
+        worker.signals.started.connect(partial(self.report_started, worker))
+        worker.signals.chunk.connect(partial(self.append_rows, worker))
+        worker.signals.finished.connect(partial(self.report_finished, worker))
+        worker.signals.cancelled.connect(partial(self.report_stopped, worker))
+        worker.signals.failed.connect(partial(self.report_failed, worker))
+        for signal in (worker.signals.finished, worker.signals.cancelled, worker.signals.failed):
+            signal.connect(partial(self.workers.discard, worker))
+        self.workers.add(worker)
+        self.report_worker = worker
         
-        if self.parent.db_manager.connect():
-            products = self.parent.db_manager.get_products()
-            low_stock_products = [p for p in products if p['quantity'] <= p['min_quantity']]
-            
-            self.report_table.setRowCount(len(low_stock_products))
-            
-            for i, product in enumerate(low_stock_products):
-                self.report_table.insertRow(i)
-                
-                self.report_table.setItem(i, 0, QTableWidgetItem(product['name']))
-                self.report_table.setItem(i, 1, QTableWidgetItem(self.get_category_name(product['category_id'])))
-                self.report_table.setItem(i, 2, QTableWidgetItem(str(product['quantity'])))
-                self.report_table.setItem(i, 3, QTableWidgetItem(str(product['min_quantity'])))
-                
-                status = 'Out of Stock' if product['quantity'] == 0 else 'Low Stock'
-                status_item = QTableWidgetItem(status)
-                status_item.setForeground(Qt.red)
-                self.report_table.setItem(i, 4, status_item)
-            
-            self.parent.db_manager.disconnect()
-            
-            # Update summary
-            summary = f"""
-                <h3>Low Stock Summary</h3>
-                <p>
-                    Total Low Stock Items: {len(low_stock_products)}<br>
-                    Out of Stock Items: {len([p for p in low_stock_products if p['quantity'] == 0])}
-                </p>
-            """
-            self.summary_label.setText(summary)
+        self.set_running(True)
+        self.watchdog.start()
+        QThreadPool.globalInstance().start(worker)
     
-    def load_categories_report(self):
-        self.report_table.setRowCount(0)
-        self.report_table.setColumnCount(4)
-        self.report_table.setHorizontalHeaderLabels([
-            'Category', 'Products', 'Total Stock', 'Total Value'
-        ])
-        
-        if self.parent.db_manager.connect():
-            categories = self.parent.db_manager.get_categories()
-            
-            self.report_table.setRowCount(len(categories))
-            
-            total_products = 0
-            total_stock = 0
-            total_value = 0
-            
-            for i, category in enumerate(categories):
-                # Get products in this category
-                products = self.parent.db_manager.get_products(category['id'])
-                products_count = len(products)
-                stock_count = sum(p['quantity'] for p in products)
-                stock_value = sum(p['quantity'] * p['purchase_price'] for p in products)
-                
-                self.report_table.insertRow(i)
-                
-                self.report_table.setItem(i, 0, QTableWidgetItem(category['name']))
-                self.report_table.setItem(i, 1, QTableWidgetItem(str(products_count)))
-                self.report_table.setItem(i, 2, QTableWidgetItem(str(stock_count)))
-                self.report_table.setItem(i, 3, QTableWidgetItem(f"{stock_value:.2f}"))
-                
-                total_products += products_count
-                total_stock += stock_count
-                total_value += stock_value
-            
-            self.parent.db_manager.disconnect()
-            
-            # Update summary
-            summary = f"""
-                <h3>Categories Summary</h3>
+    def cancel_report(self):
+        """Interrupt the running report query, if any"""
+        if self.report_worker is not None:
+            self.report_worker.cancel()
+            self.report_stopped(self.report_worker)
+    
+    def set_running(self, running):
+        self.report_progress.setVisible(running)
+        self.cancel_btn.setVisible(running)
+        if running:
+            self.report_progress.setRange(0, 0)
+    
+    def report_started(self, worker, total):
+        if worker is self.report_worker:
+            self.report_progress.setRange(0, max(total, 1))
+            self.report_progress.setValue(0)
+    
+    def append_rows(self, worker, rows):
+        """Add a chunk of report rows to the table"""
+        if worker is not self.report_worker:
+            return
+        table = self.report_table
+        first = table.rowCount()
+        table.setUpdatesEnabled(False)
+        table.setRowCount(first + len(rows))
+        for i, row in enumerate(rows, first):
+            for j, value in enumerate(row):
+                item = QTableWidgetItem(self.format_value(value))
+                if value in ('Out of Stock', 'Low Stock'):
+                    item.setForeground(Qt.red)
+                table.setItem(i, j, item)
+        table.setUpdatesEnabled(True)
+        self.report_progress.setValue(table.rowCount())
+    
+    def report_finished(self, worker, report):
+        # Cached under the data versions read before the query started; a
+        # write during the query only makes the entry unreachable
+        report_cache(self.parent.db_manager).put(worker.cache_key, report)
+        if worker is not self.report_worker:
+            return
+        self.show_summary(report)
+        self.report_done(worker)
+    
+    def report_stopped(self, worker):
+        if worker is self.report_worker:
+            self.summary_label.setText("تم إلغاء التقرير")
+            self.report_done(worker)
+    
+    def report_failed(self, worker, message):
+        if worker is self.report_worker:
+            self.summary_label.setText(f"تعذر إنشاء التقرير: {message}")
+            self.report_done(worker)
+    
+    def report_done(self, worker):
+        self.report_worker = None
+        self.set_running(False)
+        self.last_stall_ms = self.watchdog.stop()
+        log_info(logger, f"{worker.name}: longest GUI stall {self.last_stall_ms:.0f} ms")
+    
+    def show_summary(self, report):
+        """Render a finished report's summary"""
+        lines = '<br>'.join(f"{label}: {self.format_value(value)}" for label, value in report['summary'])
+        self.summary_label.setText(f"""
+                <h3>{report['title']}</h3>
                 <p>
-                    Total Categories: {len(categories)}<br>
-                    Total Products: {total_products}<br>
-                    Total Stock: {total_stock}<br>
-                    Total Value: {total_value:.2f}
+                    {lines}
                 </p>
-            """
-            self.summary_label.setText(summary)
+            """)
     
-    def get_category_name(self, category_id):
-        """Get category name by ID"""
-        if self.parent.db_manager.connect():
-            category = self.parent.db_manager.fetch_one(
-                "SELECT name FROM categories WHERE id = ?",
-                (category_id,)
-            )
-            self.parent.db_manager.disconnect()
-            return category['name'] if category else 'Unknown'
-        return 'Unknown'
+    @staticmethod
+    def format_value(value):
+        if value is None:
+            return '-'
+        if isinstance(value, float):
+            return f"{value:.2f}"
+        return str(value)
     
     def generate_report(self):
         """Generate report based on current settings"""
         report_type = self.report_type.currentText()
         start_date = self.start_date.date().toString(Qt.ISODate)
         end_date = self.end_date.date().toString(Qt.ISODate)
-        product_id = self.product_combo.currentData()
+        product = self.product_picker.product
+        product_id = product['id'] if product else None
         
         if report_type == 'Sales Report':
             self.generate_sales_report(start_date, end_date)
@@ -355,6 +290,32 @@ class ReportsWidget(QWidget):
         # Implementation will be added later
         pass
     
+    def export_sales(self):
+        """Stream the sales of the selected period to a CSV or JSON Lines file"""
+        path, _ = QFileDialog.getSaveFileName(
+            self, "تصدير المبيعات", "sales.csv", "CSV (*.csv);;JSON Lines (*.jsonl)"
+        )
+        if not path:
+            return
+        
+        self.export_btn.setEnabled(False)
+        self.export_signals = ExportSignals()
+        self.export_signals.finished.connect(lambda count: self.export_finished(path, count))
+        self.export_worker = ExportThread(
+            self.parent.db_manager, path,
+            self.start_date.date().toString(Qt.ISODate),
+            self.end_date.date().toString(Qt.ISODate),
+            finished=self.export_signals.finished.emit
+        )
+        self.export_worker.start()
+    
+    def export_finished(self, path, count):
+        self.export_btn.setEnabled(True)
+        if count is None:
+            QMessageBox.critical(self, "خطأ", "فشل تصدير المبيعات")
+        else:
+            QMessageBox.information(self, "نجاح", f"تم تصدير {count:,} سطر إلى:\n{path}")
+    
     def print_report(self):
         """Print current report"""
         # Implementation will be added later
@@ -1,17 +1,31 @@
 from PyQt5.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QPushButton, 
-                            QLabel, QLineEdit, QTableWidget, QTableWidgetItem,
+                            QLabel, QLineEdit, QTableWidget, QTableWidgetItem, QTableView,
                             QHeaderView, QComboBox, QDoubleSpinBox, QMessageBox,
                             QDialog, QFormLayout, QSpinBox, QDialogButtonBox)
-from PyQt5.QtCore import Qt, QTimer
+from PyQt5.QtCore import Qt, QTimer, QThreadPool
 from PyQt5.QtGui import QFont
 
+from models.cart import Cart, format_minor
 from models.product import Product
 from models.sale import Sale
 from models.sale_item import SaleItem
+from ui.cart_table import CartTableModel
+from ui.delegates import ActionColumnDelegate
+from ui.product_picker import ProductPicker
+from ui.search import SearchController, percentile
+from ui.workers import InvoicePeekWorker
+from config import UI
+from utils.logger import setup_logger, log_info, log_warning
+from collections import deque
+from functools import partial
 import datetime
-import uuid
+import time
+
+logger = setup_logger('ui.sales')
 
 class ProductSearchDialog(QDialog):
+    RESULT_LIMIT = 50
+
     def __init__(self, parent=None):
         super().__init__(parent)
         self.product_model = Product()
@@ -30,7 +44,11 @@ class ProductSearchDialog(QDialog):
         search_layout = QHBoxLayout()
         self.search_input = QLineEdit()
         self.search_input.setPlaceholderText("ابحث عن منتج...")
-        self.search_input.textChanged.connect(self.search_products)
+        # البحث بعد توقف الكتابة، في خيط منفصل
+        self.search_controller = SearchController(self.product_model.db_manager.db_path,
+                                                  limit=self.RESULT_LIMIT, parent=self)
+        self.search_controller.results.connect(self.show_products)
+        self.search_input.textChanged.connect(self.search_controller.set_term)
         
         search_layout.addWidget(QLabel("البحث:"))
         search_layout.addWidget(self.search_input)
@@ -47,6 +65,7 @@ class ProductSearchDialog(QDialog):
         self.products_table.setSelectionBehavior(QTableWidget.SelectRows)
         self.products_table.setSelectionMode(QTableWidget.SingleSelection)
         self.products_table.doubleClicked.connect(self.select_product)
+        self.search_controller.watch(self.products_table.viewport())
         
         layout.addWidget(self.products_table)
         
@@ -61,9 +80,14 @@ class ProductSearchDialog(QDialog):
         self.search_products()
     
     def search_products(self):
-        """البحث عن المنتجات"""
-        search_term = self.search_input.text()
-        products = self.product_model.get_all_products(search_term)
+        """البحث عن المنتجات فوراً"""
+        self.search_controller.term = self.search_input.text()
+        self.search_controller.run()
+    
+    def show_products(self, search_term, products):
+        """عرض نتائج البحث، أو أول المنتجات إذا كان حقل البحث فارغاً"""
+        if products is None:
+            products = self.product_model.get_all_products(limit=self.RESULT_LIMIT)
         
         self.products_table.setRowCount(0)
         
@@ -99,9 +123,30 @@ class ProductSearchDialog(QDialog):
 
 
 class SaleDialog(QDialog):
+    """
+    Checkout dialog, created once by SalesWidget and reused for every sale.
+
+    reset() clears it for the next customer without rebuilding any widget,
+    brings the shared catalog index up to date and looks up the next
+    invoice number on a pool thread. Set open_started before showing it to
+    have the time to its first paint recorded in ready_latencies.
+    """
+
+    DEFAULT_TAX_RATE = 15
+    # Opens between two ready-latency log lines
+    LOG_EVERY = 50
+
     def __init__(self, parent=None):
         super().__init__(parent)
         self.parent = parent
+        self.cart = Cart()
+        self.cart_model = CartTableModel(self.cart, self)
+        self.invoice_worker = None
+        # Peek workers stay referenced until they report back
+        self.workers = set()
+        self.open_started = None
+        self.ready_latencies = deque(maxlen=1000)
+        self.opens = 0
         self.init_ui()
 
     def init_ui(self):
@@ -115,6 +160,9 @@ class SaleDialog(QDialog):
         # Customer info
         customer_frame = QFormLayout()
         
+        self.invoice_label = QLabel('-')
+        customer_frame.addRow('Invoice:', self.invoice_label)
+        
         self.customer_name = QLineEdit()
         customer_frame.addRow('Customer Name:', self.customer_name)
         
@@ -131,9 +179,10 @@ class SaleDialog(QDialog):
         self.barcode_input.returnPressed.connect(self.add_product_by_barcode)
         product_layout.addWidget(self.barcode_input)
         
-        self.product_combo = QComboBox()
-        self.load_products()
-        product_layout.addWidget(self.product_combo)
+        # Type-ahead over the shared catalog index; nothing is loaded here
+        self.product_picker = ProductPicker(self.parent.parent.db_manager)
+        self.product_picker.setPlaceholderText('Search product by name or barcode')
+        product_layout.addWidget(self.product_picker)
         
         self.quantity_input = QSpinBox()
         self.quantity_input.setMinimum(1)
@@ -148,12 +197,16 @@ class SaleDialog(QDialog):
         layout.addLayout(product_layout)
 
         # Items table
-        self.items_table = QTableWidget()
-        self.items_table.setColumnCount(6)
-        self.items_table.setHorizontalHeaderLabels([
-            'Product', 'Price', 'Quantity', 'Total', 'Stock', 'Remove'
-        ])
+        # A view over self.cart; the cart holds the lines and the totals
+        self.items_table = QTableView()
+        self.items_table.setModel(self.cart_model)
         self.items_table.verticalHeader().setVisible(False)
+        self.items_table.setSelectionBehavior(QTableView.SelectRows)
+        # Remove buttons are painted by a delegate; the clicked row is read
+        # from the index at click time, so removing rows never goes stale
+        self.remove_delegate = ActionColumnDelegate('Remove', self.items_table)
+        self.remove_delegate.clicked.connect(lambda index: self.remove_item(index.row()))
+        self.items_table.setItemDelegateForColumn(CartTableModel.REMOVE_COLUMN, self.remove_delegate)
         layout.addWidget(self.items_table)
 
         # Totals
@@ -169,7 +222,8 @@ class SaleDialog(QDialog):
         
         self.tax_input = QDoubleSpinBox()
         self.tax_input.setMaximum(100)
-        self.tax_input.setValue(15)  # Default tax rate
+        self.tax_input.setValue(self.DEFAULT_TAX_RATE)
+        self.cart.set_tax_rate(self.tax_input.value())
         self.tax_input.valueChanged.connect(self.calculate_total)
         totals_layout.addRow('Tax (%):', self.tax_input)
         
@@ -197,154 +251,145 @@ class SaleDialog(QDialog):
 
         self.setLayout(layout)
 
-    def load_products(self):
-        if self.parent.parent.db_manager.connect():
-            products = self.parent.parent.db_manager.get_products()
-            self.parent.parent.db_manager.disconnect()
-            
-            self.product_combo.clear()
-            for product in products:
-                self.product_combo.addItem(product['name'], product)
+    def reset(self):
+        """Clear the dialog for the next customer, keeping its widgets"""
+        self.cart_model.clear()
+        self.customer_name.clear()
+        self.customer_phone.clear()
+        self.barcode_input.clear()
+        self.product_picker.clear_product()
+        self.quantity_input.setValue(1)
+        self.discount_input.setValue(0)
+        self.tax_input.setValue(self.DEFAULT_TAX_RATE)
+        self.payment_method.setCurrentIndex(0)
+        self.calculate_total()
+
+        # Rebuilt now, while nobody waits, if the catalog changed meanwhile
+        self.parent.parent.db_manager.load_catalog()
+        self.peek_invoice_number()
+
+    def peek_invoice_number(self):
+        db_manager = self.parent.parent.db_manager
+        worker = InvoicePeekWorker(db_manager.db_path, db_manager.invoice_sequence)
+        worker.signals.finished.connect(partial(self.invoice_peeked, worker))
+        worker.signals.failed.connect(partial(self.invoice_peek_failed, worker))
+        self.workers.add(worker)
+        self.invoice_worker = worker
+        self.invoice_label.setText('-')
+        QThreadPool.globalInstance().start(worker)
+
+    def invoice_peeked(self, worker, invoice_number):
+        self.workers.discard(worker)
+        if worker is self.invoice_worker:
+            self.invoice_worker = None
+            self.invoice_label.setText(invoice_number)
+
+    def invoice_peek_failed(self, worker, message):
+        self.workers.discard(worker)
+        if worker is self.invoice_worker:
+            self.invoice_worker = None
+
+    def showEvent(self, event):
+        super().showEvent(event)
+        self.barcode_input.setFocus()
+
+    def paintEvent(self, event):
+        super().paintEvent(event)
+        if self.open_started is not None:
+            self.record_ready(time.perf_counter() - self.open_started)
+            self.open_started = None
+
+    def record_ready(self, seconds):
+        """Record the time from New Sale to the first paint of the dialog"""
+        ms = seconds * 1000
+        self.ready_latencies.append(ms)
+        self.opens += 1
+        if ms > UI['sale_dialog_ready_ms']:
+            log_warning(logger, f"Sale dialog took {ms:.0f} ms to open",
+                        {"budget_ms": UI['sale_dialog_ready_ms']})
+        if self.opens % self.LOG_EVERY == 0:
+            log_info(logger, f"Sale dialog open-to-ready p50 {percentile(self.ready_latencies, 50):.1f} ms, "
+                             f"p95 {percentile(self.ready_latencies, 95):.1f} ms")
 
     def add_product_by_barcode(self):
         barcode = self.barcode_input.text().strip()
         if not barcode:
             return
             
-        if self.parent.parent.db_manager.connect():
-            product = self.parent.parent.db_manager.get_product_by_barcode(barcode)
-            self.parent.parent.db_manager.disconnect()
-            
-            if product:
-                self.add_product_to_table(product)
-                self.barcode_input.clear()
-            else:
-                QMessageBox.warning(self, 'Error', 'Product not found')
+        # Resolved from the in-memory catalog, no database round trip
+        product = self.parent.parent.db_manager.get_product_by_barcode(barcode)
+        if product:
+            self.add_product_to_table(product)
+            self.barcode_input.clear()
+        else:
+            QMessageBox.warning(self, 'Error', 'Product not found')
 
     def add_product(self):
-        product = self.product_combo.currentData()
+        product = self.product_picker.product
         if product:
             self.add_product_to_table(product)
+            self.product_picker.clear_product()
 
     def add_product_to_table(self, product):
         quantity = self.quantity_input.value()
-        
-        if quantity > product['quantity']:
+
+        # Product already in the cart: its line is found by id
+        line = self.cart.line(product['id'])
+        in_cart = line.quantity if line else 0
+        if in_cart + quantity > product['quantity']:
             QMessageBox.warning(self, 'Error', 'Insufficient stock')
             return
-            
-        # Check if product already in table
-        for row in range(self.items_table.rowCount()):
-            if self.items_table.item(row, 0).data(Qt.UserRole)['id'] == product['id']:
-                current_qty = int(self.items_table.item(row, 2).text())
-                new_qty = current_qty + quantity
-                
-                if new_qty > product['quantity']:
-                    QMessageBox.warning(self, 'Error', 'Insufficient stock')
-                    return
-                    
-                self.items_table.item(row, 2).setText(str(new_qty))
-                self.items_table.item(row, 3).setText(f"{new_qty * product['selling_price']:.2f}")
-                self.calculate_total()
-                return
-
-        row = self.items_table.rowCount()
-        self.items_table.insertRow(row)
-        
-        # Product name
-        name_item = QTableWidgetItem(product['name'])
-        name_item.setData(Qt.UserRole, product)
-        self.items_table.setItem(row, 0, name_item)
-        
-        # Price
-        self.items_table.setItem(row, 1, QTableWidgetItem(f"{product['selling_price']:.2f}"))
-        
-        # Quantity
-        self.items_table.setItem(row, 2, QTableWidgetItem(str(quantity)))
-        
-        # Total
-        total = quantity * product['selling_price']
-        self.items_table.setItem(row, 3, QTableWidgetItem(f"{total:.2f}"))
-        
-        # Stock
-        self.items_table.setItem(row, 4, QTableWidgetItem(str(product['quantity'])))
-        
-        # Remove button
-        remove_button = QPushButton('Remove')
-        remove_button.clicked.connect(lambda: self.remove_item(row))
-        self.items_table.setCellWidget(row, 5, remove_button)
-        
+
+        self.cart_model.add(product, quantity)
         self.calculate_total()
 
     def remove_item(self, row):
-        self.items_table.removeRow(row)
+        self.cart_model.remove(row)
         self.calculate_total()
 
     def calculate_total(self):
-        subtotal = 0
-        for row in range(self.items_table.rowCount()):
-            subtotal += float(self.items_table.item(row, 3).text())
-        
-        self.subtotal_label.setText(f"{subtotal:.2f}")
-        
-        discount = self.discount_input.value()
-        tax = subtotal * (self.tax_input.value() / 100)
-        
-        total = subtotal - discount + tax
-        self.total_label.setText(f"{total:.2f}")
+        # The cart keeps its subtotal up to date; only the discount and tax
+        # rate are read from the inputs
+        cart = self.cart
+        cart.set_discount(self.discount_input.value())
+        cart.set_tax_rate(self.tax_input.value())
+
+        self.subtotal_label.setText(format_minor(cart.subtotal))
+        self.total_label.setText(format_minor(cart.total))
 
     def complete_sale(self):
-        if self.items_table.rowCount() == 0:
+        if not self.cart.lines:
             QMessageBox.warning(self, 'Error', 'No items in sale')
             return
 
         # Prepare sale data
+        self.calculate_total()
         sale_data = {
-            'invoice_number': str(uuid.uuid4())[:8].upper(),
             'customer_name': self.customer_name.text().strip(),
             'customer_phone': self.customer_phone.text().strip(),
-            'total_amount': float(self.subtotal_label.text()),
-            'discount': self.discount_input.value(),
-            'tax': float(self.subtotal_label.text()) * (self.tax_input.value() / 100),
-            'final_amount': float(self.total_label.text()),
             'payment_method': self.payment_method.currentText(),
             'user_id': self.parent.parent.current_user['id']
         }
+        sale_data.update(self.cart.sale_totals())
 
         # Prepare items data
-        items = []
-        for row in range(self.items_table.rowCount()):
-            product = self.items_table.item(row, 0).data(Qt.UserRole)
-            quantity = int(self.items_table.item(row, 2).text())
-            unit_price = float(self.items_table.item(row, 1).text())
-            
-            items.append({
-                'product_id': product['id'],
-                'quantity': quantity,
-                'unit_price': unit_price,
-                'total_price': quantity * unit_price
-            })
-
-        if self.parent.parent.db_manager.connect():
-            # Create sale
-            sale_id = self.parent.parent.db_manager.create_sale(sale_data)
-            if sale_id:
-                # Add sale items
-                if self.parent.parent.db_manager.add_sale_items(sale_id, items):
-                    QMessageBox.information(self, 'Success', 'Sale completed successfully')
-                    self.accept()
-                else:
-                    QMessageBox.critical(self, 'Error', 'Failed to add sale items')
-            else:
-                QMessageBox.critical(self, 'Error', 'Failed to create sale')
-            
-            self.parent.parent.db_manager.disconnect()
+        items = self.cart.items()
+
+        # Sale, invoice number, items and stock decrements are committed together
+        sale_id = self.parent.parent.db_manager.checkout(sale_data, items)
+        if sale_id:
+            QMessageBox.information(self, 'Success',
+                                    f"Sale {sale_data['invoice_number']} completed successfully")
+            self.accept()
+        else:
+            QMessageBox.critical(self, 'Error', 'Failed to complete sale. Please check stock levels.')
 
 
 class SalesWidget(QWidget):
     def __init__(self, parent=None):
         super().__init__(parent)
         self.parent = parent
+        self.sale_dialog = None
         self.init_ui()
 
     def init_ui(self):
@@ -401,7 +446,20 @@ class SalesWidget(QWidget):
                 self.table.setItem(i, 6, QTableWidgetItem(sale['payment_method']))
                 self.table.setItem(i, 7, QTableWidgetItem(str(sale['created_at'])))
 
+    def get_sale_dialog(self):
+        """The checkout dialog, built on first use and then kept"""
+        if self.sale_dialog is None:
+            self.sale_dialog = SaleDialog(self)
+            self.sale_dialog.reset()
+        return self.sale_dialog
+
     def new_sale(self):
-        dialog = SaleDialog(self)
-        if dialog.exec_() == QDialog.Accepted:
+        started = time.perf_counter()
+        dialog = self.get_sale_dialog()
+        dialog.open_started = started
+        accepted = dialog.exec_() == QDialog.Accepted
+        # Cleared while the cashier is between customers, so the next
+        # New Sale only has to show it
+        dialog.reset()
+        if accepted:
             self.load_sales()
\ No newline at end of file
@@ -0,0 +1,183 @@
+import time
+from collections import deque
+from functools import partial
+
+from PyQt5.QtCore import QObject, QEvent, QThreadPool, QTimer, pyqtSignal
+
+from config import UI
+from database.db_manager import DatabaseManager
+from ui.workers import SearchWorker
+from utils.logger import setup_logger, log_info
+
+logger = setup_logger('ui.search')
+
+# Searches between two latency log lines
+LOG_EVERY = 100
+
+
+def percentile(values, p):
+    """The p-th percentile (0-100) of values, nearest rank"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, max(0, round(p / 100 * len(ordered)) - 1))]
+
+
+class SearchController(QObject):
+    """
+    Incremental product search behind a search box.
+
+    Connect a line edit's textChanged to set_term and handle results(term,
+    rows); rows is a list of product dicts, or None when the box is empty.
+
+    - Keystrokes are debounced: a search runs once the text has been still
+      for delay ms.
+    - Searches run on a QThreadPool thread (ui.workers.SearchWorker). A new
+      search interrupts the one in flight, and late results of a stale
+      search are dropped.
+    - When the new term extends the previous one and the previous results
+      were complete (not cut off by limit), they are narrowed in memory with
+      DatabaseManager.search_matches instead of querying again, without
+      waiting for the debounce window. Narrowed rows keep the previous
+      ranking order.
+
+    watch(widget) measures keystroke-to-paint latency: the time from the
+    last keystroke a search covers to the first paint of the widget after
+    its results were delivered. Keystrokes typed within the debounce window
+    are coalesced into the next search and counted in stats['coalesced'].
+    See latency_percentile; p50/p95 are also logged every LOG_EVERY
+    searches.
+
+    Args:
+        db_path (str): Database to search
+        limit (int, optional): Maximum number of results per search
+        delay (int, optional): Debounce window in ms
+    """
+
+    results = pyqtSignal(str, object)
+
+    def __init__(self, db_path, limit=None, delay=None, parent=None):
+        super().__init__(parent)
+        self.db_path = db_path
+        self.limit = limit
+        self.term = ''
+        self.timer = QTimer(self)
+        self.timer.setSingleShot(True)
+        self.delay = UI['search_debounce_ms'] if delay is None else delay
+        self.timer.timeout.connect(self.run)
+        self.worker = None
+        # Workers stay referenced until they finish, even once cancelled
+        self.workers = set()
+        # (term, rows, complete) of the last delivered search, and the
+        # search tokens of those rows
+        self.previous = None
+        self.previous_tokens = None
+        self.keystrokes = []
+        self.unpainted = None
+        self.latencies = deque(maxlen=1000)
+        self.measured = 0
+        self.stats = {'queries': 0, 'narrowed': 0, 'cancelled': 0, 'coalesced': 0}
+
+    def set_term(self, term):
+        self.keystrokes.append(time.perf_counter())
+        self.term = term
+        # Narrowing is cheap and never queries, so it needs no quiet time
+        self.timer.start(0 if self.can_narrow(self.normalized(term)) else self.delay)
+
+    @staticmethod
+    def normalized(term):
+        return ' '.join(term.split())
+
+    def can_narrow(self, term):
+        """Whether term can be answered by filtering the previous results"""
+        previous = self.previous
+        return bool(term and previous and previous[2] and previous[0] and term.startswith(previous[0]))
+
+    def refresh(self):
+        """Query the current term again, e.g. after products were edited
+
+        The previous results are stale, so they are not narrowed.
+        """
+        self.previous = None
+        self.previous_tokens = None
+        self.run()
+
+    def run(self):
+        """Search for the current term now"""
+        self.timer.stop()
+        term = self.normalized(self.term)
+        keystrokes, self.keystrokes = self.keystrokes, []
+
+        if self.worker is not None:
+            # Superseded: its keystrokes are answered by this search
+            self.worker.cancel()
+            keystrokes = self.worker.keystrokes + keystrokes
+            self.worker = None
+            self.stats['cancelled'] += 1
+
+        if not term:
+            self.deliver(term, None, True, keystrokes)
+            return
+
+        if self.can_narrow(term):
+            previous = self.previous
+            tokens = self.previous_tokens
+            if tokens is None:
+                tokens = [DatabaseManager.search_tokens(row) for row in previous[1]]
+            kept = [i for i, row in enumerate(previous[1])
+                    if DatabaseManager.search_matches(term, row, tokens[i])]
+            self.stats['narrowed'] += 1
+            self.deliver(term, [previous[1][i] for i in kept], True, keystrokes)
+            self.previous_tokens = [tokens[i] for i in kept]
+            return
+
+        worker = SearchWorker(self.db_path, term, self.limit)
+        worker.keystrokes = keystrokes
+        worker.signals.finished.connect(partial(self.search_finished, worker))
+        worker.signals.failed.connect(partial(self.search_failed, worker))
+        worker.signals.cancelled.connect(partial(self.workers.discard, worker))
+        self.workers.add(worker)
+        self.worker = worker
+        self.stats['queries'] += 1
+        QThreadPool.globalInstance().start(worker)
+
+    def search_finished(self, worker, rows):
+        self.workers.discard(worker)
+        if worker is not self.worker:
+            return
+        self.worker = None
+        complete = self.limit is None or len(rows) < self.limit
+        self.deliver(worker.term, rows, complete, worker.keystrokes)
+        self.previous_tokens = worker.tokens
+
+    def search_failed(self, worker, message):
+        self.workers.discard(worker)
+        if worker is self.worker:
+            self.worker = None
+            self.deliver(worker.term, [], False, worker.keystrokes)
+
+    def deliver(self, term, rows, complete, keystrokes):
+        self.previous = (term, rows, complete) if rows is not None else None
+        self.previous_tokens = None
+        if keystrokes:
+            self.stats['coalesced'] += len(keystrokes) - 1
+            self.unpainted = keystrokes[-1]
+        self.results.emit(term, rows)
+
+    def watch(self, widget):
+        """Time keystroke-to-paint on widget, usually a view's viewport"""
+        widget.installEventFilter(self)
+
+    def eventFilter(self, obj, event):
+        if event.type() == QEvent.Paint and self.unpainted is not None:
+            self.latencies.append((time.perf_counter() - self.unpainted) * 1000)
+            self.unpainted = None
+            self.measured += 1
+            if self.measured % LOG_EVERY == 0:
+                log_info(logger, f"Search keystroke-to-paint p50 {self.latency_percentile(50):.0f} ms, "
+                                 f"p95 {self.latency_percentile(95):.0f} ms", self.stats)
+        return False
+
+    def latency_percentile(self, p=95):
+        """Keystroke-to-paint latency percentile in ms over recent searches"""
+        return percentile(self.latencies, p)
@@ -0,0 +1,263 @@
+import sqlite3
+import time
+
+from PyQt5.QtCore import QObject, QRunnable, QTimer, pyqtSignal
+
+from database.db_manager import DatabaseManager
+from database.pool import open_readonly
+from database.reports import count_rows, iter_report, finish_report
+from utils.logger import setup_logger, log_info, log_error
+
+logger = setup_logger('ui.workers')
+
+class QueryWorkerSignals(QObject):
+    """Signals a QueryWorker emits from its pool thread"""
+    started = pyqtSignal(int)          # total rows
+    chunk = pyqtSignal(object)         # list of row tuples
+    finished = pyqtSignal(object)      # finished report dict
+    cancelled = pyqtSignal()
+    failed = pyqtSignal(str)
+
+class QueryWorker(QRunnable):
+    """
+    Runs a report from database.reports on a QThreadPool thread.
+
+    The worker opens its own read-only connection, so the GUI thread's
+    pooled connection is never busy, and streams the rows back in chunks.
+    cancel() may be called from the GUI thread; it interrupts the running
+    SQLite statement.
+
+    Args:
+        db_path (str): Database to read
+        name (str): Report name, a key of database.reports.REPORTS
+        start_date (str, optional): First day of the report period
+        end_date (str, optional): Last day of the report period
+        batch (int): Rows per chunk signal
+    """
+
+    def __init__(self, db_path, name, start_date=None, end_date=None, batch=500):
+        super().__init__()
+        self.db_path = db_path
+        self.name = name
+        self.start_date = start_date
+        self.end_date = end_date
+        self.batch = batch
+        self.signals = QueryWorkerSignals()
+        self.conn = None
+        self.is_cancelled = False
+
+    def cancel(self):
+        self.is_cancelled = True
+        conn = self.conn
+        if conn is not None:
+            try:
+                conn.interrupt()
+            except sqlite3.ProgrammingError:
+                # Closed by the worker in the meantime
+                pass
+
+    def run(self):
+        start = time.perf_counter()
+        rows = []
+        try:
+            self.conn = open_readonly(self.db_path)
+            total = count_rows(self.conn, self.db_path, self.name, self.start_date, self.end_date)
+            self.signals.started.emit(total)
+            for chunk in iter_report(self.conn, self.db_path, self.name,
+                                     self.start_date, self.end_date, self.batch):
+                if self.is_cancelled:
+                    break
+                rows.extend(chunk)
+                self.signals.chunk.emit(chunk)
+
+            if self.is_cancelled:
+                self.signals.cancelled.emit()
+                return
+            self.signals.finished.emit(finish_report(self.name, rows, self.start_date, self.end_date))
+            log_info(logger, f"{self.name}: {len(rows)} rows in {time.perf_counter() - start:.3f}s")
+        except sqlite3.OperationalError as e:
+            if self.is_cancelled:
+                # interrupt() aborts the statement with "interrupted"
+                self.signals.cancelled.emit()
+            else:
+                log_error(logger, e, {"operation": "report", "report": self.name})
+                self.signals.failed.emit(str(e))
+        except Exception as e:
+            log_error(logger, e, {"operation": "report", "report": self.name})
+            self.signals.failed.emit(str(e))
+        finally:
+            conn, self.conn = self.conn, None
+            if conn is not None:
+                conn.close()
+
+class SearchWorkerSignals(QObject):
+    """Signals a SearchWorker emits from its pool thread"""
+    finished = pyqtSignal(object)      # list of product dicts
+    cancelled = pyqtSignal()
+    failed = pyqtSignal(str)
+
+class SearchWorker(QRunnable):
+    """
+    Runs one ranked product search on a QThreadPool thread.
+
+    Like QueryWorker it reads through a private read-only connection that
+    cancel() can interrupt. The search tokens of the results are computed
+    here too (tokens, parallel to the rows), so narrowing them later does
+    not tokenize on the GUI thread.
+
+    Args:
+        db_path (str): Database to read
+        term (str): Search text
+        limit (int, optional): Maximum number of products
+    """
+
+    def __init__(self, db_path, term, limit=None):
+        super().__init__()
+        self.db_path = db_path
+        self.term = term
+        self.limit = limit
+        self.signals = SearchWorkerSignals()
+        self.conn = None
+        self.tokens = None
+        self.is_cancelled = False
+
+    def cancel(self):
+        self.is_cancelled = True
+        conn = self.conn
+        if conn is not None:
+            try:
+                conn.interrupt()
+            except sqlite3.ProgrammingError:
+                pass
+
+    def run(self):
+        try:
+            if not self.is_cancelled:
+                self.conn = open_readonly(self.db_path)
+                self.conn.row_factory = sqlite3.Row
+                search = DatabaseManager.product_search_query(self.term, self.limit)
+                rows = [dict(row) for row in self.conn.execute(*search)] if search else []
+                self.tokens = [DatabaseManager.search_tokens(row) for row in rows]
+            if self.is_cancelled:
+                self.signals.cancelled.emit()
+            else:
+                self.signals.finished.emit(rows)
+        except sqlite3.OperationalError as e:
+            if self.is_cancelled:
+                self.signals.cancelled.emit()
+            else:
+                log_error(logger, e, {"operation": "search", "term": self.term})
+                self.signals.failed.emit(str(e))
+        except Exception as e:
+            log_error(logger, e, {"operation": "search", "term": self.term})
+            self.signals.failed.emit(str(e))
+        finally:
+            conn, self.conn = self.conn, None
+            if conn is not None:
+                conn.close()
+
+class InvoicePeekSignals(QObject):
+    """Signals an InvoicePeekWorker emits from its pool thread"""
+    finished = pyqtSignal(str)         # next invoice number
+    failed = pyqtSignal(str)
+
+class InvoicePeekWorker(QRunnable):
+    """
+    Looks up the next invoice number on a QThreadPool thread.
+
+    Only InvoiceSequence.peek runs here, on a private read-only connection;
+    the number is still allocated inside the checkout transaction, so the
+    peek is what the cashier sees, not a reservation.
+
+    Args:
+        db_path (str): Database to read
+        sequence (InvoiceSequence): The terminal's sequence
+    """
+
+    def __init__(self, db_path, sequence):
+        super().__init__()
+        self.db_path = db_path
+        self.sequence = sequence
+        self.signals = InvoicePeekSignals()
+
+    def run(self):
+        conn = None
+        try:
+            conn = open_readonly(self.db_path)
+            self.signals.finished.emit(self.sequence.peek(conn))
+        except Exception as e:
+            log_error(logger, e, {"operation": "invoice_peek"})
+            self.signals.failed.emit(str(e))
+        finally:
+            if conn is not None:
+                conn.close()
+
+class CatalogPrefetchSignals(QObject):
+    """Signals a CatalogPrefetchWorker emits from its pool thread"""
+    finished = pyqtSignal(object)      # (catalog, index, version)
+    failed = pyqtSignal(str)
+
+class CatalogPrefetchWorker(QRunnable):
+    """
+    Loads the product catalog and its type-ahead index on a QThreadPool
+    thread, for DatabaseManager.install_catalog on the GUI thread.
+
+    Args:
+        db_path (str): Database to read
+    """
+
+    def __init__(self, db_path):
+        super().__init__()
+        self.db_path = db_path
+        self.signals = CatalogPrefetchSignals()
+
+    def run(self):
+        start = time.perf_counter()
+        conn = None
+        try:
+            conn = open_readonly(self.db_path)
+            catalog, index, version = DatabaseManager.read_catalog(conn)
+            log_info(logger, "Catalog prefetched",
+                     {"products": len(catalog), "duration": round(time.perf_counter() - start, 3)})
+            self.signals.finished.emit((catalog, index, version))
+        except Exception as e:
+            log_error(logger, e, {"operation": "catalog_prefetch"})
+            self.signals.failed.emit(str(e))
+        finally:
+            if conn is not None:
+                conn.close()
+
+class StallWatchdog(QObject):
+    """
+    Measures how long the GUI event loop is blocked.
+
+    A timer is due every interval ms on the GUI thread; any extra delay
+    before it fires is time the event loop could not run. The longest such
+    stall since start() is kept in longest_stall (ms).
+    """
+
+    def __init__(self, interval=20, parent=None):
+        super().__init__(parent)
+        self.interval = interval
+        self.timer = QTimer(self)
+        self.timer.setInterval(interval)
+        self.timer.timeout.connect(self.tick)
+        self.last_tick = None
+        self.longest_stall = 0.0
+
+    def start(self):
+        self.longest_stall = 0.0
+        self.last_tick = time.perf_counter()
+        self.timer.start()
+
+    def stop(self):
+        self.timer.stop()
+        self.tick()
+        return self.longest_stall
+
+    def tick(self):
+        now = time.perf_counter()
+        if self.last_tick is not None:
+            stall = (now - self.last_tick) * 1000 - self.interval
+            self.longest_stall = max(self.longest_stall, stall)
+        self.last_tick = now
@@ -1,5 +1,4 @@
 import datetime
-import random
 import locale
 import re
 
@@ -19,12 +18,9 @@ def format_currency(amount):
     except (ValueError, TypeError):
         return "$0.00"
 
-def generate_invoice_number():
-    """توليد رقم فاتورة فريد"""
-    today = datetime.datetime.now()
-    date_part = today.strftime("%Y%m%d")
-    random_part = random.randint(1000, 9999)
-    return f"INV-{date_part}-{random_part}"
+def format_invoice_number(prefix, terminal, day, sequence):
+    """تنسيق رقم الفاتورة: INV-T1-YYYYMMDD-0001"""
+    return f"{prefix}-{terminal}-{day}-{sequence:04d}"
 
 def format_date(date):
     """Format a date as YYYY-MM-DD"""
@@ -35,6 +31,25 @@ def format_date(date):
             return date
     return date.strftime("%Y-%m-%d")
 
+def _day_start(date):
+    """Local midnight of a date given as YYYY-MM-DD, date or datetime"""
+    if isinstance(date, str):
+        date = datetime.datetime.strptime(date[:10], "%Y-%m-%d")
+    return datetime.datetime(date.year, date.month, date.day)
+
+def epoch_day_range(start_date=None, end_date=None):
+    """Translate inclusive dates into a half-open [start, end) epoch range
+
+    Either bound may be None. The end bound is midnight after end_date, so
+    the whole last day is included.
+    """
+    start_ts = end_ts = None
+    if start_date:
+        start_ts = int(_day_start(start_date).timestamp())
+    if end_date:
+        end_ts = int((_day_start(end_date) + datetime.timedelta(days=1)).timestamp())
+    return start_ts, end_ts
+
 def validate_barcode(barcode):
     """Validate a barcode format"""
     if not barcode: